@@ -46,6 +46,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'chessclubs.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -59,7 +60,7 @@ ROOT_URLCONF = 'Wildebeest.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'chessclubs.metrics.TimedDjangoTemplates',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -143,12 +144,51 @@ LOGIN_URL = 'log_in'
 # URL where @login_prohibited redirects to
 REDIRECT_URL_WHEN_LOGGED_IN = 'landing_page'
 
+# Number of clubs per page of the landing page
+CLUBS_PER_PAGE = 50
+
+# Number of unread notifications listed in the navbar dropdown, and of notifications per page of the inbox
+NOTIFICATIONS_DROPDOWN_SIZE = 5
+NOTIFICATIONS_PER_PAGE = 25
+
 # Message level tags should use Bootstrap terms
 MESSAGE_TAGS = {
     message_constants.DEBUG: 'dark',
     message_constants.ERROR: 'danger',
 }
 
+# Cache shared by the processes serving the site (club and tournament group handles, permission sets).
+# Local memory by default: set CACHE_BACKEND and CACHE_LOCATION to use a shared backend (e.g. Redis) in production.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'wildebeest'),
+    }
+}
+
+# Run the tasks of the job queue (e.g. notification fan-out) as soon as they are enqueued, instead of leaving them to
+# the workers started by "manage.py run_jobs" (the worker process of the Procfile). Off unless DEBUG or JOBS_EAGER=True;
+# the test runner turns it on.
+JOBS_EAGER = os.environ.get('JOBS_EAGER', str(DEBUG)) == 'True'
+
+TEST_RUNNER = 'Wildebeest.test_runner.TestRunner'
+
+# Addresses allowed to scrape the request metrics exposed at /metrics/ (see chessclubs/metrics.py)
+METRICS_ALLOWED_IPS = ['127.0.0.1', '::1']
+
+# Maximum number of SQL queries a request of each view (by URL name) should run. Requests over budget are logged, or
+# raise QueryBudgetExceeded with QUERY_BUDGETS_RAISE=True (which the test runner sets).
+VIEW_QUERY_BUDGETS = {
+    'home': 5,
+    'log_in': 12,
+    'landing_page': 10,
+    'show_club': 20,
+    'my_matches': 10,
+    'notifications_inbox': 10,
+    'mark_all_as_read': 5,
+}
+QUERY_BUDGETS_RAISE = os.environ.get('QUERY_BUDGETS_RAISE', 'False') == 'True'
+
 AUTHENTICATION_BACKENDS = ["django.contrib.auth.backends.ModelBackend", "chessclubs.auth_backends.ClubBackend",
                            "chessclubs.auth_backends.TournamentBackend"]
 
@@ -0,0 +1,25 @@
+"""Test runner of the project."""
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+
+# Settings overridden while the tests run: tasks of the job queue run as soon as they are enqueued, and requests over
+# the query budget of their view raise QueryBudgetExceeded
+TEST_SETTINGS = {
+    'JOBS_EAGER': True,
+    'QUERY_BUDGETS_RAISE': True,
+}
+
+
+class TestRunner(DiscoverRunner):
+    """Runs the tests with the settings of TEST_SETTINGS, restored afterwards"""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._saved_settings = {name: getattr(settings, name) for name in TEST_SETTINGS}
+        for name, value in TEST_SETTINGS.items():
+            setattr(settings, name, value)
+
+    def teardown_test_environment(self, **kwargs):
+        for name, value in self._saved_settings.items():
+            setattr(settings, name, value)
+        super().teardown_test_environment(**kwargs)
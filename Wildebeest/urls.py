@@ -24,7 +24,7 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('', views.home, name='home'),
     path('my_profile/', views.my_profile, name='my_profile'),
-    path('club/<int:club_id>', views.show_club, name='show_club'),
+    path('club/id/<int:club_id>', views.show_club, name='show_club'),
     path('log_in/', views.log_in, name='log_in'),
     path('log_out/', views.log_out, name='log_out'),
     path('password/', views.password, name='password'),
@@ -37,6 +37,9 @@ urlpatterns = [
     path('<club_name>/transfer_ownership/<int:user_id>', views.transfer_ownership, name='transfer_ownership'),
     path('<club_name>/members/', views.user_list, name='user_list'),
     path(r'mark-as-read/(<slug>[-\w]+)', views.mark_as_read, name='mark_as_read'),
+    path('my_notifications/', views.notifications_inbox, name='notifications_inbox'),
+    path('my_notifications/mark_all_as_read/', views.mark_all_as_read, name='mark_all_as_read'),
+    path('metrics/', views.metrics, name='metrics'),
     path('<club_name>/accept/<int:user_id>', views.accept, name='accept'),
     path('<club_name>/deny/<int:user_id>', views.deny, name='deny'),
     path('<club_name>/acknowledge/', views.acknowledge, name='acknowledge'),
@@ -48,6 +51,7 @@ urlpatterns = [
     path('<club_name>/create_tournament/', views.create_tournament, name='create_tournament'),
     path('<club_name>/ban/<int:user_id>', views.ban, name='ban'),
     path('<club_name>/leave/', views.leave, name='leave'),
+    path('club/id/<int:club_id>/tournament/<int:tournament_id>', views.show_tournament, name='show_tournament'),
     path('<club_name>/tournament/<tournament_name>', views.show_tournament, name='show_tournament'),
     path('<club_name>/create_tournament/', views.create_tournament, name='create_tournament'),
     path('<club_name>/tournament/<tournament_name>/join/', views.join_tournament, name='join_tournament'),
@@ -55,7 +59,7 @@ urlpatterns = [
     path('<club_name>/edit_club_info/', views.edit_club, name='edit_club'),
     path('<club_name>/tournament/<tournament_name>/show_schedule/', views.show_schedule, name='show_schedule'),
     path('<club_name>/tournament/<tournament_name>/add_co_organiser/<int:user_id>', views.add_co_organiser, name='add_co_organiser'),
-    path('<club_name>/tournament/<tournament_name>/<match_id>/enter_result/<result>', views.enter_result, name='enter_result'),
+    path('<club_name>/tournament/<tournament_name>/<int:match_id>/enter_result/<result>', views.enter_result, name='enter_result'),
     path('<club_name>/tournament/<tournament_name>/publish_schedule/', views.publish_schedule, name='publish_schedule'),
     path('my_matches/', views.my_matches, name='my_matches'),
     path('<club_name>/tournament/<tournament_name>/start_tournament/', views.start_tournament, name='start_tournament'),
@@ -5,3 +5,7 @@ from django.apps import AppConfig
 class ChessClubsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'chessclubs'
+
+    def ready(self):
+        from . import signals  # noqa: F401 (registers the signal receivers)
+        from . import dispatcher  # noqa: F401 (registers the tasks of the job queue)
@@ -1,110 +1,160 @@
 
-from django.contrib.auth import get_user_model
-from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.backends import BaseBackend, ModelBackend
 from django.contrib.auth.models import Permission
+from django.db.models import BooleanField, Value
 
+from .models import Club, ClubPermission, Tournament, TournamentPermission
+from .permission_cache import permission_cache
 
-class ClubBackend(ModelBackend):
+_permission_bits = {}
+
+
+def permission_bits(model):
+    """Returns a dictionary mapping the permissions declared in the Meta class of a club or tournament model
+    ("app_label.codename") to their bit in a permission mask, in declaration order"""
+    if model not in _permission_bits:
+        app_label = model._meta.app_label
+        _permission_bits[model] = {
+            f"{app_label}.{codename}": 1 << index for index, (codename, description) in enumerate(model._meta.permissions)
+        }
+    return _permission_bits[model]
+
+
+def permission_mask(model, perms):
+    """Returns the mask of the given permissions ("app_label.codename") of a club or tournament model"""
+    bits = permission_bits(model)
+    mask = 0
+    for perm in perms:
+        mask |= bits.get(perm, 0)
+    return mask
+
+
+def _get_role_masks(entity, permission_model):
+    """Returns a dictionary mapping the name of each role group of a club or tournament to the mask of the permissions
+    granted to it. Role masks are loaded with one query per club or tournament and shared between users."""
+    role_masks = permission_cache.get_role_masks(entity)
+    if role_masks is None:
+        app_label = permission_model._meta.app_label
+        permission_field = permission_model.groups.field.m2m_field_name()
+        rows = permission_model.groups.through.objects.filter(
+            **{f"{permission_field}__{entity._meta.model_name}": entity}
+        ).values_list("group__name", f"{permission_field}__base_permission__codename")
+        bits = permission_bits(type(entity))
+        role_masks = {}
+        for group_name, codename in rows:
+            role_masks[group_name] = role_masks.get(group_name, 0) | bits.get(f"{app_label}.{codename}", 0)
+        permission_cache.set_role_masks(entity, role_masks)
+    return role_masks
+
+
+def _get_entity_permission_mask(user_obj, entity, permission_model, default_role=None):
+    """Computes the mask of the permissions a user holds in a club or tournament through role groups and direct grants.
+    Users without any role group hold the permissions of the default role group, if any."""
+    role_masks = _get_role_masks(entity, permission_model)
+    related_name = permission_model.base_permission.field.related_query_name()
+    role_groups = user_obj.groups.filter(name__in=role_masks).annotate(
+        from_group=Value(True, output_field=BooleanField())
+    ).values_list("name", "from_group").order_by()
+    direct_permissions = Permission.objects.filter(
+        **{f"{related_name}__users": user_obj, f"{related_name}__{entity._meta.model_name}": entity}
+    ).annotate(from_group=Value(False, output_field=BooleanField())).values_list("codename", "from_group").order_by()
+
+    bits = permission_bits(type(entity))
+    app_label = permission_model._meta.app_label
+    mask = 0
+    has_role = False
+    for name, from_group in role_groups.union(direct_permissions, all=True):
+        if from_group:
+            has_role = True
+            mask |= role_masks[name]
+        else:
+            mask |= bits.get(f"{app_label}.{name}", 0)
+    if not has_role and default_role is not None:
+        mask |= role_masks.get(f"{entity.name}_{default_role}", 0)
+    return mask
+
+
+class AuthorizationBackend(BaseBackend):
+    """Base of the club and tournament backends.
+
+    They only answer permission checks: authenticate() is BaseBackend's, which accepts no credentials, so logging in
+    (or failing to) only looks the user up and hashes the password once, in ModelBackend. The permissions a user holds
+    outside of any club or tournament are still read from ModelBackend."""
+
+    _model_backend = ModelBackend()
+
+    def get_global_permissions(self, user_obj):
+        """Returns the permissions the user holds outside of any club or tournament (see ModelBackend)"""
+        return self._model_backend.get_all_permissions(user_obj)
+
+
+class ClubBackend(AuthorizationBackend):
     """A backend that understands club-specific authorization and permissions"""
 
-    def _get_user_club_permissions(self, user_obj, club):
-        return Permission.objects.filter(
-            club_permission__users=user_obj, club_permission__club=club
-        )
-
-    def _get_group_club_permissions(self, user_obj, club):
-        user_groups_field = get_user_model()._meta.get_field("groups")
-        user_groups_query = (
-            "club_permission__groups__%s" % user_groups_field.related_query_name()
-        )
-        return Permission.objects.filter(
-            **{user_groups_query: user_obj}, club_permission__club=club
-        )
-
-    def __get_club_permissions(self, user_obj, club, from_name):
+    def get_club_permission_mask(self, user_obj, club):
+        """Returns the mask of the permissions a user holds in a club (see permission_bits)"""
         if not user_obj.is_active or user_obj.is_anonymous:
-            return set()
+            return 0
 
-        perm_cache_name = f"_{from_name}_project_{club.pk}_perm_cache"
-        if not hasattr(user_obj, perm_cache_name):
+        mask_cache_name = f"_club_{club.pk}_perm_mask"
+        if not hasattr(user_obj, mask_cache_name):
             if user_obj.is_superuser:
-                perms = Permission.objects.all()
+                mask = permission_mask(Club, permission_bits(Club))
             else:
-                perms = getattr(self, "_get_%s_club_permissions" % from_name)(
-                    user_obj, club
-                )
-            perms = perms.values_list("content_type__app_label", "codename").order_by()
-            setattr(
-                user_obj, perm_cache_name, {"%s.%s" % (ct, name) for ct, name in perms}
-            )
-        return getattr(user_obj, perm_cache_name)
-
-    def get_user_club_permissions(self, user_obj, club):
-        return self.__get_club_permissions(user_obj, club, "user")
-
-    def get_group_club_permissions(self, user_obj, club):
-        return self.__get_club_permissions(user_obj, club, "group")
+                mask = permission_cache.get(user_obj, club)
+                if mask is None:
+                    mask = _get_entity_permission_mask(user_obj, club, ClubPermission, default_role="authenticated_non_members")
+                    mask |= permission_mask(Club, self.get_global_permissions(user_obj))
+                    permission_cache.set(user_obj, club, mask)
+            setattr(user_obj, mask_cache_name, mask)
+        return getattr(user_obj, mask_cache_name)
 
     def get_all_club_permissions(self, user_obj, club):
+        mask = self.get_club_permission_mask(user_obj, club)
         return {
-            *self.get_user_club_permissions(user_obj, club),
-            *self.get_group_club_permissions(user_obj, club),
-            *self.get_user_permissions(user_obj),
-            *self.get_group_permissions(user_obj),
+            *(perm for perm, bit in permission_bits(Club).items() if mask & bit),
+            *self.get_global_permissions(user_obj),
         }
 
     def has_club_perm(self, user_obj, perm, club):
-        return perm in self.get_all_club_permissions(user_obj, club)
+        bit = permission_bits(Club).get(perm)
+        if bit is None:
+            # Not a club-specific permission
+            return perm in self.get_global_permissions(user_obj)
+        return bool(self.get_club_permission_mask(user_obj, club) & bit)
 
 
-class TournamentBackend(ModelBackend):
+class TournamentBackend(AuthorizationBackend):
     """A backend that understands tournament-specific authorization and permissions"""
 
-    def _get_user_tournament_permissions(self, user_obj, tournament):
-        return Permission.objects.filter(
-            tournament_permission__users=user_obj, tournament_permission__tournament=tournament
-        )
-
-    def _get_group_tournament_permissions(self, user_obj, tournament):
-        user_groups_field = get_user_model()._meta.get_field("groups")
-        user_groups_query = (
-            "tournament_permission__groups__%s" % user_groups_field.related_query_name()
-        )
-        return Permission.objects.filter(
-            **{user_groups_query: user_obj}, tournament_permission__tournament=tournament
-        )
-
-    def __get_tournament_permissions(self, user_obj, tournament, from_name):
+    def get_tournament_permission_mask(self, user_obj, tournament):
+        """Returns the mask of the permissions a user holds in a tournament (see permission_bits)"""
         if not user_obj.is_active or user_obj.is_anonymous:
-            return set()
+            return 0
 
-        perm_cache_name = f"_{from_name}_project_{tournament.pk}_perm_cache"
-        if not hasattr(user_obj, perm_cache_name):
+        mask_cache_name = f"_tournament_{tournament.pk}_perm_mask"
+        if not hasattr(user_obj, mask_cache_name):
             if user_obj.is_superuser:
-                perms = Permission.objects.all()
+                mask = permission_mask(Tournament, permission_bits(Tournament))
             else:
-                perms = getattr(self, "_get_%s_tournament_permissions" % from_name)(
-                    user_obj, tournament
-                )
-            perms = perms.values_list("content_type__app_label", "codename").order_by()
-            setattr(
-                user_obj, perm_cache_name, {"%s.%s" % (ct, name) for ct, name in perms}
-            )
-        return getattr(user_obj, perm_cache_name)
-
-    def get_user_tournament_permissions(self, user_obj, tournament):
-        return self.__get_tournament_permissions(user_obj, tournament, "user")
-
-    def get_group_tournament_permissions(self, user_obj, tournament):
-        return self.__get_tournament_permissions(user_obj, tournament, "group")
+                mask = permission_cache.get(user_obj, tournament)
+                if mask is None:
+                    mask = _get_entity_permission_mask(user_obj, tournament, TournamentPermission)
+                    mask |= permission_mask(Tournament, self.get_global_permissions(user_obj))
+                    permission_cache.set(user_obj, tournament, mask)
+            setattr(user_obj, mask_cache_name, mask)
+        return getattr(user_obj, mask_cache_name)
 
     def get_all_tournament_permissions(self, user_obj, tournament):
+        mask = self.get_tournament_permission_mask(user_obj, tournament)
         return {
-            *self.get_user_tournament_permissions(user_obj, tournament),
-            *self.get_group_tournament_permissions(user_obj, tournament),
-            *self.get_user_permissions(user_obj),
-            *self.get_group_permissions(user_obj),
+            *(perm for perm, bit in permission_bits(Tournament).items() if mask & bit),
+            *self.get_global_permissions(user_obj),
         }
 
     def has_tournament_perm(self, user_obj, perm, tournament):
-        return perm in self.get_all_tournament_permissions(user_obj, tournament)
+        bit = permission_bits(Tournament).get(perm)
+        if bit is None:
+            # Not a tournament-specific permission
+            return perm in self.get_global_permissions(user_obj)
+        return bool(self.get_tournament_permission_mask(user_obj, tournament) & bit)
@@ -4,7 +4,8 @@ from django.core.exceptions import ObjectDoesNotExist
 from django.shortcuts import redirect
 from django.utils import timezone
 
-from .models import Club, Tournament, User, Match
+from .models import User
+from .resolvers import get_club, get_match, get_tournament
 
 
 def login_prohibited(view_function):
@@ -21,13 +22,13 @@ def login_prohibited(view_function):
 def club_permissions_required(perms_list):
     def wrapper(view_func):
         def wrapped(request, *args, **kwargs):
-            club_name = kwargs.get('club_name')
             try:
-                club = Club.objects.get(name=club_name)
+                club = get_club(request, kwargs.get('club_name', kwargs.get('club_id')))
             except ObjectDoesNotExist:
                 messages.add_message(request, messages.ERROR, "The club you are looking for does not exist!")
                 return redirect(settings.REDIRECT_URL_WHEN_LOGGED_IN)
             else:
+                club_name = club.name
                 for perm in perms_list:
                     if not request.user.has_club_perm(perm, club):
                         if perm == 'chessclubs.access_members_list':
@@ -96,12 +97,12 @@ def tournament_permissions_required(perms_list):
             club_name = kwargs.get('club_name')
             target_user = request.user
             try:
-                club = Club.objects.get(name=club_name)
+                get_club(request, club_name)
             except ObjectDoesNotExist:
                 messages.add_message(request, messages.ERROR, "The club you are looking for does not exist!")
                 return redirect(settings.REDIRECT_URL_WHEN_LOGGED_IN)
             try:
-                tournament = Tournament.objects.get(name=tournament_name)
+                tournament = get_tournament(request, tournament_name)
             except ObjectDoesNotExist:
                 messages.add_message(request, messages.ERROR, "The tournament you are looking for does not exist!")
                 return redirect('show_club', club_name=club_name)
@@ -159,7 +160,7 @@ def must_be_non_participant(view_function):
         club_name = kwargs.get('club_name')
         target_user = request.user
         try:
-            tournament = Tournament.objects.get(name=tournament_name)
+            tournament = get_tournament(request, tournament_name)
         except ObjectDoesNotExist:
             messages.add_message(request, messages.ERROR, "The tournament you are looking for does not exist!")
             return redirect('show_club', club_name=club_name)
@@ -184,7 +185,7 @@ def must_be_non_participant(view_function):
 def deadline_must_not_be_passed(view_function):
     def modified_view_function(request, *args, **kwargs):
         tournament_name = kwargs.get('tournament_name')
-        tournament = Tournament.objects.get(name=tournament_name)
+        tournament = get_tournament(request, tournament_name)
         club_name = kwargs.get('club_name')
         if tournament.deadline <= timezone.now():
             messages.add_message(request, messages.WARNING,
@@ -199,7 +200,7 @@ def deadline_must_not_be_passed(view_function):
 def deadline_must_be_passed(view_function):
     def modified_view_function(request, *args, **kwargs):
         tournament_name = kwargs.get('tournament_name')
-        tournament = Tournament.objects.get(name=tournament_name)
+        tournament = get_tournament(request, tournament_name)
         club_name = kwargs.get('club_name')
         if tournament.deadline > timezone.now():
             messages.add_message(request, messages.WARNING,
@@ -214,7 +215,7 @@ def deadline_must_be_passed(view_function):
 def tournament_must_be_published(view_function):
     def modified_view_function(request, *args, **kwargs):
         tournament_name = kwargs.get('tournament_name')
-        tournament = Tournament.objects.get(name=tournament_name)
+        tournament = get_tournament(request, tournament_name)
         club_name = kwargs.get('club_name')
         if not tournament.is_published():
             messages.add_message(request, messages.WARNING, "The schedule hasn't been published yet")
@@ -236,8 +237,8 @@ def target_user_must_be_officer_and_non_participant(view_function):
             messages.add_message(request, messages.ERROR, "The officer you are looking for doesn't exist")
             return redirect('show_tournament', tournament_name=tournament_name, club_name=club_name)
         else:
-            tournament = Tournament.objects.get(name=tournament_name)
-            club = Club.objects.get(name=club_name)
+            tournament = get_tournament(request, tournament_name)
+            club = get_club(request, club_name)
             if club.user_status(user) != "officer":
                 messages.add_message(request, messages.WARNING, "You can only add officers as co-organisers")
                 return redirect('show_tournament', tournament_name=tournament_name, club_name=club_name)
@@ -256,13 +257,13 @@ def match_must_be_in_tournament(view_function):
         club_name = kwargs.get('club_name')
         tournament_name = kwargs.get('tournament_name')
         try:
-            match = Match.objects.get(id=match_id)
+            match = get_match(request, match_id)
         except ObjectDoesNotExist:
             messages.add_message(request, messages.ERROR, "The match you are looking for doesn't exist")
             return redirect('show_schedule', tournament_name=tournament_name, club_name=club_name)
         else:
-            tournament = Tournament.objects.get(name=tournament_name)
-            if match not in tournament.get_current_schedule():
+            tournament = get_tournament(request, tournament_name)
+            if not tournament.has_open_match(match):
                 messages.add_message(request, messages.WARNING, "This match is not part of the requested tournament")
                 return redirect('show_schedule', tournament_name=tournament_name, club_name=club_name)
             else:
@@ -290,7 +291,7 @@ def tournament_has_not_finished(view_function):
     def modified_view_function(request, *args, **kwargs):
         club_name = kwargs.get('club_name')
         tournament_name = kwargs.get('tournament_name')
-        tournament = Tournament.objects.get(name=tournament_name)
+        tournament = get_tournament(request, tournament_name)
         if tournament.has_finished():
             messages.add_message(request, messages.WARNING, "The tournament is already finished!")
             return redirect('show_tournament', tournament_name=tournament_name, club_name=club_name)
@@ -304,7 +305,7 @@ def tournament_has_not_started(view_function):
     def modified_view_function(request, *args, **kwargs):
         club_name = kwargs.get('club_name')
         tournament_name = kwargs.get('tournament_name')
-        tournament = Tournament.objects.get(name=tournament_name)
+        tournament = get_tournament(request, tournament_name)
         if tournament.has_started():
             messages.add_message(request, messages.WARNING, "The tournament has already started!")
             return redirect('show_tournament', tournament_name=tournament_name, club_name=club_name)
@@ -318,7 +319,7 @@ def tournament_has_started(view_function):
     def modified_view_function(request, *args, **kwargs):
         club_name = kwargs.get('club_name')
         tournament_name = kwargs.get('tournament_name')
-        tournament = Tournament.objects.get(name=tournament_name)
+        tournament = get_tournament(request, tournament_name)
         if not tournament.has_started():
             messages.add_message(request, messages.WARNING, "The tournament has not started yet!")
             return redirect('show_tournament', tournament_name=tournament_name, club_name=club_name)
@@ -0,0 +1,48 @@
+"""Notification dispatcher fanning notifications out to the officers of a club or the participants of a tournament.
+
+The recipients are resolved with a single query on their role (group membership or player profile) and the
+notifications are written with one bulk insert, on the job queue (see jobs.py) rather than in the request.
+"""
+from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
+from notifications.models import Notification
+
+from .jobs import enqueue, task
+from .models import Club, Tournament, User
+from .unread_counter import unread_counter
+
+
+def bulk_notify(actor, recipient_ids, verb, description):
+    """Creates a notification from the actor for each of the recipients with one bulk insert and returns them"""
+    recipient_ids = list(recipient_ids)
+    actor_content_type = ContentType.objects.get_for_model(actor)
+    timestamp = timezone.now()
+    notifications = Notification.objects.bulk_create([
+        Notification(recipient_id=recipient_id, actor_content_type=actor_content_type, actor_object_id=actor.pk,
+                     verb=verb, description=description, timestamp=timestamp)
+        for recipient_id in recipient_ids
+    ])
+    unread_counter.invalidate(recipient_ids)
+    return notifications
+
+
+@task
+def notify_officers_and_owner(club_id, actor_id, verb, description):
+    club = Club.objects.get(pk=club_id)
+    bulk_notify(User.objects.get(pk=actor_id), club.get_officer_and_owner_ids(), verb, description)
+
+
+@task
+def notify_participants(tournament_id, verb, description):
+    tournament = Tournament.objects.select_related('organiser').get(pk=tournament_id)
+    bulk_notify(tournament.organiser, tournament.players.values_list('user_id', flat=True), verb, description)
+
+
+def dispatch_to_officers_and_owner(club, actor, verb, description):
+    """Notifies the officers and owner of the club from the actor"""
+    enqueue(notify_officers_and_owner, club_id=club.id, actor_id=actor.id, verb=verb, description=description)
+
+
+def dispatch_to_participants(tournament, verb, description):
+    """Notifies the participants of the tournament from its organiser"""
+    enqueue(notify_participants, tournament_id=tournament.id, verb=verb, description=description)
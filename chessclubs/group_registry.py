@@ -0,0 +1,121 @@
+"""Registry resolving the role groups of clubs and tournaments.
+
+The groups of a club or tournament are named after it (e.g. "Kerbal_officers"). Resolving a group used to mean one
+get_or_create query per call. The registry resolves each (entity, role) group once and keeps a handle to it:
+
+- on the entity instance itself, for the lifetime of the request that loaded it,
+- in a process-local LRU, and
+- in the Django cache, shared between processes.
+
+Handles are keyed by entity type, primary key and role, and store the group name they were resolved for, so a handle
+is only reused while the entity still has the same name. Handles are only published to the shared tiers once the
+transaction that created or read the group has committed, and the whole registry is invalidated whenever a group is
+deleted (see signals.py).
+"""
+import threading
+from collections import OrderedDict
+
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+REGISTRY_VERSION_KEY = "chessclubs:group_registry:version"
+LOCAL_REGISTRY_SIZE = 2048
+
+
+class GroupRegistry:
+    """Resolves and caches the role groups of clubs and tournaments"""
+
+    def __init__(self, maxsize=LOCAL_REGISTRY_SIZE):
+        self.maxsize = maxsize
+        self._handles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_group(self, entity, role):
+        """Returns the group of the given role for a club or tournament, creating it if needed"""
+        name = f"{entity.name}_{role}"
+        instance_handles = entity.__dict__.setdefault('_group_handles', {})
+        group = instance_handles.get(role)
+        if group is not None and group.name == name:
+            return group
+
+        key = self.__key(entity, role)
+        version = self.__version()
+        handle = self.__get_handle(version, key)
+        if handle is not None and handle[1] == name:
+            group = Group(id=handle[0], name=name)
+            group._state.adding = False
+            group._state.db = DEFAULT_DB_ALIAS
+            instance_handles[role] = group
+        else:
+            group, created = Group.objects.get_or_create(name=name)
+            self.remember(entity, role, group)
+        return group
+
+    def remember(self, entity, role, group):
+        """Records a group resolved elsewhere (e.g. created in bulk) as the group of the given role"""
+        entity.__dict__.setdefault('_group_handles', {})[role] = group
+        key = self.__key(entity, role)
+        version = self.__version()
+        handle = (group.pk, group.name)
+        transaction.on_commit(lambda: self.__set_handle(version, key, handle))
+
+    def invalidate(self, entity):
+        """Forgets the group handles of a club or tournament (e.g. when it is renamed or deleted)"""
+        entity.__dict__.pop('_group_handles', None)
+        if entity.pk is None:
+            return
+        label = entity._meta.label_lower
+        with self._lock:
+            for key in [key for key in self._handles if key[1:3] == (label, entity.pk)]:
+                del self._handles[key]
+        version = self.__version()
+        cache.delete_many([self.__cache_key(version, (label, entity.pk, role)) for role in entity.GROUP_ROLES])
+
+    def clear(self):
+        """Forgets every group handle, in this process and in the shared cache"""
+        with self._lock:
+            self._handles.clear()
+        try:
+            cache.incr(REGISTRY_VERSION_KEY)
+        except ValueError:
+            cache.set(REGISTRY_VERSION_KEY, 1, None)
+
+    def __key(self, entity, role):
+        return entity._meta.label_lower, entity.pk, role
+
+    def __cache_key(self, version, key):
+        label, pk, role = key
+        return f"chessclubs:group_registry:{version}:{label}:{pk}:{role}"
+
+    def __version(self):
+        return cache.get(REGISTRY_VERSION_KEY, 0)
+
+    def __get_handle(self, version, key):
+        if key[1] is None:
+            return None
+        with self._lock:
+            handle = self._handles.get((version,) + key)
+            if handle is not None:
+                self._handles.move_to_end((version,) + key)
+                return handle
+        handle = cache.get(self.__cache_key(version, key))
+        if handle is not None:
+            self.__remember(version, key, handle)
+        return handle
+
+    def __set_handle(self, version, key, handle):
+        if key[1] is None:
+            return
+        cache.set(self.__cache_key(version, key), handle, None)
+        self.__remember(version, key, handle)
+
+    def __remember(self, version, key, handle):
+        with self._lock:
+            self._handles[(version,) + key] = handle
+            self._handles.move_to_end((version,) + key)
+            while len(self._handles) > self.maxsize:
+                self._handles.popitem(last=False)
+
+
+group_registry = GroupRegistry()
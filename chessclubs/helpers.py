@@ -1,47 +1,33 @@
-from notifications.signals import notify
 from django.shortcuts import redirect
+from chessclubs.dispatcher import dispatch_to_officers_and_owner, dispatch_to_participants
 from chessclubs.models import User, Club, Match, Tournament
 from Wildebeest.settings import REDIRECT_URL_WHEN_LOGGED_IN
 import re
 
 
-def add_all_users_to_logged_in_group(club):
-    for user in User.objects.all():
-        if club.owner != user:
-            club.add_to_logged_in_non_members_group(user)
-
-
 def notify_officers_and_owner_of_joining(user, club):
-    for member in club.members.all():
-        if club.user_status(member) == "officer" or club.user_status(member) == "owner":
-            notify.send(user, recipient=member, verb=f'{club.name}_Join',
-                        description=f"{user.full_name()} has joined club {club.name}")
+    dispatch_to_officers_and_owner(club, user, verb=f'{club.name}_Join',
+                                   description=f"{user.full_name()} has joined club {club.name}")
 
 
 def notify_officers_and_owner_of_leave(user, club):
-    for member in club.members.all():
-        if club.user_status(member) == "officer" or club.user_status(member) == "owner":
-            notify.send(user, recipient=member, verb=f'{club.name}_LeaveNotice',
-                        description=f"{user.full_name()} has left club {club.name}")
+    dispatch_to_officers_and_owner(club, user, verb=f'{club.name}_LeaveNotice',
+                                   description=f"{user.full_name()} has left club {club.name}")
 
 
 def notify_participants_of_publish(tournament):
-    for participant in tournament.participants_list():
-        notify.send(tournament.organiser, recipient=participant.user, verb=f'{tournament.name}_PublishSchedule',
-                    description=f"The schedule for tournament {tournament.name} is now published!")
+    dispatch_to_participants(tournament, verb=f'{tournament.name}_PublishSchedule',
+                             description=f"The schedule for tournament {tournament.name} is now published!")
 
 
 def notify_participants_of_start(tournament):
-    for participant in tournament.participants_list():
-        notify.send(tournament.organiser, recipient=participant.user, verb=f'{tournament.name}_StartTournament',
-                    description=f"The tournament {tournament.name} has started!")
+    dispatch_to_participants(tournament, verb=f'{tournament.name}_StartTournament',
+                             description=f"The tournament {tournament.name} has started!")
 
 
 def notify_officers_and_owner_of_new_application(user, club):
-    for member in club.members.all():
-        if club.user_status(member) == "officer" or club.user_status(member) == "owner":
-            notify.send(user, recipient=member, verb=f'{club.name}_Apply',
-                        description=f"{user.full_name()} has applied to club {club.name}")
+    dispatch_to_officers_and_owner(club, user, verb=f'{club.name}_Apply',
+                                   description=f"{user.full_name()} has applied to club {club.name}")
 
 
 def get_appropriate_redirect(notification):
@@ -0,0 +1,195 @@
+"""Audit of the index coverage of the hot queries of the app.
+
+The audit seeds a small dataset (a club and a tournament in its pool phase, see seeding.py), runs the hot paths of the
+app on it (permission checks, role resolution, schedule loads and result entry) and captures the SQL they run. Each
+captured statement is then explained by the database (EXPLAIN QUERY PLAN on SQLite, EXPLAIN on PostgreSQL), and the
+plans are checked for:
+
+- full scans: a table read in full, with or without an index (SQLite "SCAN table", PostgreSQL "Seq Scan on table",
+  with sequential scans disabled so that the planner only falls back to them when no index can be used),
+- sorts: rows sorted in a temporary B-tree after being looked up by index (SQLite "USE TEMP B-TREE FOR ORDER BY"),
+  unless they come from several index lookups joined by OR.
+
+For each of these, the audit recommends an index on the columns the statement filters the table on (equality and IN
+lookups) followed by the columns it orders the table by, unless an existing index already starts with these columns.
+Everything is run in a transaction that is rolled back, so the audit leaves the database unchanged.
+"""
+import re
+from dataclasses import dataclass, field
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Club, Player, Tournament
+from .seeding import bulk_add_members, bulk_add_participants, bulk_create_users
+
+# Number of players of the audited tournament (a small pool phase, with pools, standings and pool matches)
+AUDIT_PLAYERS = 32
+
+_SQLITE_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)(?: AS \w+)?(?: USING (?:COVERING )?INDEX \w+)?$')
+_SQLITE_SORT = 'USE TEMP B-TREE FOR ORDER BY'
+_SQLITE_MULTI_INDEX_OR = 'MULTI-INDEX OR'
+_POSTGRESQL_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+
+@dataclass
+class QueryPlan:
+    """The plan of a statement run by a hot path, with the tables it scans or sorts and the indexes recommended"""
+    path: str
+    sql: str
+    plan: list
+    full_scans: list = field(default_factory=list)
+    sorts: list = field(default_factory=list)
+    recommendations: list = field(default_factory=list)
+
+    @property
+    def flagged(self):
+        return bool(self.full_scans or self.sorts)
+
+
+class _StatementCollector:
+    """Collects the statements run on the connection (see connection.execute_wrapper), without duplicates"""
+
+    def __init__(self):
+        self.statements = []
+        self._seen = set()
+
+    def __call__(self, execute, sql, params, many, context):
+        if not many and sql.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE')) and sql not in self._seen:
+            self._seen.add(sql)
+            self.statements.append((sql, params))
+        return execute(sql, params, many, context)
+
+
+def _seed():
+    users = bulk_create_users([
+        {'email': f'audit.{index}@example.org', 'first_name': f'Audit{index}', 'last_name': 'User',
+         'bio': 'Index audit user', 'chess_experience': 'Novice', 'personal_statement': 'I play chess'}
+        for index in range(AUDIT_PLAYERS + 2)
+    ], password='Password123')
+    owner, officer, *players = users
+    club = Club.objects.create(name="Index_Audit_Club", location="London", description="Index audit", owner=owner)
+    club.members.add(owner)
+    club.assign_club_groups_permissions()
+    bulk_add_members(club, [officer], role="officers")
+    bulk_add_members(club, players)
+    tournament = Tournament.objects.create(name="Index_Audit_Tournament", description="Index audit", location="London",
+                                           max_capacity=96, organiser=owner, club=club,
+                                           deadline=timezone.now() - timezone.timedelta(days=1))
+    tournament.assign_tournament_permissions_and_groups()
+    bulk_add_participants(tournament, players)
+    tournament.start_tournament()
+    return {'club': club, 'tournament': tournament, 'officer': officer, 'player': players[0]}
+
+
+def _fresh(instance):
+    """Reloads a model instance, without the permissions and handles remembered on it"""
+    return type(instance).objects.get(pk=instance.pk)
+
+
+def _check_permissions(club, tournament, officer, player):
+    _fresh(officer).has_club_perm('chessclubs.access_members_list', _fresh(club))
+    _fresh(player).has_tournament_perm('chessclubs.withdraw', _fresh(tournament))
+
+
+def _resolve_roles(club, tournament, officer, player):
+    club = _fresh(club)
+    tournament = _fresh(tournament)
+    club.user_status(player)
+    club.user_statuses()
+    club.get_officer_and_owner_ids()
+    Club.statuses_of_user(player)
+    tournament.user_status(player)
+
+
+def _load_schedules(club, tournament, officer, player):
+    tournament = _fresh(tournament)
+    list(tournament.get_current_schedule())
+    for pool in tournament.get_current_pool_phase().get_pools():
+        list(pool.get_standings())
+        pool.get_current_pool_matches()
+    list(Player.objects.filter(tournament=tournament))
+    _fresh(player).get_open_matches_by_tournament()
+
+
+def _enter_result(club, tournament, officer, player):
+    tournament = _fresh(tournament)
+    match = tournament.get_current_schedule()[0]
+    tournament.enter_result(match, winner=match.get_player1())
+
+
+HOT_PATHS = {
+    'permission checks': _check_permissions,
+    'role resolution': _resolve_roles,
+    'schedule loads': _load_schedules,
+    'result entry': _enter_result,
+}
+
+
+def audit():
+    """Runs the hot paths on a seeded dataset and returns the plans of the statements they run"""
+    plans = []
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+        dataset = _seed()
+        for path, run in HOT_PATHS.items():
+            collector = _StatementCollector()
+            with connection.execute_wrapper(collector):
+                run(**dataset)
+            plans.extend(_explain(path, sql, params) for sql, params in collector.statements)
+        transaction.set_rollback(True)
+    return plans
+
+
+def _explain(path, sql, params):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = [row[-1] for row in cursor.fetchall()]
+        else:
+            cursor.execute(f"EXPLAIN {sql}", params)
+            plan = [row[0] for row in cursor.fetchall()]
+    query_plan = QueryPlan(path=path, sql=sql, plan=plan)
+    tables = set(connection.introspection.table_names())
+    aliases = dict(re.findall(r'"(\w+)" (T\d+)\b', sql))
+    for line in plan:
+        line = line.strip()
+        match = _SQLITE_SCAN.match(line) if connection.vendor == 'sqlite' else _POSTGRESQL_SCAN.search(line)
+        if match:
+            table = aliases.get(match.group(1), match.group(1))
+            if table in tables:
+                query_plan.full_scans.append(table)
+        elif line == _SQLITE_SORT and _SQLITE_MULTI_INDEX_OR not in plan:
+            query_plan.sorts.extend(sorted(_ordered_tables(sql) & tables))
+    for table in dict.fromkeys(query_plan.full_scans + query_plan.sorts):
+        columns = _recommended_columns(sql, table)
+        if columns and not _is_covered(table, columns):
+            query_plan.recommendations.append((table, columns))
+    return query_plan
+
+
+def _ordered_tables(sql):
+    _, _, order_by = sql.rpartition(' ORDER BY ')
+    return set(re.findall(r'"(\w+)"\."\w+"', order_by))
+
+
+def _recommended_columns(sql, table):
+    """Returns the columns of the table the statement filters on by equality or IN, followed by those it orders by"""
+    where = sql.partition(' WHERE ')[2]
+    where, _, order_by = where.rpartition(' ORDER BY ') if ' ORDER BY ' in where else (where, '', '')
+    filtered = re.findall(rf'"{table}"\."(\w+)" (?:= |IN \()', where)
+    ordered = re.findall(rf'"{table}"\."(\w+)"', order_by)
+    return list(dict.fromkeys(filtered + ordered))
+
+
+def _is_covered(table, columns):
+    """Returns whether an index of the table starts with the given columns"""
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table)
+    return any(
+        (constraint['index'] or constraint['unique'] or constraint['primary_key'])
+        and constraint['columns'][:len(columns)] == columns
+        for constraint in constraints.values()
+    )
@@ -0,0 +1,97 @@
+"""Local job queue running slow work (e.g. notification fan-out) off the request path.
+
+Tasks are plain functions registered with the task decorator and called with JSON serialisable keyword arguments.
+Enqueuing a task stores a Job row, in the transaction of the request, and the worker processes started by the run_jobs
+management command claim and run pending jobs in order. A job is claimed by a conditional UPDATE of its status, so a
+job is only run by one worker, and failed jobs are retried up to MAX_ATTEMPTS times. Jobs still running
+VISIBILITY_TIMEOUT after they were claimed are assumed to have lost their worker (e.g. a restarted dyno), and are
+put back in the queue under the same MAX_ATTEMPTS rule.
+
+With the JOBS_EAGER setting, tasks are run as soon as they are enqueued instead, which is what the tests (see
+Wildebeest/test_runner.py) and the development server use.
+"""
+import logging
+import traceback
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+from .models import Job
+
+MAX_ATTEMPTS = 3
+VISIBILITY_TIMEOUT = timezone.timedelta(minutes=10)
+
+logger = logging.getLogger(__name__)
+
+_tasks = {}
+
+
+def task(function):
+    """Registers a function as a task that can be enqueued"""
+    _tasks[task_name(function)] = function
+    return function
+
+
+def task_name(function):
+    return f"{function.__module__}.{function.__name__}"
+
+
+def enqueue(function, **kwargs):
+    """Runs the task with the given keyword arguments on the job queue (immediately with JOBS_EAGER)"""
+    if getattr(settings, 'JOBS_EAGER', False):
+        function(**kwargs)
+        return None
+    return Job.objects.create(task=task_name(function), payload=kwargs)
+
+
+def claim_next_job():
+    """Claims the oldest pending job, returning None if there is none. Jobs claimed by another worker in the meantime
+    are skipped."""
+    for job in Job.objects.filter(status=Job.PENDING).order_by('id')[:10]:
+        claimed = Job.objects.filter(pk=job.pk, status=Job.PENDING).update(
+            status=Job.RUNNING, attempts=models.F('attempts') + 1, claimed_at=timezone.now()
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+    return None
+
+
+def requeue_stalled_jobs():
+    """Puts the jobs claimed more than VISIBILITY_TIMEOUT ago and still running back in the queue, or marks them as
+    failed once they have been attempted MAX_ATTEMPTS times. Returns the number of jobs requeued or failed."""
+    stalled = Job.objects.filter(
+        models.Q(claimed_at__lt=timezone.now() - VISIBILITY_TIMEOUT) | models.Q(claimed_at__isnull=True),
+        status=Job.RUNNING
+    )
+    failed = stalled.filter(attempts__gte=MAX_ATTEMPTS).update(
+        status=Job.FAILED, error="The worker running the job stopped before it finished."
+    )
+    requeued = stalled.filter(attempts__lt=MAX_ATTEMPTS).update(status=Job.PENDING, claimed_at=None)
+    return failed + requeued
+
+
+def run_job(job):
+    """Runs a claimed job, putting it back in the queue if it fails and can be retried"""
+    try:
+        _tasks[job.task](**job.payload)
+    except Exception:
+        error = traceback.format_exc()
+        logger.error("Job %s (%s) failed: %s", job.pk, job.task, error)
+        status = Job.PENDING if job.attempts < MAX_ATTEMPTS else Job.FAILED
+        Job.objects.filter(pk=job.pk).update(status=status, error=error)
+    else:
+        Job.objects.filter(pk=job.pk).update(status=Job.DONE, error="")
+
+
+def run_pending_jobs():
+    """Runs pending jobs (stalled jobs included) until the queue is empty and returns the number of jobs run"""
+    requeue_stalled_jobs()
+    count = 0
+    job = claim_next_job()
+    while job is not None:
+        run_job(job)
+        count += 1
+        job = claim_next_job()
+    return count
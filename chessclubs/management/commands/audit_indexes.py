@@ -0,0 +1,38 @@
+"""Audit of the index coverage of the hot queries."""
+from django.core.management.base import BaseCommand, CommandError
+
+from chessclubs.index_audit import audit
+
+
+class Command(BaseCommand):
+    help = "Explains the queries of the hot paths (permission checks, role resolution, schedule loads, result entry) " \
+           "and flags those scanning or sorting a table without an index"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-plans', action='store_true', help="Print the plan of every query")
+        parser.add_argument('--fail-on-scan', action='store_true',
+                            help="Exit with an error if a query scans or sorts a table without an index")
+
+    def handle(self, *args, **options):
+        plans = audit()
+        flagged = [plan for plan in plans if plan.flagged]
+        for plan in plans:
+            if not (plan.flagged or options['verbose_plans']):
+                continue
+            style = self.style.WARNING if plan.flagged else self.style.SUCCESS
+            self.stdout.write(style(f"[{plan.path}] {plan.sql}"))
+            for line in plan.plan:
+                self.stdout.write(f"    {line}")
+            for table in plan.full_scans:
+                self.stdout.write(self.style.WARNING(f"    full scan of {table}"))
+            for table in plan.sorts:
+                self.stdout.write(self.style.WARNING(f"    sort of {table} without an index"))
+            for table, columns in plan.recommendations:
+                self.stdout.write(self.style.NOTICE(f"    recommended index: {table} ({', '.join(columns)})"))
+
+        recommendations = sorted({(table, tuple(columns)) for plan in flagged for table, columns in plan.recommendations})
+        self.stdout.write(f"{len(plans)} queries explained, {len(flagged)} flagged")
+        for table, columns in recommendations:
+            self.stdout.write(self.style.NOTICE(f"Missing index: {table} ({', '.join(columns)})"))
+        if flagged and options['fail_on_scan']:
+            raise CommandError(f"{len(flagged)} queries scan or sort a table without an index")
@@ -0,0 +1,40 @@
+"""Worker running the jobs of the local job queue."""
+import multiprocessing
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from chessclubs.jobs import run_pending_jobs
+
+
+def work(poll_interval, once):
+    """Runs pending jobs, waiting poll_interval seconds whenever the queue is empty (returns once it is with once)"""
+    while True:
+        run_pending_jobs()
+        if once:
+            return
+        time.sleep(poll_interval)
+
+
+class Command(BaseCommand):
+    help = "Runs the jobs of the job queue (e.g. notification fan-out) in worker processes"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=1, help="Number of worker processes")
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help="Seconds to wait before polling an empty queue again")
+        parser.add_argument('--once', action='store_true', help="Exit once the queue is empty")
+
+    def handle(self, *args, **options):
+        if options['workers'] <= 1:
+            work(options['poll_interval'], options['once'])
+            return
+        # Each worker process opens its own database connection
+        connections.close_all()
+        workers = [multiprocessing.Process(target=work, args=(options['poll_interval'], options['once']))
+                   for worker in range(options['workers'])]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
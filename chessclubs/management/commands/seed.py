@@ -1,12 +1,69 @@
 """The database seeder."""
+from django.contrib.auth.hashers import make_password
 from django.core.management.base import BaseCommand, CommandError
-from django.db import IntegrityError
+from django.db import IntegrityError, connection, connections, transaction
 from faker import Faker
+import multiprocessing
 import random
-from chessclubs.models import User, Club, Tournament
+import time
+from chessclubs.models import User, Club, Tournament, TOURNAMENT_MIN_CAPACITY
+from chessclubs.seeding import bulk_add_members, bulk_add_participants, bulk_add_to_group, bulk_create_users
 from django.utils import timezone
 from chessclubs.tests.helpers import enter_results_to_all_matches
 
+# Size of the dataset seeded with --scale
+SCALE_USERS = 100000
+SCALE_CLUBS = 1000
+SCALE_TOURNAMENTS_PER_CLUB = 3
+
+# Shape of the clubs and tournaments seeded with --scale: average number of clubs each user is a member of, officers
+# and applicants of each club, and capacities of the tournaments
+SCALE_MEMBERSHIPS_PER_USER = 2
+SCALE_OFFICERS_PER_CLUB = 5
+SCALE_APPLICANTS_PER_CLUB = 10
+SCALE_TOURNAMENT_CAPACITIES = [16, 32, 64, 96]
+
+
+def seed_clubs_at_scale(club_indexes, users, members_per_club, tournaments_per_club, random_seed):
+    """Seeds the clubs of the given indexes, each with its members (officers included), applicants and tournaments,
+    drawn from users. Each club is seeded in one transaction, and its members and participants are written in bulk."""
+    for index in club_indexes:
+        rng = random.Random(random_seed + index)
+        with transaction.atomic():
+            owner = users[rng.randrange(len(users))]
+            club = Club.objects.create(name=f"Scale Club {index}", location="London",
+                                       description=f"Club {index} of the scaled dataset", owner=owner)
+            club.members.add(owner)
+            club.assign_club_groups_permissions()
+            sample_size = min(len(users), members_per_club + SCALE_APPLICANTS_PER_CLUB + 1)
+            others = [user for user in rng.sample(users, sample_size) if user != owner]
+            officers = others[:SCALE_OFFICERS_PER_CLUB]
+            members = others[SCALE_OFFICERS_PER_CLUB:members_per_club]
+            applicants = others[members_per_club:]
+            bulk_add_members(club, officers, role="officers")
+            bulk_add_members(club, members)
+            bulk_add_to_group(club, "applicants", applicants)
+            for number in range(tournaments_per_club):
+                _seed_tournament_at_scale(club, number, officers + members, rng)
+
+
+def _seed_tournament_at_scale(club, number, candidates, rng):
+    """Seeds a tournament of the club, open for applications, waiting to start or started (in turn)"""
+    state = number % 3
+    if state == 0:
+        deadline = timezone.now() + timezone.timedelta(days=7)
+    else:
+        deadline = timezone.now() - timezone.timedelta(days=number + 1)
+    capacity = rng.choice(SCALE_TOURNAMENT_CAPACITIES)
+    tournament = Tournament.objects.create(name=f"{club.name} Cup {number}", description=f"Tournament of {club.name}",
+                                           location=club.location, max_capacity=capacity, deadline=deadline,
+                                           organiser=club.owner, club=club)
+    tournament.assign_tournament_permissions_and_groups()
+    participants = rng.sample(candidates, min(capacity, len(candidates)))
+    bulk_add_participants(tournament, participants)
+    if state == 2 and len(participants) >= TOURNAMENT_MIN_CAPACITY:
+        tournament.start_tournament()
+
 
 class Command(BaseCommand):
     PASSWORD = "Password123"
@@ -27,7 +84,21 @@ class Command(BaseCommand):
         super().__init__()
         self.faker = Faker('en_GB')
 
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', action='store_true',
+                            help="Seed a production-sized dataset with bulk inserts instead of the demo dataset")
+        parser.add_argument('--users', type=int, default=SCALE_USERS, help="Number of users seeded with --scale")
+        parser.add_argument('--clubs', type=int, default=SCALE_CLUBS, help="Number of clubs seeded with --scale")
+        parser.add_argument('--tournaments-per-club', type=int, default=SCALE_TOURNAMENTS_PER_CLUB,
+                            help="Number of tournaments of each club seeded with --scale")
+        parser.add_argument('--workers', type=int, default=1,
+                            help="Number of processes seeding the clubs with --scale (a single one on SQLite)")
+        parser.add_argument('--random-seed', type=int, default=0, help="Seed of the random choices of --scale")
+
     def handle(self, *args, **options):
+        if options['scale']:
+            self._seed_at_scale(options)
+            return
         user_count = 0
         club_count = 0
         tournament_count = 0
@@ -58,18 +129,6 @@ class Command(BaseCommand):
             club1.members.add(Command.JEB)
             club1.add_to_officers_group(Command.JEB)
             club3.add_member(Command.BILLIE)
-            kerbal.add_to_logged_in_non_members_group(Command.CLUB1OWNER)
-            kerbal.add_to_logged_in_non_members_group(Command.CLUB3OWNER)
-            club1.add_to_logged_in_non_members_group(Command.CLUB3OWNER)
-            club1.add_to_logged_in_non_members_group(Command.VALENTINA)
-            club1.add_to_logged_in_non_members_group(Command.BILLIE)
-            club2.add_to_logged_in_non_members_group(Command.CLUB1OWNER)
-            club2.add_to_logged_in_non_members_group(Command.CLUB3OWNER)
-            club2.add_to_logged_in_non_members_group(Command.BILLIE)
-            club2.add_to_logged_in_non_members_group(Command.JEB)
-            club3.add_to_logged_in_non_members_group(Command.VALENTINA)
-            club3.add_to_logged_in_non_members_group(Command.JEB)
-            club3.add_to_logged_in_non_members_group(Command.CLUB1OWNER)
         except IntegrityError:
             print("You have already created the specific clubs")
 
@@ -86,7 +145,6 @@ class Command(BaseCommand):
             try:
                 club = self._create_club()
                 self._assign_random_users_to_club_groups(club)
-                self._assign_existing_users_to_non_logged_in_group(club)
                 club_count += 1
             except IntegrityError:
                 print("This club already exists")
@@ -94,7 +152,6 @@ class Command(BaseCommand):
 
         for club in Command.SPECIFIC_CLUBS_LIST:
             self._assign_random_users_to_club_groups(club)
-            self._assign_existing_users_to_non_logged_in_group(club)
 
         try:
             deadline1 = timezone.now() - timezone.timedelta(days=1)
@@ -149,6 +206,51 @@ class Command(BaseCommand):
 
         print(f'Seeding complete: {club_count} clubs, {user_count} users, and {tournament_count} tournaments')
 
+    def _seed_at_scale(self, options):
+        """Seeds users, clubs and tournaments in bulk: users are written with a password hashed once, and the clubs
+        (with their members and tournaments) are split between worker processes"""
+        if options['users'] < SCALE_OFFICERS_PER_CLUB + 2 or options['clubs'] < 1:
+            raise CommandError("The scaled dataset needs at least one club and some users")
+        start = time.perf_counter()
+        self.faker.seed_instance(options['random_seed'])
+        rng = random.Random(options['random_seed'])
+        users = bulk_create_users([
+            {'email': f'scale.user{index}@example.org', 'first_name': self.faker.first_name(),
+             'last_name': self.faker.last_name(), 'bio': "Member of the scaled dataset",
+             'chess_experience': rng.choice(User.CHESS_EXPERIENCE_CHOICES)[0],
+             'personal_statement': "I play chess"}
+            for index in range(options['users'])
+        ], password_hash=make_password(Command.PASSWORD))
+        self.stdout.write(f"Created {len(users)} users in {time.perf_counter() - start:.1f}s")
+
+        club_indexes = list(range(options['clubs']))
+        members_per_club = max(SCALE_OFFICERS_PER_CLUB + 1,
+                               len(users) * SCALE_MEMBERSHIPS_PER_USER // len(club_indexes))
+        workers = max(1, min(options['workers'], len(club_indexes)))
+        if workers > 1 and connection.vendor == 'sqlite':
+            # SQLite locks the whole database on writes: concurrent workers would fail with "database is locked"
+            self.stdout.write(self.style.NOTICE("SQLite serialises writes: seeding the clubs in a single process"))
+            workers = 1
+        arguments = [(club_indexes[worker::workers], users, members_per_club, options['tournaments_per_club'],
+                      options['random_seed'])
+                     for worker in range(workers)]
+        if workers == 1:
+            seed_clubs_at_scale(*arguments[0])
+        else:
+            # Each worker process opens its own database connection
+            connections.close_all()
+            processes = [multiprocessing.Process(target=seed_clubs_at_scale, args=worker_arguments)
+                         for worker_arguments in arguments]
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+            if any(process.exitcode != 0 for process in processes):
+                raise CommandError("A worker failed to seed its clubs")
+        tournament_count = options['clubs'] * options['tournaments_per_club']
+        self.stdout.write(f"Seeding complete: {options['clubs']} clubs, {len(users)} users, and {tournament_count} "
+                          f"tournaments in {time.perf_counter() - start:.1f}s")
+
     def _create_user(self):
         """Creating generic user."""
 
@@ -171,8 +273,6 @@ class Command(BaseCommand):
         club = Club.objects.create(name=name, location=location, description=description, owner=owner)
         club.members.add(owner)
         club.assign_club_groups_permissions()
-        for specific_user in Command.SPECIFIC_USERS_LIST:
-            club.add_to_logged_in_non_members_group(specific_user)
         return club
 
     def enter_results_until_finished(self, tournament):
@@ -222,15 +322,11 @@ class Command(BaseCommand):
             elif group == "member":
                 club.add_member(user)
             elif group == "logged_in_non_member":
-                club.add_to_logged_in_non_members_group(user)
+                # Users without a role in the club are implicitly authenticated non-members
+                continue
             else:
                 print("No group assigned")
 
-    def _assign_existing_users_to_non_logged_in_group(self, club):
-        for user in User.objects.all():
-            if not (user in Command.RANDOM_USERS_LIST or user in Command.SPECIFIC_USERS_LIST):
-                club.add_to_logged_in_non_members_group(user)
-
     def _email(self, first_name, last_name):
         email = '' + first_name.lower() + '.' + last_name.lower() + '@example.org'
         return email
@@ -0,0 +1,201 @@
+"""In-process metrics of the requests served, by view.
+
+The request metrics middleware (see middleware.py) records, for each request, the number of SQL queries it ran, the
+time spent in the database, the time spent rendering templates and its wall time, under the URL name of the view that
+served it (e.g. show_club). Each of these is aggregated into a histogram per view, and the histograms are exposed in
+the Prometheus text format by the metrics view. The histograms are kept in the memory of the process serving the
+requests, so each worker process exposes its own.
+
+Template render time is measured by the TimedDjangoTemplates backend, which has to be the template backend of the site
+(see TEMPLATES in the settings).
+
+Views can be given a query budget with the VIEW_QUERY_BUDGETS setting: a request running more queries than the budget
+of its view is logged, or raises QueryBudgetExceeded with the QUERY_BUDGETS_RAISE setting (which the test runner sets).
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.template.backends.django import DjangoTemplates
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the histogram buckets of query counts and of durations (in seconds)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Name, description and buckets of the metrics recorded for each request
+METRICS = {
+    'queries': ('wildebeest_view_queries', "Number of SQL queries run by a request", QUERY_BUCKETS),
+    'db_time': ('wildebeest_view_db_seconds', "Time spent running SQL queries in a request", SECONDS_BUCKETS),
+    'template_time': ('wildebeest_view_template_seconds', "Time spent rendering templates in a request",
+                      SECONDS_BUCKETS),
+    'wall_time': ('wildebeest_view_seconds', "Wall time of a request", SECONDS_BUCKETS),
+}
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class Histogram:
+    """Counts of observed values by bucket, with their sum and count"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[index] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+    def cumulative_counts(self):
+        """Returns the number of observed values lower than or equal to each bucket bound, in order"""
+        counts = []
+        total = 0
+        for bucket_count in self.bucket_counts:
+            total += bucket_count
+            counts.append(total)
+        return counts
+
+
+class MetricsRegistry:
+    """Histograms of the metrics of the requests served by this process, by metric and view"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+
+    def observe(self, view, **values):
+        """Records the metrics of a request served by the view, e.g. observe('show_club', queries=3, wall_time=0.1)"""
+        with self._lock:
+            for metric, value in values.items():
+                histogram = self._histograms.get((metric, view))
+                if histogram is None:
+                    histogram = self._histograms[(metric, view)] = Histogram(METRICS[metric][2])
+                histogram.observe(value)
+
+    def get(self, metric, view):
+        """Returns the histogram of the metric for the view, or None if the view has served no request"""
+        return self._histograms.get((metric, view))
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+
+    def render(self):
+        """Returns all the histograms in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for metric, (name, description, buckets) in METRICS.items():
+                lines.append(f"# HELP {name} {description}")
+                lines.append(f"# TYPE {name} histogram")
+                views = sorted(view for histogram_metric, view in self._histograms if histogram_metric == metric)
+                for view in views:
+                    histogram = self._histograms[(metric, view)]
+                    for bound, count in zip(buckets, histogram.cumulative_counts()):
+                        lines.append(f'{name}_bucket{{view="{view}",le="{_format(bound)}"}} {count}')
+                    lines.append(f'{name}_bucket{{view="{view}",le="+Inf"}} {histogram.count}')
+                    lines.append(f'{name}_sum{{view="{view}"}} {_format(histogram.sum)}')
+                    lines.append(f'{name}_count{{view="{view}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+
+def _format(value):
+    return repr(float(value))
+
+
+registry = MetricsRegistry()
+
+_local = threading.local()
+
+
+class RequestMetrics:
+    """Metrics of the request being served, collected by wrapping the execution of its queries (see
+    connection.execute_wrapper) and the rendering of its templates"""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self._rendering = False
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.queries += 1
+
+    @contextmanager
+    def timing_template(self):
+        """Adds the time spent in the block to the template render time of the request. Templates rendered inside
+        another one (e.g. included) are timed with it: the nested block yields False and is not timed again."""
+        if self._rendering:
+            yield False
+            return
+        self._rendering = True
+        start = time.perf_counter()
+        try:
+            yield True
+        finally:
+            self.template_time += time.perf_counter() - start
+            self._rendering = False
+
+    def activate(self):
+        _local.request_metrics = self
+
+    def deactivate(self):
+        _local.request_metrics = None
+
+
+def get_request_metrics():
+    """Returns the metrics of the request being served by this thread, or None if there is none"""
+    return getattr(_local, 'request_metrics', None)
+
+
+def check_query_budget(view, queries):
+    """Logs (or raises, with QUERY_BUDGETS_RAISE) a request of the view that ran more queries than its budget"""
+    budget = getattr(settings, 'VIEW_QUERY_BUDGETS', {}).get(view)
+    if budget is None or queries <= budget:
+        return
+    message = f"View {view} ran {queries} queries, over its budget of {budget}"
+    if getattr(settings, 'QUERY_BUDGETS_RAISE', False):
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+class TimedTemplate:
+    """A template of the Django template backend that adds its render time to the metrics of the request"""
+
+    def __init__(self, template):
+        self._template = template
+
+    def __getattr__(self, name):
+        return getattr(self._template, name)
+
+    def render(self, context=None, request=None):
+        metrics = get_request_metrics()
+        if metrics is None:
+            return self._template.render(context, request)
+        with metrics.timing_template():
+            return self._template.render(context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """The Django template backend, timing the templates it renders"""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
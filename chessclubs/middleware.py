@@ -0,0 +1,37 @@
+"""Middleware of the chessclubs app."""
+import time
+from contextlib import ExitStack
+
+from django.db import connections
+
+from .metrics import RequestMetrics, check_query_budget, registry
+
+# Name under which requests that did not resolve to a view (e.g. 404s) are recorded
+UNRESOLVED_VIEW = "unresolved"
+
+
+class RequestMetricsMiddleware:
+    """Records the queries, database time, template render time and wall time of each request under the URL name of
+    its view (see metrics.py), and checks the query budget of the view"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        metrics.activate()
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            metrics.deactivate()
+        wall_time = time.perf_counter() - start
+        resolver_match = getattr(request, 'resolver_match', None)
+        view = resolver_match.url_name if resolver_match and resolver_match.url_name else UNRESOLVED_VIEW
+        registry.observe(view, queries=metrics.queries, db_time=metrics.db_time,
+                         template_time=metrics.template_time, wall_time=wall_time)
+        check_query_budget(view, metrics.queries)
+        return response
@@ -0,0 +1,32 @@
+from django.db import migrations, transaction
+
+BATCH_SIZE = 1000
+
+
+def drop_authenticated_non_member_memberships(apps, schema_editor):
+    """Removes every user from the authenticated non-member groups of the clubs, in batches.
+
+    Authenticated users without a role in a club are now implicitly authenticated non-members, so these groups
+    only carry the permissions of the role."""
+    User = apps.get_model('chessclubs', 'User')
+    memberships = User.groups.through.objects.using(schema_editor.connection.alias).filter(
+        group__name__endswith="_authenticated_non_members"
+    )
+    while True:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            batch = list(memberships.values_list('id', flat=True)[:BATCH_SIZE])
+            if not batch:
+                break
+            User.groups.through.objects.using(schema_editor.connection.alias).filter(id__in=batch).delete()
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('chessclubs', '0006_alter_club_options'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_authenticated_non_member_memberships, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.5 on 2026-10-18 04:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chessclubs', '0007_drop_authenticated_non_member_memberships'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='match',
+            index=models.Index(fields=['tournament', '_open'], name='chessclubs__tournam_f36e89_idx'),
+        ),
+    ]
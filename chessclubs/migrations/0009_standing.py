@@ -0,0 +1,95 @@
+# Generated by Django 3.2.5 on 2026-10-18 04:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Copies of chessclubs.standings as of this migration, so that later changes to the app do not change what it does
+WIN_POINTS = 1.0
+DRAW_POINTS = 0.5
+
+
+def add_result(standings, player1_id, player2_id, winner_id):
+    if winner_id is None:
+        for player_id in (player1_id, player2_id):
+            standings[player_id].points += DRAW_POINTS
+            standings[player_id].draws += 1
+    else:
+        loser_id = player2_id if winner_id == player1_id else player1_id
+        standings[winner_id].points += WIN_POINTS
+        standings[winner_id].wins += 1
+        standings[loser_id].losses += 1
+
+
+def rank(standings, results):
+    for standing in standings.values():
+        standing.head_to_head = 0.0
+        standing.sonneborn_berger = 0.0
+    for player1_id, player2_id, winner_id in results:
+        first, second = standings[player1_id], standings[player2_id]
+        if winner_id is None:
+            scores = ((first, second, DRAW_POINTS), (second, first, DRAW_POINTS))
+        elif winner_id == player1_id:
+            scores = ((first, second, WIN_POINTS),)
+        else:
+            scores = ((second, first, WIN_POINTS),)
+        for standing, opponent, score in scores:
+            standing.sonneborn_berger += score * opponent.points
+            if standing.points == opponent.points:
+                standing.head_to_head += score
+
+    ranking = sorted(standings.values(), key=lambda standing: (
+        -standing.points, -standing.head_to_head, -standing.sonneborn_berger, -standing.wins, standing.player_id
+    ))
+    for position, standing in enumerate(ranking, start=1):
+        standing.rank = position
+    return ranking
+
+
+def build_standings(apps, schema_editor):
+    """Creates the standings of the players of the existing pools from the results already entered"""
+    Pool = apps.get_model('chessclubs', 'Pool')
+    PoolMatch = apps.get_model('chessclubs', 'PoolMatch')
+    Standing = apps.get_model('chessclubs', 'Standing')
+    db_alias = schema_editor.connection.alias
+    for pool in Pool.objects.using(db_alias).prefetch_related('pool_players'):
+        standings = {player.id: Standing(pool=pool, player=player) for player in pool.pool_players.all()}
+        results = list(PoolMatch.objects.using(db_alias).filter(pool=pool, _open=False).values_list(
+            '_player1_id', '_player2_id', '_winner_id'
+        ))
+        for result in results:
+            add_result(standings, *result)
+        Standing.objects.using(db_alias).bulk_create(rank(standings, results))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chessclubs', '0008_match_tournament_open_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Standing',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('points', models.FloatField(default=0.0)),
+                ('wins', models.PositiveIntegerField(default=0)),
+                ('draws', models.PositiveIntegerField(default=0)),
+                ('losses', models.PositiveIntegerField(default=0)),
+                ('head_to_head', models.FloatField(default=0.0)),
+                ('sonneborn_berger', models.FloatField(default=0.0)),
+                ('rank', models.PositiveIntegerField(default=0)),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='standings', to='chessclubs.player')),
+                ('pool', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='standings', to='chessclubs.pool')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='standing',
+            index=models.Index(fields=['pool', 'rank'], name='chessclubs__pool_id_c1b398_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='standing',
+            unique_together={('pool', 'player')},
+        ),
+        migrations.RunPython(build_standings, migrations.RunPython.noop),
+    ]
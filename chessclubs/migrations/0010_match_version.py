@@ -0,0 +1,18 @@
+# Generated by Django 3.2.5 on 2026-10-18 05:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chessclubs', '0009_standing'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='match',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
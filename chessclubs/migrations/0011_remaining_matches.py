@@ -0,0 +1,55 @@
+# Generated by Django 3.2.5 on 2026-10-18 05:33
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_remaining_matches(apps, schema_editor):
+    """Sets the remaining matches counters of the existing pools, pool phases and elimination rounds from their open
+    matches"""
+    db_alias = schema_editor.connection.alias
+    PoolMatch = apps.get_model('chessclubs', 'PoolMatch')
+    EliminationMatch = apps.get_model('chessclubs', 'EliminationMatch')
+
+    def open_matches(matches, field):
+        return Coalesce(Subquery(
+            matches.objects.using(db_alias).filter(**{field: OuterRef('pk')}, _open=True).order_by().values(field)
+            .annotate(count=Count('pk')).values('count')
+        ), 0)
+
+    apps.get_model('chessclubs', 'Pool').objects.using(db_alias).update(
+        remaining_matches=open_matches(PoolMatch, 'pool')
+    )
+    apps.get_model('chessclubs', 'PoolPhase').objects.using(db_alias).update(
+        remaining_matches=open_matches(PoolMatch, 'pool__pool_phase')
+    )
+    apps.get_model('chessclubs', 'EliminationRounds').objects.using(db_alias).update(
+        remaining_matches=open_matches(EliminationMatch, 'elimination_round')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chessclubs', '0010_match_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='eliminationrounds',
+            name='remaining_matches',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='pool',
+            name='remaining_matches',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='poolphase',
+            name='remaining_matches',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_remaining_matches, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,55 @@
+from django.db import migrations, models, transaction
+from django.db.models import OuterRef, Subquery
+import django.db.models.deletion
+
+BATCH_SIZE = 1000
+
+
+def move_matches_to_single_table(apps, schema_editor):
+    """Copies the kind, pool and elimination round of the pool and elimination matches to the Match table, in
+    batches"""
+    db_alias = schema_editor.connection.alias
+    Match = apps.get_model('chessclubs', 'Match')
+    for model_name, kind, field in (('PoolMatch', 'pool', 'pool'),
+                                    ('EliminationMatch', 'elimination', 'elimination_round')):
+        child_matches = apps.get_model('chessclubs', model_name).objects.using(db_alias)
+        last_id = 0
+        while True:
+            with transaction.atomic(using=db_alias):
+                batch = list(child_matches.filter(match_ptr_id__gt=last_id).order_by('match_ptr_id').values_list(
+                    'match_ptr_id', flat=True
+                )[:BATCH_SIZE])
+                if not batch:
+                    break
+                Match.objects.using(db_alias).filter(id__in=batch).update(**{
+                    'kind': kind,
+                    f'match_{field}': Subquery(child_matches.filter(match_ptr_id=OuterRef('pk')).values(field)[:1]),
+                })
+                last_id = batch[-1]
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('chessclubs', '0011_remaining_matches'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='match',
+            name='kind',
+            field=models.CharField(choices=[('match', 'Match'), ('pool', 'Pool'), ('elimination', 'Elimination')], default='match', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='match_pool',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='chessclubs.pool'),
+        ),
+        migrations.AddField(
+            model_name='match',
+            name='match_elimination_round',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='chessclubs.eliminationrounds'),
+        ),
+        migrations.RunPython(move_matches_to_single_table, migrations.RunPython.noop),
+    ]
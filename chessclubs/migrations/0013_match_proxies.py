@@ -0,0 +1,60 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chessclubs', '0012_single_table_matches'),
+    ]
+
+    operations = [
+        migrations.DeleteModel(
+            name='EliminationMatch',
+        ),
+        migrations.DeleteModel(
+            name='PoolMatch',
+        ),
+        migrations.RenameField(
+            model_name='match',
+            old_name='match_pool',
+            new_name='pool',
+        ),
+        migrations.RenameField(
+            model_name='match',
+            old_name='match_elimination_round',
+            new_name='elimination_round',
+        ),
+        migrations.AlterField(
+            model_name='match',
+            name='pool',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='pool_matches', to='chessclubs.pool'),
+        ),
+        migrations.AlterField(
+            model_name='match',
+            name='elimination_round',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='schedule', to='chessclubs.eliminationrounds'),
+        ),
+        migrations.CreateModel(
+            name='EliminationMatch',
+            fields=[
+            ],
+            options={
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('chessclubs.match',),
+        ),
+        migrations.CreateModel(
+            name='PoolMatch',
+            fields=[
+            ],
+            options={
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('chessclubs.match',),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.5 on 2026-10-18 08:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chessclubs', '0014_job'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='player',
+            index=models.Index(fields=['tournament', '_points'], name='chessclubs__tournam_96a23f_idx'),
+        ),
+    ]
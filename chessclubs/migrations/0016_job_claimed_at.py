@@ -0,0 +1,18 @@
+# Generated by Django 3.2.5 on 2026-10-18 09:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chessclubs', '0015_player_tournament_points_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
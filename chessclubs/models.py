@@ -1,16 +1,20 @@
 """Models in the chessclubs app."""
 
-import random
-
 from django.contrib import auth
 from django.contrib.auth.base_user import BaseUserManager
 from django.contrib.auth.models import AbstractUser, Group, Permission
 from django.core.exceptions import PermissionDenied, ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from libgravatar import Gravatar
 
+from .group_registry import group_registry
+from .pairing import EncounterGraph, draw_pairs, draw_pools
+from .provisioning import provision_permissions
+from .schedule_builder import bulk_create_matches
+from .standings import add_result, rank
+
 TOURNAMENT_MAX_CAPACITY = 96
 TOURNAMENT_MIN_CAPACITY = 2
 
@@ -99,10 +103,24 @@ class User(AbstractUser):
         return self.clubs.all()
 
     def get_all_tournaments(self):
-        tournaments1 = []
-        for player_profile in self.player_profiles.all():
-            tournaments1.append(player_profile.tournament)
-        return tournaments1
+        """Returns the tournaments the user takes part in, with their club and lifecycle state"""
+        return list(Tournament.objects.filter(players__user=self).with_lifecycle().select_related('club').order_by('id'))
+
+    def get_open_matches_by_tournament(self):
+        """Returns a dictionary mapping the unfinished tournaments of the user to the user's open matches in each of
+        them, loaded with two queries. The opponent of the user is set on each match."""
+        player_profiles = {
+            player_profile.id: player_profile for player_profile in self.player_profiles.filter(
+                tournament___finished=False).select_related('tournament__club').order_by('tournament_id')
+        }
+        matches_by_tournament = {player_profile.tournament: [] for player_profile in player_profiles.values()}
+        if player_profiles:
+            for match in Match.objects.open_matches_of_players(player_profiles):
+                player = player_profiles.get(match._player1_id) or player_profiles[match._player2_id]
+                match.tournament = player.tournament
+                match.opponent = match.get_opponent(player)
+                matches_by_tournament[player.tournament].append(match)
+        return matches_by_tournament
 
     def gravatar(self, size=120):
         """Return a URL to the user's gravatar."""
@@ -139,6 +157,12 @@ class User(AbstractUser):
     objects = UserManager()
 
 
+class ClubQuerySet(models.QuerySet):
+    def with_member_count(self):
+        """Annotates the clubs with their number of members (number_of_members)"""
+        return self.annotate(number_of_members=models.Count('members', distinct=True))
+
+
 class Club(models.Model):
     """Model for representing a club"""
     name = models.CharField(max_length=50, blank=False, unique=True, null=False)
@@ -147,6 +171,43 @@ class Club(models.Model):
     owner = models.ForeignKey(User, on_delete=models.CASCADE)
     members = models.ManyToManyField(User, related_name="clubs")  # All members of the club (members, officers, owner)
 
+    objects = ClubQuerySet.as_manager()
+
+    # Role groups of a club (group name suffix, status), ordered by precedence when resolving a user's status.
+    # Authenticated users without any role group implicitly hold the authenticated non-member role: its group only
+    # carries the role's permissions and is never populated.
+    ROLE_GROUPS = [
+        ("authenticated_non_members", "authenticated_non_member_user"),
+        ("applicants", "applicant"),
+        ("denied_applicants", "denied_applicant"),
+        ("members", "member"),
+        ("officers", "officer"),
+        ("accepted_applicants", "accepted_applicant"),
+        ("owner", "owner"),
+    ]
+    GROUP_ROLES = [suffix for suffix, status in ROLE_GROUPS]
+
+    # Roles (group name suffixes) granted each of the base permissions of the Meta class (according to requirements)
+    PERMISSION_ROLES = {
+        "access_club_info": GROUP_ROLES,
+        "access_club_owner_public_info": GROUP_ROLES,
+        "apply_to_club": ["authenticated_non_members"],
+        "acknowledge_response": ["denied_applicants", "accepted_applicants"],
+        "join_tournament": ["officers", "members", "owner"],
+        "access_members_list": ["officers", "members", "owner"],
+        "show_public_info": ["officers", "members", "owner"],
+        "access_club_tournaments": ["officers", "members", "owner"],
+        "show_private_info": ["officers", "owner"],
+        "manage_applications": ["officers", "owner"],
+        "create_tournament": ["officers", "owner"],
+        "leave": ["officers", "members"],
+        "promote": ["owner"],
+        "demote": ["owner"],
+        "transfer_ownership": ["owner"],
+        "ban": ["owner"],
+        "edit_club_info": ["owner"],
+    }
+
     def get_seeder_groups(self):
         groups = ["officer", "applicant", "member", "logged_in_non_member"]
         return groups
@@ -176,7 +237,6 @@ class Club(models.Model):
 
     def remove_member(self, user):
         self.members.remove(user)
-        self.add_to_logged_in_non_members_group(user)
 
     def toggle_membership(self, user):
         if self.is_member(user):
@@ -185,32 +245,26 @@ class Club(models.Model):
             self.add_member(user)
 
     def __members_group(self):
-        members, created = Group.objects.get_or_create(name=f"{self.name}_members")
-        return members
+        return group_registry.get_group(self, "members")
 
     def applicants_group(self):
-        applicants, created = Group.objects.get_or_create(name=f"{self.name}_applicants")
-        return applicants
+        return group_registry.get_group(self, "applicants")
 
     def __denied_applicants_group(self):
-        denied_applicants, created = Group.objects.get_or_create(name=f"{self.name}_denied_applicants")
-        return denied_applicants
+        return group_registry.get_group(self, "denied_applicants")
 
     def __officers_group(self):
-        officers, created = Group.objects.get_or_create(name=f"{self.name}_officers")
-        return officers
+        return group_registry.get_group(self, "officers")
 
-    def __authenticated_non_member_group(self):
-        non_members, created = Group.objects.get_or_create(name=f"{self.name}_authenticated_non_members")
-        return non_members
+    def authenticated_non_member_group(self):
+        """Returns the group carrying the permissions of the implicit authenticated non-member role"""
+        return group_registry.get_group(self, "authenticated_non_members")
 
     def __accepted_applicants_group(self):
-        accepted_applicants, created = Group.objects.get_or_create(name=f"{self.name}_accepted_applicants")
-        return accepted_applicants
+        return group_registry.get_group(self, "accepted_applicants")
 
     def __owner_group(self):
-        owners, created = Group.objects.get_or_create(name=f"{self.name}_owner")
-        return owners
+        return group_registry.get_group(self, "owner")
 
     def add_to_members_group(self, user):
         self.__members_group().user_set.add(user)
@@ -242,12 +296,6 @@ class Club(models.Model):
     def remove_from_officers_group(self, user):
         self.__officers_group().user_set.remove(user)
 
-    def add_to_logged_in_non_members_group(self, user):
-        self.__authenticated_non_member_group().user_set.add(user)
-
-    def remove_from_logged_in_non_members_group(self, user):
-        self.__authenticated_non_member_group().user_set.remove(user)
-
     def owner_count(self):
         return self.__owner_group().user_set.all().count()
 
@@ -260,110 +308,69 @@ class Club(models.Model):
         self.__owner_group().user_set.add(user)
         self.add_to_officers_group(self.owner)
 
+    def __role_group_names(self):
+        """Returns the names of the club's role groups, ordered by status precedence"""
+        return [f"{self.name}_{suffix}" for suffix, status in Club.ROLE_GROUPS]
+
+    def __status_from_group_names(self, group_names):
+        """Returns the status given by the role group of highest precedence among group_names"""
+        for group_name, (suffix, status) in zip(self.__role_group_names(), Club.ROLE_GROUPS):
+            if group_name in group_names:
+                return status
+        return "authenticated_non_member_user"
+
     def user_status(self, user):
         """Returns the status of a given user in the club (assumes a user belongs to one and only one group of each club)"""
-        if user in self.__authenticated_non_member_group().user_set.all():
-            return "authenticated_non_member_user"
-        elif user in self.applicants_group().user_set.all():
-            return "applicant"
-        elif user in self.__denied_applicants_group().user_set.all():
-            return "denied_applicant"
-        elif user in self.__members_group().user_set.all():
-            return "member"
-        elif user in self.__officers_group().user_set.all():
-            return "officer"
-        elif user in self.__accepted_applicants_group().user_set.all():
-            return "accepted_applicant"
-        elif user in self.__owner_group().user_set.all():
-            return "owner"
-        else:
+        if not user.is_authenticated:
             return "anonymous"
+        group_names = set(user.groups.filter(name__in=self.__role_group_names()).values_list('name', flat=True))
+        return self.__status_from_group_names(group_names)
+
+    def user_statuses(self, users=None):
+        """Returns a dictionary mapping user ids to their status in the club, resolved with a single query.
+        Without users, only the users holding a role group in the club are included."""
+        memberships = User.groups.through.objects.filter(group__name__in=self.__role_group_names())
+        if users is not None:
+            users = list(users)
+            memberships = memberships.filter(user__in=users)
+        group_names_of_users = {}
+        for user_id, group_name in memberships.values_list('user_id', 'group__name'):
+            group_names_of_users.setdefault(user_id, set()).add(group_name)
+        statuses = {user_id: self.__status_from_group_names(group_names)
+                    for user_id, group_names in group_names_of_users.items()}
+        if users is not None:
+            for user in users:
+                statuses.setdefault(user.id, "authenticated_non_member_user")
+        return statuses
+
+    def get_officer_and_owner_ids(self):
+        """Returns the ids of the officers and owner of the club, resolved with a single query"""
+        return list(User.groups.through.objects.filter(
+            group__name__in=[f"{self.name}_officers", f"{self.name}_owner"]
+        ).values_list('user_id', flat=True).distinct())
+
+    @classmethod
+    def statuses_of_user(cls, user):
+        """Returns a dictionary mapping each club in which the user holds a role to the user's status in it"""
+        group_names = set(user.groups.values_list('name', flat=True))
+        candidate_club_names = set()
+        for group_name in group_names:
+            for suffix, status in cls.ROLE_GROUPS:
+                if group_name.endswith(f"_{suffix}"):
+                    candidate_club_names.add(group_name[:-len(suffix) - 1])
+        statuses = {}
+        for club in cls.objects.filter(name__in=candidate_club_names):
+            statuses[club] = club.__status_from_group_names(group_names)
+        return statuses
 
     def assign_club_groups_permissions(self):
         """Create and assign club-specific permissions to the club's groups and owner"""
-        # Get the base permissions from the Club model Meta class
-        access_club_info_perm = Permission.objects.get(codename="access_club_info")
-        access_club_owner_info_perm = Permission.objects.get(codename="access_club_owner_public_info")
-        members_list_perm = Permission.objects.get(codename='access_members_list')
-        public_perm = Permission.objects.get(codename='show_public_info')
-        private_perm = Permission.objects.get(codename='show_private_info')
-        manage_applications_perm = Permission.objects.get(codename='manage_applications')
-        promote_perm = Permission.objects.get(codename='promote')
-        demote_perm = Permission.objects.get(codename='demote')
-        transfer_ownership_perm = Permission.objects.get(codename='transfer_ownership')
-        acknowledge_response_perm = Permission.objects.get(codename='acknowledge_response')
-        apply_to_club_perm = Permission.objects.get(codename='apply_to_club')
-        ban_perm = Permission.objects.get(codename='ban')
-        leave_perm = Permission.objects.get(codename='leave')
-        tournament_perm = Permission.objects.get(codename='create_tournament')
-        join_tournament_perm = Permission.objects.get(codename="join_tournament")
-        edit_club_info_perm = Permission.objects.get(codename="edit_club_info")
-        access_club_tournaments_perm = Permission.objects.get(codename="access_club_tournaments")
-
-        # Create the club-specific permissions using the ClubPermission Model
-        access_club_info, created = ClubPermission.objects.get_or_create(club=self,
-                                                                         base_permission=access_club_info_perm)
-        access_club_owner_info, created = ClubPermission.objects.get_or_create(club=self,
-                                                                               base_permission=access_club_owner_info_perm)
-        members_list, created = ClubPermission.objects.get_or_create(club=self, base_permission=members_list_perm)
-        public, created = ClubPermission.objects.get_or_create(club=self, base_permission=public_perm)
-        private, created = ClubPermission.objects.get_or_create(club=self, base_permission=private_perm)
-        manage_applications, created = ClubPermission.objects.get_or_create(club=self,
-                                                                            base_permission=manage_applications_perm)
-        promote, created = ClubPermission.objects.get_or_create(club=self, base_permission=promote_perm)
-        demote, created = ClubPermission.objects.get_or_create(club=self, base_permission=demote_perm)
-        transfer_ownership, created = ClubPermission.objects.get_or_create(club=self,
-                                                                           base_permission=transfer_ownership_perm)
-        acknowledge_response, created = ClubPermission.objects.get_or_create(club=self,
-                                                                             base_permission=acknowledge_response_perm)
-
-        apply_to_club, created = ClubPermission.objects.get_or_create(club=self,
-                                                                      base_permission=apply_to_club_perm)
-        ban, created = ClubPermission.objects.get_or_create(club=self,
-                                                            base_permission=ban_perm)
-        leave, created = ClubPermission.objects.get_or_create(club=self,
-                                                              base_permission=leave_perm)
-        create_tournament, created = ClubPermission.objects.get_or_create(club=self,
-                                                                          base_permission=tournament_perm)
-        join_tournament, created = ClubPermission.objects.get_or_create(club=self,
-                                                                        base_permission=join_tournament_perm)
-        edit_club_info, created = ClubPermission.objects.get_or_create(club=self,
-                                                                       base_permission=edit_club_info_perm)
-        access_club_tournaments, created = ClubPermission.objects.get_or_create(club=self,
-                                                                                base_permission=access_club_tournaments_perm)
-
-        # Assign the appropriate groups to the club-specific permissions (according to requirements)
-        groups = [self.__officers_group(), self.applicants_group(), self.__denied_applicants_group(),
-                  self.__authenticated_non_member_group(), self.__members_group(), self.__accepted_applicants_group(),
-                  self.__owner_group()]
-        access_club_info.set_groups(groups)
-        access_club_owner_info.set_groups(groups)
-        groups = [self.__authenticated_non_member_group()]
-        apply_to_club.set_groups(groups)
-        groups = [self.__denied_applicants_group(), self.__accepted_applicants_group()]
-        acknowledge_response.set_groups(groups)
-        groups = [self.__officers_group(), self.__members_group(), self.__owner_group()]
-        join_tournament.set_groups(groups)
-        members_list.set_groups(groups)
-        public.set_groups(groups)
-        access_club_tournaments.set_groups(groups)
-        groups = [self.__officers_group(), self.__owner_group()]
-        private.set_groups(groups)
-        manage_applications.set_groups(groups)
-        create_tournament.set_groups(groups)
-        groups = [self.__officers_group(), self.__members_group()]
-        leave.set_groups(groups)
-        groups = [self.__owner_group()]
-        promote.set_groups(groups)
-        demote.set_groups(groups)
-        transfer_ownership.set_groups(groups)
-        ban.set_groups(groups)
-        edit_club_info.set_groups(groups)
+        provision_permissions(self, ClubPermission, Club.PERMISSION_ROLES)
         self.__owner_group().user_set.add(self.owner)
 
     def get_all_tournaments(self):
-        """ returns all the tournament in the club """
-        return self.all_tournaments.all()
+        """ returns all the tournament in the club, with their number of participants and lifecycle state """
+        return self.all_tournaments.with_listing_info().order_by('id')
 
     class Meta:
         """" All base permissions associated with the Club Model"""
@@ -399,8 +406,7 @@ class ClubPermission(models.Model):
     groups = models.ManyToManyField(Group, related_name="club_permissions")
 
     def set_groups(self, groups):
-        for group in groups:
-            self.groups.add(group)
+        self.groups.add(*groups)
 
     def add_user(self, user):
         self.users.add(user)
@@ -426,6 +432,13 @@ def _user_has_club_perm(user, perm, club):
     return False
 
 
+def _add_remaining_matches(instance, count):
+    """Adds count (negative for played matches) to the remaining matches counter of a pool, pool phase or elimination
+    round with an F() expression, and reads the new value back"""
+    type(instance).objects.filter(pk=instance.pk).update(remaining_matches=models.F('remaining_matches') + count)
+    instance.refresh_from_db(fields=['remaining_matches'])
+
+
 def validate_tournament_deadline(value):
     """Validator function for a tournament deadline"""
     if value > timezone.now():  # Deadline must be after creation date
@@ -454,31 +467,63 @@ class Player(models.Model):
     def get_encountered_players(self):
         return self._encountered_players.all()
 
+    @classmethod
+    def encounter_graph(cls, players):
+        """Returns the graph of the encounters between the given players (indexed by their position in the list),
+        loaded with one query"""
+        indexes = {player.id: index for index, player in enumerate(players)}
+        encounters = cls._encountered_players.through.objects.filter(
+            from_player_id__in=indexes, to_player_id__in=indexes
+        ).values_list('from_player_id', 'to_player_id')
+        return EncounterGraph.from_edges(len(players), [(indexes[first], indexes[second])
+                                                        for first, second in encounters])
+
     def add_encountered_player(self, player):
-        if player not in self.get_encountered_players():
-            self._encountered_players.add(player)
-            self.save()
+        self._encountered_players.add(player)
 
     def _clean_encountered_players(self):
         for player in self.get_encountered_players():
             self._encountered_players.remove(player)
 
     def win(self):
-        self._points += float(1.0)
-        self.save()
+        self.__add_points(float(1.0))
 
     def draw(self):
-        self._points += float(0.5)
-        self.save()
+        self.__add_points(float(0.5))
+
+    def __add_points(self, points):
+        Player.objects.filter(pk=self.pk).update(_points=models.F('_points') + points)
+        self._points += points
 
     class Meta:
-        indexes = [models.Index(fields=["user", "tournament"])]
+        indexes = [models.Index(fields=["user", "tournament"]), models.Index(fields=["tournament", "_points"])]
         unique_together = ["user", "tournament"]
         ordering = ['-_points']
 
 
+class TournamentQuerySet(models.QuerySet):
+    def with_lifecycle(self):
+        """Annotates the tournaments with their lifecycle state (lifecycle): Tournament.PAST once finished,
+        Tournament.CURRENT once started and Tournament.FUTURE before"""
+        return self.annotate(lifecycle=models.Case(
+            models.When(_finished=True, then=models.Value(Tournament.PAST)),
+            models.When(_started=True, then=models.Value(Tournament.CURRENT)),
+            default=models.Value(Tournament.FUTURE),
+            output_field=models.CharField(),
+        ))
+
+    def with_listing_info(self):
+        """Annotates the tournaments with their lifecycle state and their number of participants
+        (number_of_participants)"""
+        return self.with_lifecycle().annotate(number_of_participants=models.Count('players', distinct=True))
+
+
 class Tournament(models.Model):
     """Model for representing  a club tournament"""
+    PAST = "past"
+    CURRENT = "current"
+    FUTURE = "future"
+
     _PHASE_CHOICES = [
         ('Elimination-Rounds', 'Elimination-Rounds'),
         ('Small-Pool-Phase', 'Small-Pool-Phase'),
@@ -501,10 +546,26 @@ class Tournament(models.Model):
     _finished = models.BooleanField(default=False)
     _schedule_published = models.BooleanField(default=False)
 
+    objects = TournamentQuerySet.as_manager()
+
+    GROUP_ROLES = ["participants", "co_organisers"]
+
+    # Roles (group name suffixes) granted each of the base permissions of the Meta class (according to requirements)
+    PERMISSION_ROLES = {
+        "see_tournament_private_info": ["participants", "co_organisers"],
+        "play_matches": ["participants"],
+        "withdraw": ["participants"],
+        "enter_match_results": ["co_organisers"],
+    }
+    # Permissions specific to the organiser of the tournament
+    ORGANISER_PERMISSIONS = ["enter_match_results", "see_tournament_private_info", "add_co_organiser",
+                             "start_tournament", "publish_schedule"]
+
     def add_participant(self, member):
         new_player = Player.objects.create(user=member, tournament=self)
         self.players.add(new_player)
         self.add_to_participants_group(member)
+        self.__participant_memo()[member.id] = new_player
         return new_player
 
     def get_participant_count(self):
@@ -539,14 +600,43 @@ class Tournament(models.Model):
         self._started = False
         self.save()
 
+    @transaction.atomic
     def enter_result(self, match, result=True, winner=None):
-        pool_phase = self.get_current_pool_phase()
-        if pool_phase:
-            pool_match = PoolMatch.objects.get(id=match.id)
-            pool_phase.enter_result(match=pool_match, result=result, winner=winner)
+        """Enters the result of a match as one transaction.
+
+        The match is loaded as the model of its kind, with its players, in one query that locks it. The result is only
+        entered if the match has not changed since the given instance was read, and raises StaleMatchError otherwise.
+        Its pool and pool phase (or its elimination round) are then locked before anything is read from them, which
+        serialises the results of a pool or round: concurrent entries cannot overwrite each other's standings, both
+        close a match or race a phase change."""
+        match = self.__lock_match(match)
+        match.tournament = self
+        if match.kind == Match.POOL:
+            pool_phase = match.pool.pool_phase
+            if not pool_phase.is_open():
+                raise StaleMatchError("This match is already closed.")
+            pool_phase.tournament = self
+            pool_phase.enter_result(match=match, result=result, winner=winner)
         else:
-            elimination_match = EliminationMatch.objects.get(id=match.id)
-            self.elimination_round.enter_winner(match=elimination_match, winner=winner)
+            self.elimination_round = match.elimination_round
+            self.elimination_round.enter_winner(match=match, winner=winner)
+
+    def __lock_match(self, match):
+        locked_match = Match.objects.for_result().get(id=match.id, tournament=self)
+        if locked_match.version != match.version or not locked_match.is_open():
+            raise StaleMatchError("This match is already closed.")
+        # The pool, pool phase and elimination round are nullable relations of the match, which PostgreSQL cannot lock
+        # through the outer joins of select_related: each of them is locked with its own query, parents last
+        if locked_match.kind == Match.POOL:
+            locked_match.pool = Pool.objects.select_for_update().get(pk=locked_match.pool_id)
+            locked_match.pool.pool_phase = PoolPhase.objects.select_for_update().get(
+                pk=locked_match.pool.pool_phase_id
+            )
+        else:
+            locked_match.elimination_round = EliminationRounds.objects.select_for_update().get(
+                pk=locked_match.elimination_round_id
+            )
+        return locked_match
 
     def get_winner(self):
         if self._winner:
@@ -574,21 +664,21 @@ class Tournament(models.Model):
         self.__create_elimination_round(qualified_players)
         self.elimination_round.generate_schedule()
 
+    def open_matches(self):
+        """Returns the matches of the tournament that are still open (served by the (tournament, _open) index)"""
+        return self.tournament_schedule.filter(_open=True).order_by('id')
+
     def get_current_schedule(self):
-        schedule = []
-        for match in self.tournament_schedule.all():
-            match.refresh_from_db()
-            if match.is_open():
-                schedule.append(match)
-        return schedule
+        return list(self.open_matches())
+
+    def has_open_match(self, match):
+        return self.open_matches().filter(pk=match.pk).exists()
 
     def get_matches_of_player(self, member):
-        matches = []
-        player = self.__player_instance_of_user(member)
-        for match in self.get_current_schedule():
-            if match.get_player1() == player or match.get_player2() == player:
-                matches.append(match)
-        return matches
+        player = self.get_participant(member)
+        if player is None:
+            return []
+        return list(self.open_matches().filter(models.Q(_player1=player) | models.Q(_player2=player)))
 
     def __go_to_small_pool_phase(self, qualified_players):
         small_pool_phase = self.__create_pool_phase(qualified_players=qualified_players, name="Small-Pool-Phase")
@@ -608,15 +698,17 @@ class Tournament(models.Model):
         return PoolPhase.objects.get(name=name, tournament=self)
 
     def remove_participant(self, member):
-        player = self.__player_instance_of_user(member)
+        player = self.get_participant(member)
         player.delete()
         self.remove_from_participants_group(member)
+        self.__participant_memo()[member.id] = None
 
     def _remove_all_participants(self):
         """This method is used only for tests"""
         for player in self.participants_list():
             player.delete()
             self.remove_from_participants_group(player.user)
+        self.__participant_memo().clear()
 
     def get_current_pool_phase(self):
         for pool_phase in self.pool_phases.all():
@@ -634,7 +726,7 @@ class Tournament(models.Model):
             return "organiser"
         elif user in self.co_organisers.all():
             return "co_organiser"
-        elif self.__player_instance_of_user(user):
+        elif self.get_participant(user):
             return "participant"
         else:
             return "non-participant"
@@ -685,16 +777,34 @@ class Tournament(models.Model):
             self._set_finished()
 
     def participants_list(self):
-        return self.players.all()
+        return self.players.select_related('user')
 
     def is_participant(self, member):
-        return self.__player_instance_of_user(member) is not None
+        return self.get_participant(member) is not None
 
-    def __player_instance_of_user(self, member):
-        for player_profile in member.player_profiles.all():
-            if player_profile in self.players.all():
-                return player_profile
-        return None
+    def get_participant(self, member):
+        """Returns the player profile of the member in the tournament (None if they are not a participant), looked up
+        with the unique (user, tournament) index and remembered by the tournament instance"""
+        if not member.is_authenticated:
+            return None
+        participants = self.__participant_memo()
+        if member.id not in participants:
+            participants[member.id] = Player.objects.filter(user=member, tournament=self).first()
+        return participants[member.id]
+
+    def participants_for(self, users):
+        """Returns a dictionary mapping the ids of the given users to their player profile in the tournament (None for
+        the users who are not participants), resolved with a single query"""
+        users = [user for user in users if user.is_authenticated]
+        participants = dict.fromkeys((user.id for user in users))
+        participants.update((player.user_id, player) for player in Player.objects.filter(
+            tournament=self, user__in=[user.id for user in users]))
+        self.__participant_memo().update(participants)
+        return participants
+
+    def __participant_memo(self):
+        """Player profiles already looked up on this instance, by user id (instances are shared within a request)"""
+        return self.__dict__.setdefault('_participants_by_user_id', {})
 
     def is_organiser(self, member):
         return member == self.organiser
@@ -712,12 +822,10 @@ class Tournament(models.Model):
         return self.co_organisers.all()
 
     def __participants_group(self):
-        participants_group, created = Group.objects.get_or_create(name=f"{self.name}_participants")
-        return participants_group
+        return group_registry.get_group(self, "participants")
 
     def __co_organisers_group(self):
-        participants_group, created = Group.objects.get_or_create(name=f"{self.name}_co_organisers")
-        return participants_group
+        return group_registry.get_group(self, "co_organisers")
 
     def add_to_participants_group(self, user):
         self.__participants_group().user_set.add(user)
@@ -732,46 +840,9 @@ class Tournament(models.Model):
         self.__co_organisers_group().user_set.remove(user)
 
     def assign_tournament_permissions_and_groups(self):
-        # Get the base permissions from the Tournament model Meta class
-        play_matches_perm = Permission.objects.get(codename="play_matches")
-        enter_match_results_perm = Permission.objects.get(codename="enter_match_results")
-        see_tournament_private_info_perm = Permission.objects.get(codename="see_tournament_private_info")
-        withdraw_perm = Permission.objects.get(codename="withdraw")
-        add_co_organiser_perm = Permission.objects.get(codename="add_co_organiser")
-        start_tournament_perm = Permission.objects.get(codename="start_tournament")
-        publish_schedule_perm = Permission.objects.get(codename="publish_schedule")
-
-        # Create the club-specific permissions using the TournamentPermission Model
-        play_matches, created = TournamentPermission.objects.get_or_create(tournament=self,
-                                                                           base_permission=play_matches_perm)
-        enter_match_results, created = TournamentPermission.objects.get_or_create(tournament=self,
-                                                                                  base_permission=enter_match_results_perm)
-        see_tournament_private_info, created = TournamentPermission.objects.get_or_create(tournament=self,
-                                                                                          base_permission=see_tournament_private_info_perm)
-        withdraw, created = TournamentPermission.objects.get_or_create(tournament=self,
-                                                                       base_permission=withdraw_perm)
-        add_co_organiser, created = TournamentPermission.objects.get_or_create(tournament=self,
-                                                                               base_permission=add_co_organiser_perm)
-        start, created = TournamentPermission.objects.get_or_create(tournament=self,
-                                                                    base_permission=start_tournament_perm)
-        publish, created = TournamentPermission.objects.get_or_create(tournament=self,
-                                                                      base_permission=publish_schedule_perm)
-
-        # Assign the appropriate groups to the tournament-specific permissions (according to requirements)
-        groups = [self.__participants_group(), self.__co_organisers_group()]
-        see_tournament_private_info.set_groups(groups)
-        groups = [self.__participants_group()]
-        play_matches.set_groups(groups)
-        withdraw.set_groups(groups)
-        groups = [self.__co_organisers_group()]
-        enter_match_results.set_groups(groups)
-
-        # Permissions specific to the organiser of the tournament
-        enter_match_results.add_user(self.organiser)
-        see_tournament_private_info.add_user(self.organiser)
-        add_co_organiser.add_user(self.organiser)
-        start.add_user(self.organiser)
-        publish.add_user(self.organiser)
+        """Create and assign tournament-specific permissions to the tournament's groups and organiser"""
+        organiser_permissions = {codename: [self.organiser] for codename in Tournament.ORGANISER_PERMISSIONS}
+        provision_permissions(self, TournamentPermission, Tournament.PERMISSION_ROLES, organiser_permissions)
 
     class Meta:
         """Set of base permissions associated with tournaments"""
@@ -796,8 +867,7 @@ class TournamentPermission(models.Model):
     groups = models.ManyToManyField(Group, related_name="tournament_permissions")
 
     def set_groups(self, groups):
-        for group in groups:
-            self.groups.add(group)
+        self.groups.add(*groups)
 
     def add_user(self, user):
         self.users.add(user)
@@ -837,6 +907,7 @@ class EliminationRounds(models.Model):
     _winner = models.OneToOneField(Player, on_delete=models.CASCADE, null=True, related_name="won_elimination_rounds",
                                    default=None,
                                    blank=True)
+    remaining_matches = models.PositiveIntegerField(default=0)
 
     def set_phase(self):
         if 16 >= self.EL_players.count() >= 9:
@@ -850,30 +921,24 @@ class EliminationRounds(models.Model):
         self.save()
 
     def add_players(self, new_players):
-        for player in new_players:
-            self.EL_players.add(player)
-        self.save()
-
-    def __are_all_matches_played(self):
-        for match in self.schedule.all():
-            if match.is_open():
-                return False
-        return True
+        self.EL_players.add(*new_players)
 
     def remove_player(self, player):
         self.EL_players.remove(player)
-        self.save()
 
     def enter_winner(self, winner, match):
         # The checks will be done at views level
-        if self._open:
+        if self._open and match.is_open():
             round_winner = match.enter_winner(winner)
+            if match.is_open():
+                return
+            _add_remaining_matches(self, -1)
             if self.phase == "Final":
                 self._winner = round_winner
                 self._open = False
                 self.save()
                 self._tournament.go_to_next_phase(winner=round_winner)
-            elif self.__are_all_matches_played():
+            elif self.remaining_matches == 0:
                 self.__check_new_phase()
 
     def __check_new_phase(self):
@@ -897,7 +962,10 @@ class EliminationRounds(models.Model):
 
     def clean_schedule(self):
         self.schedule.all().delete()
+        self.remaining_matches = 0
+        self.save(update_fields=['remaining_matches'])
 
+    @transaction.atomic
     def generate_schedule(self):
         if self.phase == "Final":
             self.__generate_matches(1)
@@ -930,31 +998,14 @@ class EliminationRounds(models.Model):
         return self.schedule.all()
 
     def __generate_matches(self, num):
-        i = 0
-        counter = 0
-        not_yet_selected_players = {0}
-        not_yet_selected_players.remove(0)
-        not_yet_selected_players.update(self.EL_players.all())
-
-        while counter < num:
-            player = random.sample(not_yet_selected_players, 1)[0]
-            forbidden_players = {0}
-            forbidden_players.remove(0)
-            forbidden_players.update(player.get_encountered_players())
-            not_yet_selected_players.remove(player)
-            choices = not_yet_selected_players - forbidden_players
-
-            if len(choices) == 0:
-                random_player = random.sample(not_yet_selected_players, 1)[0]
-            else:
-                random_player = random.sample(choices, 1)[0]
-
-            new_match = EliminationMatch.objects.create_elimination_match(tournament=self._tournament, player1=player,
-                                                                          player2=random_player, elimination_round=self)
-            not_yet_selected_players.remove(random_player)
-            self.schedule.add(new_match)
-            i += 1
-            counter += 1
+        players = list(self.EL_players.order_by('id'))
+        pairs = draw_pairs(num, Player.encounter_graph(players), seed=f"{self._tournament_id}:{self.phase}")
+        bulk_create_matches([
+            EliminationMatch.objects.build_elimination_match(tournament=self._tournament, player1=players[first],
+                                                             player2=players[second], elimination_round=self)
+            for first, second in pairs
+        ])
+        _add_remaining_matches(self, len(pairs))
 
 
 class PoolPhase(models.Model):
@@ -966,19 +1017,19 @@ class PoolPhase(models.Model):
     name = models.CharField(max_length=50, choices=_POOL_PHASE_NAME_CHOICES)
     tournament = models.ForeignKey(Tournament, on_delete=models.CASCADE, related_name="pool_phases")
     _closed = models.BooleanField(default=False)
+    remaining_matches = models.PositiveIntegerField(default=0)
 
     class Meta:
         unique_together = ["name", "tournament"]
 
     def add_players(self, players):
-        for player in players:
-            self.PP_players.add(player)
+        self.PP_players.add(*players)
 
     def add_qualified_players(self, qualified_players):
         if not self._closed:
             self.__add_qualified_players(qualified_players)
-            all_pools_finished = self.__check_all_pools()
-            if all_pools_finished:
+            self.refresh_from_db(fields=['remaining_matches'])
+            if self.remaining_matches == 0:
                 self.__go_to_next_phase()
 
     def get_pools(self):
@@ -992,36 +1043,21 @@ class PoolPhase(models.Model):
         return matches
 
     def __add_qualified_players(self, qualified_players):
-        for player in qualified_players:
-            self.PP_qualified_players.add(player)
-        self.save()
+        self.PP_qualified_players.add(*qualified_players)
 
     def enter_result(self, match, result, winner=None):
-        pool = self.__get_pool_of_match(match)
-        pool.enter_result(match=match, result=result, winner=winner)
+        match.pool.enter_result(match=match, result=result, winner=winner)
 
     def __go_to_next_phase(self):
         self._closed = True
         self.__delete_all_phase_matches()
-        self.save()
+        self.save(update_fields=['_closed'])
         self.tournament.go_to_next_phase(qualified_players=self.PP_qualified_players.all())
 
     def __delete_all_phase_matches(self):
         for pool in self.pools.all():
             pool.pool_matches.all().delete()
 
-    def __check_all_pools(self):
-        for pool in self.pools.all():
-            if not pool.all_matches_played:
-                return False
-        return True
-
-    def __get_pool_of_match(self, match):
-        for pool in self.get_pools():
-            for pool_match in pool.get_pool_matches():
-                if match.id == pool_match.id:
-                    return pool
-
     def get_players(self):
         return self.PP_players.all()
 
@@ -1037,74 +1073,28 @@ class PoolPhase(models.Model):
                 return pool
 
     def __assign_matches_to_pools(self):
-        for pool in self.pools.all():
-            pool.create_matches()
+        matches = []
+        pools = list(self.pools.prefetch_related('pool_players'))
+        for pool in pools:
+            pool_matches = pool.build_matches(self.tournament)
+            pool.remaining_matches += len(pool_matches)
+            matches.extend(pool_matches)
+        bulk_create_matches(matches)
+        Pool.objects.bulk_update(pools, ['remaining_matches'])
+        _add_remaining_matches(self, len(matches))
 
     def __create_small_pools(self, groups_of_3, groups_of_4):
-        not_yet_selected_players = {0}
-        not_yet_selected_players.remove(0)
-        not_yet_selected_players.update(self.PP_players.all())
-
-        not_yet_selected_players = self.__create_new_pool(groups_of_4, 3, not_yet_selected_players)
-        self.__create_new_pool(groups_of_3, 2, not_yet_selected_players)
+        self.__create_pools([4] * groups_of_4 + [3] * groups_of_3)
 
     def __create_large_pools(self, groups_of_5, groups_of_6):
-        not_yet_selected_players = {0}
-        not_yet_selected_players.remove(0)
-        not_yet_selected_players.update(self.PP_players.all())
-
-        not_yet_selected_players = self.__create_new_pool(groups_of_6, 5, not_yet_selected_players)
-        self.__create_new_pool(groups_of_5, 4, not_yet_selected_players)
-
-    def __create_new_pool(self, num_of_groups, size, all_players):
-        counter = 0
-        while counter != num_of_groups:
-            player = random.sample(all_players, 1)[0]
-            forbidden_players = {0}
-            forbidden_players.remove(0)
-            forbidden_players.update(player.get_encountered_players())
-            all_players.remove(player)
-            non_encountered = all_players - forbidden_players
-            number_of_choices = len(non_encountered)
-            new_pool = Pool.objects.create(pool_phase=self)
-
-            pool_players = []
-
-            if number_of_choices >= size:
-                pool_players = random.sample(non_encountered, size)
-            elif number_of_choices > 0:
-                diff = size - number_of_choices
-
-                non_encountered_players = random.sample(non_encountered, number_of_choices)
-                for non_encountered_player in non_encountered_players:
-                    pool_players.append(non_encountered_player)
-
-                all_other_players = []
-                for other_player in all_players:
-                    if other_player not in non_encountered_players:
-                        all_other_players.append(other_player)
+        self.__create_pools([6] * groups_of_6 + [5] * groups_of_5)
 
-                encountered_players = random.sample(all_other_players, diff)
-                for encountered_player in encountered_players:
-                    pool_players.append(encountered_player)
-            else:
-                pool_players = random.sample(all_players, size)
-
-            new_diff = size - len(pool_players)
-            if new_diff > 1:
-                other_players = random.sample(all_players, new_diff - 1)
-                for pl in other_players:
-                    pool_players.append(pl)
-
-            for new_player in pool_players:
-                all_players.remove(new_player)
-
-            pool_players.append(player)
-            new_pool.add_players(pool_players)
-
-            counter += 1
-
-        return all_players
+    def __create_pools(self, pool_sizes):
+        players = list(self.PP_players.order_by('id'))
+        pools = draw_pools(pool_sizes, Player.encounter_graph(players), seed=f"{self.tournament_id}:{self.name}")
+        for pool_players in pools:
+            new_pool = Pool.objects.create(pool_phase=self)
+            new_pool.add_players([players[index] for index in pool_players])
 
     def __generate_small_pool_schedule(self):
         number_of_players = self.PP_players.count()
@@ -1195,6 +1185,7 @@ class PoolPhase(models.Model):
         self.__assign_matches_to_pools()
         return self.pools.all()
 
+    @transaction.atomic
     def generate_schedule(self):
         if 17 <= self.PP_players.count() <= 32:
             return self.__generate_small_pool_schedule()
@@ -1205,6 +1196,7 @@ class PoolPhase(models.Model):
 class Pool(models.Model):
     pool_phase = models.ForeignKey(PoolPhase, on_delete=models.CASCADE, related_name="pools", null=True)
     all_matches_played = models.BooleanField(default=False)
+    remaining_matches = models.PositiveIntegerField(default=0)
 
     def get_players_count(self):
         return self.pool_players.count()
@@ -1216,63 +1208,144 @@ class Pool(models.Model):
         return self.pool_matches.all()
 
     def get_current_pool_matches(self):
-        matches = []
-        for match in self.get_pool_matches():
-            if match.is_open():
-                matches.append(match)
-        return matches
+        """Returns the open matches of the pool, with their players"""
+        return list(self.pool_matches.filter(_open=True).select_related('_player1__user', '_player2__user')
+                    .order_by('id'))
 
     def add_players(self, players):
-        for player in players:
-            if player not in self.pool_players.all():
-                self.pool_players.add(player)
-        self.save()
+        self.pool_players.add(*players)
+        Standing.objects.create_standings(self, players)
+
+    def get_standings(self):
+        """Returns the standings of the players of the pool, best first"""
+        return self.standings.select_related('player__user').order_by('rank', 'player_id')
+
+    def build_matches(self, tournament=None):
+        """Returns the unsaved matches between every pair of players of the pool"""
+        tournament = tournament or self.pool_phase.tournament
+        players = list(self.pool_players.all())
+        return [
+            PoolMatch.objects.build_pool_match(player1=players[i], player2=players[j], tournament=tournament, pool=self)
+            for i in range(len(players)) for j in range(i + 1, len(players))
+        ]
 
     def create_matches(self):
-        for i in range(self.pool_players.count()):
-            for j in range(i + 1, self.pool_players.count()):
-                player1 = self.pool_players.all()[i]
-                player2 = self.pool_players.all()[j]
-                new_match = PoolMatch.objects.create_pool_match(player1=player1, player2=player2,
-                                                                tournament=self.pool_phase.tournament,
-                                                                pool=self)
-                self.pool_matches.add(new_match)
-                self.save()
+        matches = bulk_create_matches(self.build_matches())
+        self.__add_remaining_matches(len(matches))
 
     def enter_result(self, match, result, winner=None):
-        if not self.all_matches_played:
+        if not self.all_matches_played and match.is_open():
             match.enter_result(result, winner)
-            self.__are_all_matches_played()
-            if self.all_matches_played:
-                self.__set_qualified_players()
+            self.__record_played_match(match)
 
     def enter_winner(self, winner, match):
-        match.enter_winner(winner)
-        self.__are_all_matches_played()
-        if self.all_matches_played:
-            self.__set_qualified_players()
+        if match.is_open():
+            match.enter_winner(winner)
+            self.__record_played_match(match)
 
     def enter_draw(self, match):
-        match.enter_draw()
-        self.__are_all_matches_played()
-        if self.all_matches_played:
+        if match.is_open():
+            match.enter_draw()
+            self.__record_played_match(match)
+
+    def __add_remaining_matches(self, count):
+        _add_remaining_matches(self, count)
+        if self.pool_phase_id is not None:
+            PoolPhase.objects.filter(pk=self.pool_phase_id).update(
+                remaining_matches=models.F('remaining_matches') + count
+            )
+
+    def __record_played_match(self, match):
+        if match.is_open():
+            return
+        self.__add_remaining_matches(-1)
+        if self.remaining_matches == 0:
+            self.all_matches_played = True
+            self.save(update_fields=['all_matches_played'])
             self.__set_qualified_players()
 
-    def __are_all_matches_played(self):
-        self.all_matches_played = all(not m.is_open() for m in self.pool_matches.all())
-        self.save()
-
     def __set_qualified_players(self):
         qualified_players = self.__get_qualified_players()
         self.pool_phase.add_qualified_players(qualified_players)
 
     def __get_qualified_players(self):
-        return [self.pool_players.all()[0], self.pool_players.all()[1]]
+        return [standing.player for standing in self.get_standings()[:2]]
+
+
+class StandingManager(models.Manager):
+    _RANKING_FIELDS = ['points', 'wins', 'draws', 'losses', 'head_to_head', 'sonneborn_berger', 'rank']
+
+    def create_standings(self, pool, players):
+        """Creates the (empty) standings of the given players in the pool"""
+        self.bulk_create([self.model(pool=pool, player_id=player.id) for player in players], ignore_conflicts=True)
+
+    def record_result(self, match):
+        """Adds the result of a closed pool match to the standings of its pool and ranks the pool again"""
+        standings = {standing.player_id: standing for standing in self.filter(pool_id=match.pool_id)}
+        if match._player1_id not in standings or match._player2_id not in standings:
+            self.rebuild(match.pool)
+            return
+        add_result(standings, match._player1_id, match._player2_id, match._winner_id)
+        self.__save_ranking(match.pool_id, standings)
+
+    def rebuild(self, pool):
+        """Computes the standings of the pool from all of its closed matches"""
+        self.create_standings(pool, pool.pool_players.all())
+        standings = {standing.player_id: standing for standing in self.filter(pool=pool)}
+        for standing in standings.values():
+            standing.points = 0.0
+            standing.wins = standing.draws = standing.losses = 0
+        for result in self.__results(pool.id):
+            add_result(standings, *result)
+        self.__save_ranking(pool.id, standings)
+
+    def __results(self, pool_id):
+        return PoolMatch.objects.filter(pool_id=pool_id, _open=False).values_list(
+            '_player1_id', '_player2_id', '_winner_id'
+        )
+
+    def __save_ranking(self, pool_id, standings):
+        rank(standings, self.__results(pool_id))
+        self.bulk_update(standings.values(), self._RANKING_FIELDS)
+
+
+class Standing(models.Model):
+    """Standing of a player in a pool, updated in the transaction entering each result of the pool"""
+    pool = models.ForeignKey(Pool, on_delete=models.CASCADE, related_name="standings")
+    player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name="standings")
+    points = models.FloatField(default=float(0.0))
+    wins = models.PositiveIntegerField(default=0)
+    draws = models.PositiveIntegerField(default=0)
+    losses = models.PositiveIntegerField(default=0)
+    head_to_head = models.FloatField(default=float(0.0))
+    sonneborn_berger = models.FloatField(default=float(0.0))
+    rank = models.PositiveIntegerField(default=0)
+
+    objects = StandingManager()
+
+    class Meta:
+        unique_together = ["pool", "player"]
+        indexes = [models.Index(fields=["pool", "rank"])]
+
+
+class StaleMatchError(Exception):
+    """Raised when entering the result of a match that was closed or changed since it was read"""
 
 
 class MatchManager(models.Manager):
     """Custom user manager used for creation of users and superusers"""
 
+    def for_result(self):
+        """Returns the matches with their players, locking the match rows (only) until the end of the transaction"""
+        return self.select_related('_player1', '_player2').select_for_update(of=('self',))
+
+    def open_matches_of_players(self, players):
+        """Returns the open matches of the given players (or player ids) with the players and their users, ordered by
+        tournament"""
+        return self.filter(models.Q(_player1__in=players) | models.Q(_player2__in=players), _open=True).select_related(
+            '_player1__user', '_player2__user'
+        ).order_by('tournament_id', 'id')
+
     def create_match(self, tournament, player1, player2):
         """Create a match according to User model"""
         if not tournament:
@@ -1287,6 +1360,7 @@ class MatchManager(models.Manager):
             raise ValueError("The organiser cannot play matches")
 
         match = self.model()
+        match.kind = self.model.KIND
         match._player1 = player1
         match._player2 = player2
         match.tournament = tournament
@@ -1294,37 +1368,76 @@ class MatchManager(models.Manager):
 
 
 class Match(models.Model):
+    """Match between two players of a tournament.
+
+    Pool matches and elimination matches are stored in this table and told apart by their kind: PoolMatch and
+    EliminationMatch are proxies of Match, and matches are always loaded as the model of their kind."""
+    MATCH = "match"
+    POOL = "pool"
+    ELIMINATION = "elimination"
+    _KIND_CHOICES = [
+        (MATCH, 'Match'),
+        (POOL, 'Pool'),
+        (ELIMINATION, 'Elimination'),
+    ]
+    KIND = MATCH
+
     _player1 = models.ForeignKey(Player, on_delete=models.CASCADE, related_name="matches")
     _player2 = models.ForeignKey(Player, on_delete=models.CASCADE, related_name="my_matches")
     _winner = models.ForeignKey(Player, on_delete=models.CASCADE, null=True, related_name="won_matches", default=None,
                                 blank=True)
     _open = models.BooleanField(default=True)
     tournament = models.ForeignKey(Tournament, on_delete=models.CASCADE, related_name="tournament_schedule")
+    version = models.PositiveIntegerField(default=0)
+    kind = models.CharField(max_length=20, choices=_KIND_CHOICES, default=MATCH)
+    pool = models.ForeignKey(Pool, on_delete=models.CASCADE, related_name="pool_matches", null=True, blank=True)
+    elimination_round = models.ForeignKey(EliminationRounds, on_delete=models.CASCADE, related_name="schedule",
+                                          null=True, blank=True)
 
     objects = MatchManager()
 
+    class Meta:
+        indexes = [models.Index(fields=["tournament", "_open"])]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        match = super().from_db(db, field_names, values)
+        match.__class__ = _MATCH_MODELS.get(match.__dict__.get('kind'), cls)
+        return match
+
+    def save(self, *args, **kwargs):
+        if self._state.adding:
+            self.kind = self.KIND
+        super().save(*args, **kwargs)
+
     def get_player1(self):
         return self._player1
 
     def get_player2(self):
         return self._player2
 
+    def get_opponent(self, player):
+        return self._player2 if player == self._player1 else self._player1
+
     def enter_winner(self, player):
         if player == self._player1 or player == self._player2:
             self._winner = player
-            self._player1.add_encountered_player(self._player2)
             self.__close_match()
-            self.save()
             return self._winner
 
     def enter_draw(self):
-        self._player1.add_encountered_player(self._player2)
         self.__close_match()
-        self.save()
 
     def __close_match(self):
+        """Saves the result with one UPDATE that only applies to the version of the match that was read"""
+        closed = Match.objects.filter(pk=self.pk, version=self.version, _open=True).update(
+            _open=False, _winner=self._winner, version=models.F('version') + 1
+        )
+        if not closed:
+            raise StaleMatchError("This match is already closed.")
         self._open = False
-        self.save()
+        self.version += 1
+        self._player1.add_encountered_player(self._player2)
 
     def get_winner(self):
         return self._winner
@@ -1342,26 +1455,39 @@ class Match(models.Model):
 
 class PoolMatchManager(MatchManager):
 
-    def create_pool_match(self, tournament, player1, player2, pool):
+    def get_queryset(self):
+        return super().get_queryset().filter(kind=Match.POOL)
+
+    def build_pool_match(self, tournament, player1, player2, pool):
         match = super().create_match(tournament, player1, player2)
         match.pool = pool
+        return match
+
+    def create_pool_match(self, tournament, player1, player2, pool):
+        match = self.build_pool_match(tournament, player1, player2, pool)
         match.save(using=self._db)
         return match
 
 
 class PoolMatch(Match):
-    pool = models.ForeignKey(Pool, on_delete=models.CASCADE, related_name="pool_matches")
+    KIND = Match.POOL
+
+    class Meta:
+        proxy = True
 
+    @transaction.atomic
     def enter_result(self, result, winner=None):
         if result:
             self.__enter_winner(winner)
         else:
             self.__enter_draw_result()
+        if not self.is_open():
+            Standing.objects.record_result(self)
 
     def __enter_winner(self, winner):
         true_winner = super(PoolMatch, self).enter_winner(winner)
-        self.__set_win_points(true_winner)
-        self.save()
+        if true_winner:
+            self.__set_win_points(true_winner)
 
     def __enter_draw_result(self):
         super(PoolMatch, self).enter_draw()
@@ -1370,30 +1496,37 @@ class PoolMatch(Match):
     def __set_draw_points(self):
         self._player1.draw()
         self._player2.draw()
-        self.save()
 
     def __set_win_points(self, player):
         if player == self._player1:
             self._player1.win()
         else:
             self._player2.win()
-        self.save()
 
     objects = PoolMatchManager()
 
 
 class EliminationMatchManager(MatchManager):
 
-    def create_elimination_match(self, tournament, player1, player2, elimination_round):
+    def get_queryset(self):
+        return super().get_queryset().filter(kind=Match.ELIMINATION)
+
+    def build_elimination_match(self, tournament, player1, player2, elimination_round):
         match = super().create_match(tournament, player1, player2)
         match.elimination_round = elimination_round
+        return match
+
+    def create_elimination_match(self, tournament, player1, player2, elimination_round):
+        match = self.build_elimination_match(tournament, player1, player2, elimination_round)
         match.save(using=self._db)
         return match
 
 
 class EliminationMatch(Match):
-    elimination_round = models.ForeignKey(EliminationRounds, on_delete=models.CASCADE, related_name="schedule",
-                                          null=True)
+    KIND = Match.ELIMINATION
+
+    class Meta:
+        proxy = True
 
     def enter_winner(self, player):
         winner = super(EliminationMatch, self).enter_winner(player)
@@ -1402,3 +1535,31 @@ class EliminationMatch(Match):
         return winner
 
     objects = EliminationMatchManager()
+
+
+class Job(models.Model):
+    """Task queued to run off the request path by the workers of the job queue (see jobs.py)"""
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    _STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    task = models.CharField(max_length=200)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=20, choices=_STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "id"])]
+
+
+_MATCH_MODELS = {model.KIND: model for model in (Match, PoolMatch, EliminationMatch)}
@@ -0,0 +1,42 @@
+"""Keyset pagination of listings.
+
+Listings are paginated on their primary key rather than with an offset: a page is read from the primary key index as
+the rows following the last key of the previous page, so every page costs the same whatever its position, and rows
+added or removed while a user pages through a listing do not shift the following pages.
+"""
+
+
+class KeysetPage:
+    """A page of a listing, with the key after which the next page starts (None on the last page)"""
+
+    def __init__(self, items, after, next_key):
+        self.items = items
+        self.after = after
+        self.next_key = next_key
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def is_first(self):
+        return self.after is None
+
+
+def parse_page_key(value):
+    """Returns the page key given as a query string parameter, None if it's missing or invalid"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def keyset_page(queryset, after=None, page_size=50, descending=False):
+    """Returns the page of the queryset following the row of primary key after (the first page when after is None),
+    in ascending primary key order or, with descending, newest first"""
+    if after is not None:
+        queryset = queryset.filter(pk__lt=after) if descending else queryset.filter(pk__gt=after)
+    items = list(queryset.order_by('-pk' if descending else 'pk')[:page_size + 1])
+    next_key = items[page_size - 1].pk if len(items) > page_size else None
+    return KeysetPage(items[:page_size], after, next_key)
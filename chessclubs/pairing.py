@@ -0,0 +1,157 @@
+"""Pairing engine drawing the pools and elimination matches of a tournament.
+
+The engine works on player indexes (0 to n - 1) and knows nothing about the ORM. Which players already played each
+other is given as an EncounterGraph, whose adjacency rows are integer bitsets: counting the players of a pool a
+player already met is a single AND and popcount.
+
+Draws are deterministic for a given seed. Elimination pairings have the fewest possible rematches: they are found by
+an exact search over the sets of players left to pair (see draw_pairs). Pools are built greedily, taking players in a
+seeded random order and placing each one where it meets the fewest players it already played, and then improved by
+swapping players between pools as long as a swap lowers the number of rematches. This local search is not exact:
+it can keep a rematch that a different split of the pools would avoid.
+"""
+import math
+import random
+
+
+def _popcount(bits):
+    return bin(bits).count("1")
+
+
+def _lowest_position(bits):
+    return (bits & -bits).bit_length() - 1
+
+
+class EncounterGraph:
+    """Undirected graph of the players who already played each other, as one adjacency bitset per player"""
+
+    def __init__(self, player_count):
+        self.player_count = player_count
+        self.rows = [0] * player_count
+
+    @classmethod
+    def from_edges(cls, player_count, edges):
+        """Builds the graph of player_count players from (player, player) index pairs"""
+        graph = cls(player_count)
+        for first, second in edges:
+            graph.add_encounter(first, second)
+        return graph
+
+    def add_encounter(self, first, second):
+        self.rows[first] |= 1 << second
+        self.rows[second] |= 1 << first
+
+    def have_met(self, first, second):
+        return bool(self.rows[first] >> second & 1)
+
+    def encounters_in(self, player, players_bits):
+        """Returns how many of the players in the players_bits bitset the given player already met"""
+        return _popcount(self.rows[player] & players_bits)
+
+
+def count_pool_rematches(pools, graph):
+    """Returns the number of pairs of players of a same pool who already met"""
+    rematches = 0
+    for pool in pools:
+        bits = sum(1 << player for player in pool)
+        rematches += sum(graph.encounters_in(player, bits) for player in pool)
+    return rematches // 2
+
+
+def count_pairing_rematches(pairs, graph):
+    """Returns the number of pairs of players who already met"""
+    return sum(graph.have_met(first, second) for first, second in pairs)
+
+
+def draw_pools(pool_sizes, graph, seed=None):
+    """Splits the players of the graph into pools of the given sizes, with few rematches (see the module docstring).
+    Returns one list of player indexes per pool, in the order of pool_sizes."""
+    if sum(pool_sizes) != graph.player_count:
+        raise ValueError("The pool sizes must add up to the number of players")
+    rng = random.Random(seed)
+    order = list(range(graph.player_count))
+    rng.shuffle(order)
+
+    pools = [[] for size in pool_sizes]
+    pool_bits = [0] * len(pool_sizes)
+    for player in order:
+        best = min(
+            (index for index, size in enumerate(pool_sizes) if len(pools[index]) < size),
+            key=lambda index: (graph.encounters_in(player, pool_bits[index]), len(pools[index]) - pool_sizes[index])
+        )
+        pools[best].append(player)
+        pool_bits[best] |= 1 << player
+
+    improved = True
+    while improved:
+        improved = False
+        for first_pool in range(len(pools)):
+            for second_pool in range(first_pool + 1, len(pools)):
+                for i, first in enumerate(pools[first_pool]):
+                    for j, second in enumerate(pools[second_pool]):
+                        first_bits = pool_bits[first_pool] & ~(1 << first)
+                        second_bits = pool_bits[second_pool] & ~(1 << second)
+                        before = graph.encounters_in(first, first_bits) + graph.encounters_in(second, second_bits)
+                        after = graph.encounters_in(first, second_bits) + graph.encounters_in(second, first_bits)
+                        if after < before:
+                            pools[first_pool][i], pools[second_pool][j] = second, first
+                            pool_bits[first_pool] = first_bits | 1 << second
+                            pool_bits[second_pool] = second_bits | 1 << first
+                            first = second
+                            improved = True
+    return pools
+
+
+def draw_pairs(match_count, graph, seed=None):
+    """Draws match_count disjoint pairs of players of the graph with the fewest possible rematches.
+    Players left out of the pairs (when there are more than 2 * match_count players) get a bye.
+
+    The search is exact: the fewest rematches of each set of players left to pair (and byes left to give) is computed
+    once, pairing the first player of the set with each of the others or giving it a bye. Players are taken in a seeded
+    random order, and the search of a set stops as soon as it pairs it without rematches, so that draws without
+    rematches are found without exploring the others. Elimination rounds have at most 16 players, which bounds the
+    number of sets to 2 ** 16."""
+    if 2 * match_count > graph.player_count:
+        raise ValueError("There are not enough players for the requested number of matches")
+    rng = random.Random(seed)
+    order = list(range(graph.player_count))
+    rng.shuffle(order)
+    solutions = {}
+
+    def solve(remaining, byes):
+        """Returns the fewest rematches pairing the players at the positions of the remaining bitset, byes of them
+        being left out, with the opponent position bit of the first of them (0 for a bye)"""
+        if _popcount(remaining) == byes:
+            return 0, 0
+        if (remaining, byes) not in solutions:
+            first = _lowest_position(remaining)
+            rest = remaining & ~(1 << first)
+            best = (math.inf, 0)
+            opponents = rest
+            while opponents and best[0] > 0:
+                opponent_bit = opponents & -opponents
+                opponents ^= opponent_bit
+                rematches = (graph.have_met(order[first], order[_lowest_position(opponent_bit)])
+                             + solve(rest & ~opponent_bit, byes)[0])
+                if rematches < best[0]:
+                    best = (rematches, opponent_bit)
+            if byes and best[0] > 0:
+                rematches = solve(rest, byes - 1)[0]
+                if rematches < best[0]:
+                    best = (rematches, 0)
+            solutions[(remaining, byes)] = best
+        return solutions[(remaining, byes)]
+
+    pairs = []
+    remaining = (1 << graph.player_count) - 1
+    byes = graph.player_count - 2 * match_count
+    while _popcount(remaining) > byes:
+        first = _lowest_position(remaining)
+        opponent_bit = solve(remaining, byes)[1]
+        remaining &= ~(1 << first)
+        if opponent_bit:
+            pairs.append((order[first], order[_lowest_position(opponent_bit)]))
+            remaining &= ~opponent_bit
+        else:
+            byes -= 1
+    return pairs
@@ -0,0 +1,95 @@
+"""Shared cache of the permissions users hold in clubs and tournaments.
+
+Checking a club or tournament permission used to cost several queries per request: the permission sets were only
+memoised on the user object, under a name that a club and a tournament with the same primary key shared. The
+permission cache stores the effective permissions of a user in a club or tournament (a bitmask, see auth_backends.py)
+in the Django cache, keyed by entity type, entity primary key and user primary key, together with three versions:
+
+- a global version, bumped when a change may affect any user's permissions (e.g. a group is deleted),
+- an entity version, bumped when the permissions of a club or tournament are granted or revoked,
+- a user version, bumped when the groups or direct permissions of a user change.
+
+The permissions granted to each role group of a club or tournament are cached the same way, keyed by the global and
+entity versions only.
+
+Versions are bumped by the m2m_changed receivers in signals.py, and explicitly by code writing through tables in bulk
+(which bypasses these signals). Changing a version makes every key built with the previous one unreachable, so stale
+entries simply expire. Permissions are only published once the transaction that read them has committed, and versions
+are bumped both immediately and on commit, so permissions read before a change commits are never reused after it.
+"""
+from django.core.cache import cache
+from django.db import transaction
+
+GLOBAL_VERSION_KEY = "chessclubs:perms:version"
+PERMISSION_CACHE_TIMEOUT = 60 * 60
+
+
+class PermissionCache:
+    """Caches the permissions of users in clubs and tournaments"""
+
+    def get(self, user, entity):
+        """Returns the cached permission mask of a user in a club or tournament, or None on a miss"""
+        versions = self.__versions(user, entity)
+        return cache.get(self.__key(user, entity, versions))
+
+    def set(self, user, entity, mask):
+        """Publishes the permission mask of a user in a club or tournament once the current transaction commits"""
+        versions = self.__versions(user, entity)
+        key = self.__key(user, entity, versions)
+        transaction.on_commit(lambda: cache.set(key, mask, PERMISSION_CACHE_TIMEOUT))
+
+    def get_role_masks(self, entity):
+        """Returns the cached permission masks of the role groups of a club or tournament, or None on a miss"""
+        versions = self.__versions(None, entity)
+        return cache.get(self.__key(None, entity, versions))
+
+    def set_role_masks(self, entity, role_masks):
+        """Publishes the permission masks of the role groups of a club or tournament once the current transaction
+        commits"""
+        versions = self.__versions(None, entity)
+        key = self.__key(None, entity, versions)
+        transaction.on_commit(lambda: cache.set(key, role_masks, PERMISSION_CACHE_TIMEOUT))
+
+    def bump_user(self, user_pk):
+        """Invalidates the permissions of a user"""
+        self.__bump(self.__user_version_key(user_pk))
+
+    def bump_entity(self, model, pk):
+        """Invalidates the permissions held in the club or tournament of the given model and primary key"""
+        self.__bump(self.__entity_version_key(model._meta.label_lower, pk))
+
+    def clear(self):
+        """Invalidates every cached permission"""
+        self.__bump(GLOBAL_VERSION_KEY)
+
+    def __bump(self, version_key):
+        self.__incr(version_key)
+        transaction.on_commit(lambda: self.__incr(version_key))
+
+    def __incr(self, version_key):
+        try:
+            cache.incr(version_key)
+        except ValueError:
+            cache.set(version_key, 1, None)
+
+    def __versions(self, user, entity):
+        keys = [GLOBAL_VERSION_KEY, self.__entity_version_key(entity._meta.label_lower, entity.pk)]
+        if user is not None:
+            keys.append(self.__user_version_key(user.pk))
+        versions = cache.get_many(keys)
+        return tuple(versions.get(key, 0) for key in keys)
+
+    def __key(self, user, entity, versions):
+        key = f"chessclubs:perms:{versions[0]}:{entity._meta.label_lower}:{entity.pk}:{versions[1]}"
+        if user is None:
+            return f"{key}:roles"
+        return f"{key}:{user.pk}:{versions[2]}"
+
+    def __entity_version_key(self, label, pk):
+        return f"chessclubs:perms:version:{label}:{pk}"
+
+    def __user_version_key(self, user_pk):
+        return f"chessclubs:perms:version:user:{user_pk}"
+
+
+permission_cache = PermissionCache()
@@ -0,0 +1,94 @@
+"""Bulk provisioning of club-specific and tournament-specific permissions.
+
+Creating a club or a tournament creates one ClubPermission/TournamentPermission row per base permission declared in
+the model's Meta class and links these rows to the role groups (and users) they are granted to. The provisioning
+engine does this with a constant number of queries inside a single transaction:
+
+- the base permissions are loaded once per process (and reloaded after migrations),
+- the role groups, the entity-specific permissions and the group and user links are each written with one
+  bulk_create.
+
+All writes ignore conflicts, so provisioning an already provisioned club or tournament is a no-op. Bulk inserts do
+not send m2m_changed signals, so the permission cache of the entity is invalidated explicitly.
+"""
+from django.contrib.auth.models import Group, Permission
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+
+from .group_registry import group_registry
+from .permission_cache import permission_cache
+
+_base_permission_ids = {}
+
+
+def get_base_permission_ids(model):
+    """Returns a dictionary mapping the codenames of the base permissions of a model to their ids"""
+    if model not in _base_permission_ids:
+        content_type = ContentType.objects.get_for_model(model)
+        codenames = [codename for codename, description in model._meta.permissions]
+        _base_permission_ids[model] = dict(
+            Permission.objects.filter(content_type=content_type, codename__in=codenames).values_list('codename', 'id')
+        )
+    return _base_permission_ids[model]
+
+
+def clear_base_permission_ids():
+    """Forgets the loaded base permissions (their ids change when the database is migrated or flushed)"""
+    _base_permission_ids.clear()
+
+
+def get_or_create_groups(names):
+    """Returns a dictionary mapping each group name to its group, creating the missing groups in bulk"""
+    groups = {group.name: group for group in Group.objects.filter(name__in=names)}
+    missing = [Group(name=name) for name in names if name not in groups]
+    if missing:
+        Group.objects.bulk_create(missing, ignore_conflicts=True)
+        groups = {group.name: group for group in Group.objects.filter(name__in=names)}
+    return groups
+
+
+def provision_permissions(entity, permission_model, permission_roles, permission_users=None):
+    """Create the entity-specific permissions of a club or tournament and grant them to its role groups.
+
+    permission_roles maps each base permission codename to the roles (group name suffixes) granted that permission,
+    and permission_users maps codenames to the users granted that permission directly."""
+    permission_users = permission_users or {}
+    entity_field = entity._meta.model_name
+    with transaction.atomic():
+        base_permission_ids = get_base_permission_ids(type(entity))
+        groups = get_or_create_groups([f"{entity.name}_{role}" for role in entity.GROUP_ROLES])
+        for role in entity.GROUP_ROLES:
+            group_registry.remember(entity, role, groups[f"{entity.name}_{role}"])
+
+        permission_model.objects.bulk_create(
+            [permission_model(**{entity_field: entity, 'base_permission_id': base_permission_id})
+             for base_permission_id in base_permission_ids.values()],
+            ignore_conflicts=True
+        )
+        permission_ids = dict(
+            permission_model.objects.filter(**{entity_field: entity}).values_list('base_permission_id', 'id')
+        )
+
+        group_links = []
+        groups_through = permission_model.groups.through
+        for codename, granted_roles in permission_roles.items():
+            permission_id = permission_ids[base_permission_ids[codename]]
+            for role in granted_roles:
+                group_links.append(groups_through(**{
+                    permission_model.groups.field.m2m_column_name(): permission_id,
+                    permission_model.groups.field.m2m_reverse_name(): groups[f"{entity.name}_{role}"].id,
+                }))
+        groups_through.objects.bulk_create(group_links, ignore_conflicts=True)
+
+        user_links = []
+        users_through = permission_model.users.through
+        for codename, users in permission_users.items():
+            permission_id = permission_ids[base_permission_ids[codename]]
+            for user in users:
+                user_links.append(users_through(**{
+                    permission_model.users.field.m2m_column_name(): permission_id,
+                    permission_model.users.field.m2m_reverse_name(): user.id,
+                }))
+        if user_links:
+            users_through.objects.bulk_create(user_links, ignore_conflicts=True)
+        permission_cache.bump_entity(type(entity), entity.pk)
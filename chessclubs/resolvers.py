@@ -0,0 +1,48 @@
+"""Request-scoped resolution of the club, tournament and match a request refers to.
+
+A view and each of its decorators need the objects named in the URL. The resolvers load each of them at most once
+per request and attach it to the request (request.club, request.tournament and request.match), so the decorators and
+the view share the same instances. Clubs and tournaments can be identified by their name or by their primary key.
+"""
+from .models import Club, Match, Tournament
+
+
+def _lookup(key):
+    return {'pk': key} if isinstance(key, int) else {'name': key}
+
+
+def _is_identified_by(obj, key):
+    return obj is not None and (obj.pk == key if isinstance(key, int) else obj.name == key)
+
+
+def get_club(request, club_key):
+    """Returns the club identified by club_key (a name or a primary key), raising Club.DoesNotExist if it doesn't
+    exist"""
+    club = getattr(request, 'club', None)
+    if not _is_identified_by(club, club_key):
+        tournament = getattr(request, 'tournament', None)
+        if tournament is not None and _is_identified_by(tournament.club, club_key):
+            club = tournament.club
+        else:
+            club = Club.objects.get(**_lookup(club_key))
+        request.club = club
+    return club
+
+
+def get_tournament(request, tournament_key):
+    """Returns the tournament identified by tournament_key (a name or a primary key) with its club and organiser,
+    raising Tournament.DoesNotExist if it doesn't exist"""
+    tournament = getattr(request, 'tournament', None)
+    if not _is_identified_by(tournament, tournament_key):
+        tournament = Tournament.objects.select_related('club', 'organiser').get(**_lookup(tournament_key))
+        request.tournament = tournament
+    return tournament
+
+
+def get_match(request, match_id):
+    """Returns the match of the given id, raising Match.DoesNotExist if it doesn't exist"""
+    match = getattr(request, 'match', None)
+    if match is None or match.pk != match_id:
+        match = Match.objects.get(pk=match_id)
+        request.match = match
+    return match
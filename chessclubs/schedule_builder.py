@@ -0,0 +1,31 @@
+"""Batched creation of the matches of a tournament schedule.
+
+Pool matches and elimination matches are stored in the Match table, so a whole schedule is written with bulk_create,
+one INSERT per batch. When the database cannot return the primary keys of a bulk insert (e.g. SQLite), they are read
+back, matching each row by its tournament and players (a pairing appears at most once in a schedule).
+"""
+from django.db import router, transaction
+from django.db.models import Max
+
+
+def bulk_create_matches(matches):
+    """Saves unsaved matches of the same model (PoolMatch or EliminationMatch) in bulk and returns them"""
+    if not matches:
+        return matches
+    model = type(matches[0])
+    using = router.db_for_write(model)
+    saved_matches = model._base_manager.using(using)
+
+    with transaction.atomic(using=using):
+        last_id = saved_matches.aggregate(last_id=Max('id'))['last_id'] or 0
+        saved_matches.bulk_create(matches)
+        if matches[0].pk is None:
+            ids = {
+                (tournament_id, player1_id, player2_id): match_id
+                for match_id, tournament_id, player1_id, player2_id in saved_matches.filter(
+                    id__gt=last_id, tournament_id__in={match.tournament_id for match in matches}
+                ).values_list('id', 'tournament_id', '_player1_id', '_player2_id')
+            }
+            for match in matches:
+                match.pk = ids[(match.tournament_id, match._player1_id, match._player2_id)]
+    return matches
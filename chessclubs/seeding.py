@@ -0,0 +1,72 @@
+"""Bulk creation of users, club memberships and tournament participants.
+
+Creating users one by one hashes each of their passwords (PBKDF2), and adding them to clubs and tournaments one by one
+costs several queries per user. These helpers write large datasets with a constant number of bulk inserts per batch:
+the password is hashed once and its hash shared by all the users created, and memberships are inserted directly in the
+through tables of the club members and of the role groups. Bulk inserts do not send m2m_changed signals, so the
+permission cache is invalidated explicitly (as a whole: datasets are large).
+"""
+from django.contrib.auth.hashers import make_password
+
+from .group_registry import group_registry
+from .models import Player, User
+from .permission_cache import permission_cache
+
+# Number of rows written by each bulk insert, and of values looked up by each IN query
+BATCH_SIZE = 500
+
+
+def bulk_create_users(users_data, password=None, password_hash=None):
+    """Creates users from a list of dictionaries of their fields (email, first_name, last_name, ...) and returns them in
+    the same order. All the users share the password, hashed once (or the given precomputed password hash)."""
+    password_hash = password_hash or make_password(password)
+    User.objects.bulk_create([User(password=password_hash, **user_data) for user_data in users_data],
+                             batch_size=BATCH_SIZE)
+    emails = [user_data['email'] for user_data in users_data]
+    users_by_email = {}
+    for batch in _batches(emails):
+        users_by_email.update((user.email, user) for user in User.objects.filter(email__in=batch))
+    return [users_by_email[email] for email in emails]
+
+
+def bulk_add_members(club, users, role="members"):
+    """Adds users to the members of the club with the given role (the name suffix of one of its role groups)"""
+    users = list(users)
+    members_through = club.members.through
+    members_through.objects.bulk_create(
+        [members_through(club_id=club.id, user_id=user.id) for user in users],
+        batch_size=BATCH_SIZE, ignore_conflicts=True
+    )
+    _bulk_add_to_group(group_registry.get_group(club, role), users)
+
+
+def bulk_add_to_group(entity, role, users):
+    """Adds users to the role group of a club or tournament (e.g. the applicants of a club)"""
+    _bulk_add_to_group(group_registry.get_group(entity, role), list(users))
+
+
+def bulk_add_participants(tournament, users):
+    """Registers users as participants of the tournament and returns their player profiles, in the same order"""
+    users = list(users)
+    Player.objects.bulk_create([Player(user=user, tournament=tournament) for user in users], batch_size=BATCH_SIZE)
+    players_by_user_id = {}
+    for batch in _batches([user.id for user in users]):
+        players_by_user_id.update(
+            (player.user_id, player) for player in Player.objects.filter(tournament=tournament, user_id__in=batch)
+        )
+    _bulk_add_to_group(group_registry.get_group(tournament, "participants"), users)
+    return [players_by_user_id[user.id] for user in users]
+
+
+def _bulk_add_to_group(group, users):
+    groups_through = User.groups.through
+    groups_through.objects.bulk_create(
+        [groups_through(user_id=user.id, group_id=group.id) for user in users],
+        batch_size=BATCH_SIZE, ignore_conflicts=True
+    )
+    permission_cache.clear()
+
+
+def _batches(values):
+    for start in range(0, len(values), BATCH_SIZE):
+        yield values[start:start + BATCH_SIZE]
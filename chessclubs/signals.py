@@ -0,0 +1,93 @@
+"""Signal receivers of the chessclubs app."""
+from django.contrib.auth.models import Group
+from django.db.models.signals import m2m_changed, post_delete, post_migrate, post_save, pre_save
+from django.dispatch import receiver
+from notifications.models import Notification
+
+from .group_registry import group_registry
+from .models import Club, ClubPermission, Tournament, TournamentPermission, User
+from .permission_cache import permission_cache
+from .provisioning import clear_base_permission_ids
+from .unread_counter import unread_counter
+
+M2M_CHANGES = ("post_add", "post_remove", "post_clear")
+
+
+@receiver(pre_save, sender=Club)
+@receiver(pre_save, sender=Tournament)
+def invalidate_group_handles_on_rename(sender, instance, **kwargs):
+    """Forget the group handles of a club or tournament whose name is about to change.
+    Handles resolved by other instances or processes are keyed by name as well, so they are never reused after a rename."""
+    for role, group in instance.__dict__.get('_group_handles', {}).items():
+        if group.name != f"{instance.name}_{role}":
+            group_registry.invalidate(instance)
+            return
+
+
+@receiver(post_delete, sender=Club)
+@receiver(post_delete, sender=Tournament)
+def invalidate_group_handles_on_delete(sender, instance, **kwargs):
+    group_registry.invalidate(instance)
+
+
+@receiver(post_delete, sender=Club)
+@receiver(post_delete, sender=Tournament)
+def invalidate_permissions_on_delete(sender, instance, **kwargs):
+    permission_cache.bump_entity(sender, instance.pk)
+
+
+@receiver(post_delete, sender=Group)
+def clear_group_registry_on_group_delete(sender, instance, **kwargs):
+    group_registry.clear()
+    permission_cache.clear()
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def invalidate_permissions_of_users(sender, instance, action, reverse, pk_set, **kwargs):
+    """Invalidate the permission sets of the users whose groups or direct permissions changed"""
+    if action not in M2M_CHANGES:
+        return
+    if not reverse:
+        permission_cache.bump_user(instance.pk)
+    elif pk_set:
+        for user_pk in pk_set:
+            permission_cache.bump_user(user_pk)
+    elif action == "post_clear":
+        permission_cache.clear()
+
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def invalidate_permissions_of_groups(sender, action, **kwargs):
+    if action in M2M_CHANGES:
+        permission_cache.clear()
+
+
+@receiver(m2m_changed, sender=ClubPermission.groups.through)
+@receiver(m2m_changed, sender=ClubPermission.users.through)
+@receiver(m2m_changed, sender=TournamentPermission.groups.through)
+@receiver(m2m_changed, sender=TournamentPermission.users.through)
+def invalidate_permissions_of_entity(sender, instance, action, reverse, pk_set, **kwargs):
+    """Invalidate the permission sets held in a club or tournament whose permissions were granted or revoked"""
+    if action not in M2M_CHANGES:
+        return
+    if not reverse:
+        if isinstance(instance, ClubPermission):
+            permission_cache.bump_entity(Club, instance.club_id)
+        else:
+            permission_cache.bump_entity(Tournament, instance.tournament_id)
+    elif isinstance(instance, User):
+        permission_cache.bump_user(instance.pk)
+    else:
+        permission_cache.clear()
+
+
+@receiver(post_migrate)
+def reload_base_permissions_after_migrate(sender, **kwargs):
+    clear_base_permission_ids()
+
+
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+def invalidate_unread_count(sender, instance, **kwargs):
+    unread_counter.invalidate([instance.recipient_id])
@@ -0,0 +1,59 @@
+"""Computation of the standings of the players of a pool.
+
+The standings of a pool are materialized in the Standing table, one row per player of the pool, so that qualification
+and the standings pages read them in order from the (pool, rank) index. Entering a result adds it to the points, wins,
+draws and losses of the two players of the match. The tiebreaks depend on the results of the other players of the pool
+and are recomputed from the (at most 15) results of the pool before the players are ranked by:
+
+- points (1 for a win, 0.5 for a draw),
+- head-to-head: points scored against the players with the same number of points,
+- Sonneborn-Berger: sum of the points of the beaten opponents and half the points of the drawn opponents,
+- wins, and finally
+- player id, so that the ranking is deterministic.
+
+The functions work on any objects with the attributes of a Standing. Migration 0009 keeps its own copy of them.
+"""
+
+WIN_POINTS = 1.0
+DRAW_POINTS = 0.5
+
+
+def add_result(standings, player1_id, player2_id, winner_id):
+    """Adds the result of a match to the standings (a dict of standings by player id). A winner_id of None is a
+    draw."""
+    if winner_id is None:
+        for player_id in (player1_id, player2_id):
+            standings[player_id].points += DRAW_POINTS
+            standings[player_id].draws += 1
+    else:
+        loser_id = player2_id if winner_id == player1_id else player1_id
+        standings[winner_id].points += WIN_POINTS
+        standings[winner_id].wins += 1
+        standings[loser_id].losses += 1
+
+
+def rank(standings, results):
+    """Recomputes the tiebreaks of the standings (a dict of standings by player id) from the results of the pool,
+    given as (player1_id, player2_id, winner_id) tuples, and sets their ranks. Returns the standings, best first."""
+    for standing in standings.values():
+        standing.head_to_head = 0.0
+        standing.sonneborn_berger = 0.0
+    for player1_id, player2_id, winner_id in results:
+        first, second = standings[player1_id], standings[player2_id]
+        if winner_id is None:
+            scores = ((first, second, DRAW_POINTS), (second, first, DRAW_POINTS))
+        elif winner_id == player1_id:
+            scores = ((first, second, WIN_POINTS),)
+        else:
+            scores = ((second, first, WIN_POINTS),)
+        for standing, opponent, score in scores:
+            standing.sonneborn_berger += score * opponent.points
+            if standing.points == opponent.points:
+                standing.head_to_head += score
+
+    ranking = sorted(standings.values(), key=lambda standing: (
+        -standing.points, -standing.head_to_head, -standing.sonneborn_berger, -standing.wins, standing.player_id
+    ))
+    for position, standing in enumerate(ranking, start=1):
+        standing.rank = position
+    return ranking
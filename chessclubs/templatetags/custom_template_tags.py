@@ -1,6 +1,10 @@
 from django import template
 from django.utils import timezone
 
+from chessclubs.models import Tournament
+from chessclubs.unread_counter import unread_counter
+from Wildebeest.settings import NOTIFICATIONS_DROPDOWN_SIZE
+
 register = template.Library()
 
 
@@ -9,11 +13,28 @@ def club_user_status(club, user):
     return club.user_status(user)
 
 
+@register.filter(name='status_in')
+def status_in(statuses, user):
+    """Look up the status of a user in a dictionary returned by Club.user_statuses"""
+    return statuses.get(user.id, "authenticated_non_member_user")
+
+
 @register.filter(name='tournament_user_status')
 def tournament_user_status(tournament, user):
     return tournament.user_status(user)
 
 
+@register.simple_tag
+def unread_notification_count(user):
+    return unread_counter.get(user)
+
+
+@register.simple_tag
+def latest_unread_notifications(user):
+    """The newest unread notifications of the user, as many as fit in the navbar dropdown"""
+    return list(user.notifications.unread()[:NOTIFICATIONS_DROPDOWN_SIZE])
+
+
 @register.simple_tag
 def current_time():
     return timezone.now()
@@ -33,27 +54,16 @@ def increment(i):
 
 @register.simple_tag
 def past_tournaments(tournaments):
-    past = []
-    for tournament in tournaments:
-        if tournament.has_finished():
-            past.append(tournament)
-    return past
+    """Tournaments annotated with their lifecycle state (TournamentQuerySet.with_lifecycle) that have finished"""
+    return [tournament for tournament in tournaments if tournament.lifecycle == Tournament.PAST]
 
 @register.simple_tag
 def current_tournaments(tournaments):
-    current = []
-    for tournament in tournaments:
-        if tournament.has_started() and not tournament.has_finished():
-            current.append(tournament)
-    return current
+    return [tournament for tournament in tournaments if tournament.lifecycle == Tournament.CURRENT]
 
 @register.simple_tag
 def future_tournaments(tournaments):
-    future = []
-    for tournament in tournaments:
-        if not tournament.has_started():
-            future.append(tournament)
-    return future
+    return [tournament for tournament in tournaments if tournament.lifecycle == Tournament.FUTURE]
 
 @register.simple_tag
 def lengthof(some_list):
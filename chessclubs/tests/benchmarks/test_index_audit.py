@@ -0,0 +1,32 @@
+"""Tests of the index audit of the hot queries."""
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from chessclubs.index_audit import HOT_PATHS, audit
+from chessclubs.models import Club, User
+
+
+class IndexAuditTestCase(TestCase):
+    """Tests of the index audit of the hot queries"""
+
+    def test_hot_paths_are_audited(self):
+        plans = audit()
+        self.assertEqual({plan.path for plan in plans}, set(HOT_PATHS))
+        for plan in plans:
+            self.assertTrue(plan.plan)
+
+    def test_hot_queries_do_not_scan_or_sort_without_an_index(self):
+        flagged = [f"[{plan.path}] {plan.sql}: {plan.plan}" for plan in audit() if plan.flagged]
+        self.assertEqual(flagged, [])
+
+    def test_audit_leaves_the_database_unchanged(self):
+        audit()
+        self.assertFalse(User.objects.exists())
+        self.assertFalse(Club.objects.exists())
+
+    def test_audit_command(self):
+        output = StringIO()
+        call_command('audit_indexes', '--fail-on-scan', stdout=output)
+        self.assertIn("0 flagged", output.getvalue())
@@ -0,0 +1,52 @@
+"""Password hashing and query count benchmarks for logging in."""
+from unittest import mock
+
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from chessclubs.models import User
+
+
+class LoginBenchmarkTestCase(TestCase):
+    """Benchmarks of the password hashes and queries of successful and failed logins"""
+
+    fixtures = ['chessclubs/tests/fixtures/default_user.json']
+
+    def setUp(self):
+        self.user = User.objects.get(email='johndoe@example.org')
+        self.url = reverse('log_in')
+
+    def test_successful_login_hashes_once(self):
+        self.assertEqual(self._count_hashes(lambda: self._log_in('Password123')), 1)
+        self.assertIn('_auth_user_id', self.client.session)
+
+    def test_failed_login_with_wrong_password_hashes_once(self):
+        self.assertEqual(self._count_hashes(lambda: self._log_in('WrongPassword123')), 1)
+        self.assertNotIn('_auth_user_id', self.client.session)
+
+    def test_failed_login_of_unknown_user_hashes_once(self):
+        self.assertEqual(self._count_hashes(lambda: self._log_in('Password123', email='nobody@example.org')), 1)
+        self.assertNotIn('_auth_user_id', self.client.session)
+
+    def test_failed_authentication_looks_the_user_up_once(self):
+        with CaptureQueriesContext(connection) as context:
+            self.assertIsNone(authenticate(email=self.user.email, password='WrongPassword123'))
+        self.assertEqual(len(context.captured_queries), 1)
+
+    def test_authentication_of_unknown_user_looks_the_user_up_once(self):
+        with CaptureQueriesContext(connection) as context:
+            self.assertIsNone(authenticate(email='nobody@example.org', password='Password123'))
+        self.assertEqual(len(context.captured_queries), 1)
+
+    def _log_in(self, password, email=None):
+        self.client.post(self.url, {'email': email or self.user.email, 'password': password})
+
+    def _count_hashes(self, function):
+        with mock.patch.object(PBKDF2PasswordHasher, 'encode', autospec=True,
+                               side_effect=PBKDF2PasswordHasher.encode) as encode:
+            function()
+        return encode.call_count
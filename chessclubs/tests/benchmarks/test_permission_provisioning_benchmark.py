@@ -0,0 +1,62 @@
+"""Query count benchmarks for the provisioning of club and tournament permissions."""
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from chessclubs.forms import ClubForm
+from chessclubs.models import User, Club, Tournament, ClubPermission, TournamentPermission
+
+# Query counts measured before permissions were provisioned in bulk (one get/get_or_create/add per permission)
+CLUB_CREATION_QUERIES_BEFORE = 171
+TOURNAMENT_PROVISIONING_QUERIES_BEFORE = 56
+
+# Budgets of the bulk provisioning engine (the base permissions are loaded once per process)
+CLUB_CREATION_QUERY_BUDGET = 16
+TOURNAMENT_PROVISIONING_QUERY_BUDGET = 12
+
+
+class PermissionProvisioningBenchmarkTestCase(TestCase):
+    """Benchmarks of the number of queries needed to provision a club or tournament"""
+
+    fixtures = ['chessclubs/tests/fixtures/default_user.json']
+
+    def setUp(self):
+        self.owner = User.objects.get(email='johndoe@example.org')
+
+    def test_club_creation_query_count(self):
+        self._create_club('Warm_Up_Club')
+        with CaptureQueriesContext(connection) as context:
+            club = self._create_club('Benchmark_Club')
+        self.assertLessEqual(len(context.captured_queries), CLUB_CREATION_QUERY_BUDGET)
+        self.assertLess(len(context.captured_queries), CLUB_CREATION_QUERIES_BEFORE // 10)
+        self.assertEqual(ClubPermission.objects.filter(club=club).count(), len(Club._meta.permissions))
+        self.assertEqual(club.user_status(self.owner), "owner")
+
+    def test_club_creation_query_count_does_not_depend_on_number_of_clubs(self):
+        self._create_club('Warm_Up_Club')
+        with CaptureQueriesContext(connection) as first:
+            self._create_club('First_Club')
+        for i in range(5):
+            self._create_club(f'Other_Club{i}')
+        with CaptureQueriesContext(connection) as last:
+            self._create_club('Last_Club')
+        self.assertEqual(len(first.captured_queries), len(last.captured_queries))
+
+    def test_tournament_provisioning_query_count(self):
+        club = self._create_club('Benchmark_Club')
+        tournament = Tournament.objects.create(name="Benchmark_Tournament", description="Description",
+                                               location="London", max_capacity=16,
+                                               deadline=timezone.now() + timezone.timedelta(days=1),
+                                               organiser=self.owner, club=club)
+        with CaptureQueriesContext(connection) as context:
+            tournament.assign_tournament_permissions_and_groups()
+        self.assertLessEqual(len(context.captured_queries), TOURNAMENT_PROVISIONING_QUERY_BUDGET)
+        self.assertLess(len(context.captured_queries), TOURNAMENT_PROVISIONING_QUERIES_BEFORE // 4)
+        self.assertEqual(TournamentPermission.objects.filter(tournament=tournament).count(),
+                         len(Tournament._meta.permissions))
+
+    def _create_club(self, name):
+        form = ClubForm(data={'name': name, 'location': 'London', 'description': 'Description'})
+        self.assertTrue(form.is_valid())
+        return form.save(self.owner)
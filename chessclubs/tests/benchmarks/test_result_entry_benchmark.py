@@ -0,0 +1,43 @@
+"""Query count benchmarks for the entry of match results."""
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from chessclubs.models import Club, Tournament
+from chessclubs.tests.helpers import _create_test_players
+
+# Budget of the queries needed to enter the result of a pool match that does not end its pool, whatever the size of
+# the pool phase (including the queries locking the match, its pool and its pool phase)
+POOL_RESULT_QUERY_BUDGET = 17
+
+
+class ResultEntryBenchmarkTestCase(TestCase):
+    """Benchmarks of the number of queries needed to enter the result of a match"""
+
+    fixtures = [
+        'chessclubs/tests/fixtures/default_user.json',
+        'chessclubs/tests/fixtures/other_users.json',
+        'chessclubs/tests/fixtures/default_club.json',
+        'chessclubs/tests/fixtures/empty_tournament.json',
+    ]
+
+    def setUp(self):
+        self.club = Club.objects.get(name="Test_Club")
+        self.tournament = Tournament.objects.get(name="Empty_Tournament")
+        self.tournament._set_deadline_now()
+
+    def _count_result_queries(self, player_count):
+        _create_test_players(player_count, self.club, self.tournament)
+        self.tournament.start_tournament()
+        match = self.tournament.get_current_schedule()[-1]
+        winner = match.get_player1()
+        with CaptureQueriesContext(connection) as context:
+            self.tournament.enter_result(match, winner=winner)
+        return len(context.captured_queries)
+
+    def test_pool_result_queries_do_not_depend_on_phase_size(self):
+        queries = self._count_result_queries(96)
+        self.assertLessEqual(queries, POOL_RESULT_QUERY_BUDGET)
+
+    def test_pool_result_queries_in_small_phase(self):
+        self.assertLessEqual(self._count_result_queries(17), POOL_RESULT_QUERY_BUDGET)
@@ -0,0 +1,52 @@
+"""Tests of the scaled seeding of the database."""
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from chessclubs.group_registry import group_registry
+from chessclubs.models import Club, Player, Tournament, User
+
+
+class ScaleSeedingTestCase(TestCase):
+    """Tests of the seed command with --scale"""
+
+    def _seed(self, users, clubs, tournaments_per_club=3):
+        call_command('seed', '--scale', '--users', str(users), '--clubs', str(clubs),
+                     '--tournaments-per-club', str(tournaments_per_club), stdout=StringIO())
+
+    def test_scale_seeding_creates_the_requested_dataset(self):
+        self._seed(users=60, clubs=3)
+        self.assertEqual(User.objects.count(), 60)
+        self.assertEqual(Club.objects.count(), 3)
+        self.assertEqual(Tournament.objects.count(), 9)
+        for club in Club.objects.all():
+            self.assertTrue(club.members.filter(id=club.owner_id).exists())
+            self.assertEqual(group_registry.get_group(club, "officers").user_set.count(), 5)
+            self.assertTrue(group_registry.get_group(club, "members").user_set.exists())
+        for tournament in Tournament.objects.all():
+            players = Player.objects.filter(tournament=tournament)
+            self.assertTrue(players.exists())
+            self.assertEqual(group_registry.get_group(tournament, "participants").user_set.count(), players.count())
+        self.assertTrue(Tournament.objects.filter(_started=True).exists())
+
+    def test_users_share_a_password_hashed_once(self):
+        self._seed(users=20, clubs=1, tournaments_per_club=0)
+        self.assertEqual(User.objects.values('password').distinct().count(), 1)
+        self.assertTrue(User.objects.first().check_password("Password123"))
+
+    def test_user_creation_does_not_query_per_user(self):
+        with CaptureQueriesContext(connection) as small:
+            self._seed(users=20, clubs=1, tournaments_per_club=0)
+        User.objects.all().delete()
+        Club.objects.all().delete()
+        with CaptureQueriesContext(connection) as large:
+            self._seed(users=200, clubs=1, tournaments_per_club=0)
+        self.assertLess(len(large.captured_queries) - len(small.captured_queries), 10)
+
+    def test_scale_seeding_needs_users_and_clubs(self):
+        with self.assertRaises(CommandError):
+            self._seed(users=2, clubs=1)
@@ -0,0 +1,57 @@
+"""Query count benchmarks for the generation of tournament schedules."""
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from chessclubs.models import Club, Tournament, Match, PoolMatch, EliminationMatch
+from chessclubs.tests.helpers import _create_test_players
+
+# Query count measured before schedules were written in bulk (several queries per match and per pool player index)
+LARGE_POOL_PHASE_PUBLISH_QUERIES_BEFORE = 1904
+
+# Budget of the batched schedule builder
+LARGE_POOL_PHASE_PUBLISH_QUERY_BUDGET = 100
+
+
+class ScheduleGenerationBenchmarkTestCase(TestCase):
+    """Benchmarks of the number of queries needed to publish the schedule of a tournament"""
+
+    fixtures = [
+        'chessclubs/tests/fixtures/default_user.json',
+        'chessclubs/tests/fixtures/other_users.json',
+        'chessclubs/tests/fixtures/default_club.json',
+        'chessclubs/tests/fixtures/empty_tournament.json',
+    ]
+
+    def setUp(self):
+        self.club = Club.objects.get(name="Test_Club")
+        self.tournament = Tournament.objects.get(name="Empty_Tournament")
+        self.tournament._set_deadline_now()
+
+    def test_publish_96_player_schedule(self):
+        _create_test_players(96, self.club, self.tournament)
+        with CaptureQueriesContext(connection) as context:
+            self.tournament.publish_schedule()
+        self.assertLessEqual(len(context.captured_queries), LARGE_POOL_PHASE_PUBLISH_QUERY_BUDGET)
+        self.assertLess(len(context.captured_queries), LARGE_POOL_PHASE_PUBLISH_QUERIES_BEFORE // 10)
+        pool_phase = self.tournament.get_current_pool_phase()
+        expected_matches = sum(pool.get_players_count() * (pool.get_players_count() - 1) // 2
+                               for pool in pool_phase.get_pools())
+        self.assertEqual(PoolMatch.objects.filter(pool__pool_phase=pool_phase).count(), expected_matches)
+        self.assertEqual(len(self.tournament.get_current_schedule()), expected_matches)
+
+    def test_publish_elimination_schedule(self):
+        _create_test_players(16, self.club, self.tournament)
+        self.tournament.publish_schedule()
+        matches = EliminationMatch.objects.filter(elimination_round=self.tournament.elimination_round)
+        self.assertEqual(matches.count(), 8)
+        players = [player for match in matches for player in (match.get_player1(), match.get_player2())]
+        self.assertEqual(len(set(players)), 16)
+
+    def test_bulk_created_matches_are_saved(self):
+        _create_test_players(32, self.club, self.tournament)
+        self.tournament.publish_schedule()
+        for match in PoolMatch.objects.all():
+            self.assertEqual(Match.objects.get(pk=match.pk).tournament, self.tournament)
+            self.assertIn(match.get_player1(), match.pool.get_players())
+            self.assertIn(match.get_player2(), match.pool.get_players())
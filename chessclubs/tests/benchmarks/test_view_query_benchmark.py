@@ -0,0 +1,380 @@
+"""Query count regression benchmarks of every view, on graded datasets.
+
+Each view of Wildebeest/urls.py is requested with the test client on datasets of growing size: clubs of 10, 100 and
+1000 members for the club and user views, and tournaments of 2, 16, 32 and 96 players for the tournament views. The
+queries of each request are read from the request metrics (see chessclubs/metrics.py) and checked against the
+baseline recorded in view_query_baseline.json: a view fails if it runs more queries than recorded, or if its query
+count grows with the size of the data faster than its declared complexity class allows. The wall time of each request
+depends on the machine, so it is only printed at the end of the run and never recorded.
+
+Set UPDATE_VIEW_QUERY_BASELINE=1 to record a new baseline after an intended change.
+"""
+import json
+import os
+import sys
+from pathlib import Path
+
+from django.db import transaction
+from django.test import TestCase
+from django.urls import URLPattern, reverse
+from django.utils import timezone
+from notifications.signals import notify
+
+from chessclubs.metrics import registry
+from chessclubs.models import Club, Tournament
+from chessclubs.seeding import bulk_add_members, bulk_add_participants, bulk_add_to_group, bulk_create_users
+from Wildebeest import urls
+
+BASELINE_PATH = Path(__file__).with_name('view_query_baseline.json')
+UPDATE_BASELINE = os.environ.get('UPDATE_VIEW_QUERY_BASELINE') == '1'
+
+CLUB_SIZES = [10, 100, 1000]
+TOURNAMENT_SIZES = [2, 16, 32, 96]
+
+PASSWORD = 'Password123'
+
+# Complexity classes: the query count of a constant view may not grow with the data, the query count of a view that
+# is constant per phase may only differ between tournaments in different phases (see RESULT_PHASES), and the query
+# count of a linear view may not grow faster than its declared rate (see QUERY_GROWTH_RATES). All are allowed a few
+# queries of slack.
+CONSTANT = "constant"
+CONSTANT_PER_PHASE = "constant per phase"
+LINEAR = "linear"
+QUERY_SLACK = 5
+
+# Complexity class of each view (by URL name), measured on clubs and on tournaments of growing size
+CLUB_VIEWS = {
+    'show_club': CONSTANT,
+    'show_user': CONSTANT,
+    'user_list': CONSTANT,
+    'promote': CONSTANT,
+    'demote': CONSTANT,
+    'transfer_ownership': CONSTANT,
+    'view_applications': CONSTANT,
+    'accept': CONSTANT,
+    'deny': CONSTANT,
+    'acknowledge': CONSTANT,
+    'apply_club': CONSTANT,
+    'create_tournament': CONSTANT,
+    'ban': CONSTANT,
+    'leave': CONSTANT,
+    'edit_club': CONSTANT,
+    'landing_page': CONSTANT,
+    'my_applications': CONSTANT,
+    'home': CONSTANT,
+    'sign_up': CONSTANT,
+    'log_in': CONSTANT,
+    'log_out': CONSTANT,
+    'my_profile': CONSTANT,
+    'password': CONSTANT,
+    'change_profile': CONSTANT,
+    'create_club': CONSTANT,
+    'mark_as_read': CONSTANT,
+    'notifications_inbox': CONSTANT,
+    'mark_all_as_read': CONSTANT,
+    'metrics': CONSTANT,
+}
+TOURNAMENT_VIEWS = {
+    'show_tournament': CONSTANT,
+    'join_tournament': CONSTANT,
+    'withdraw_tournament': CONSTANT,
+    'show_schedule': LINEAR,
+    'add_co_organiser': CONSTANT,
+    'enter_result': CONSTANT_PER_PHASE,
+    'publish_schedule': LINEAR,
+    'start_tournament': LINEAR,
+    'my_matches': CONSTANT,
+}
+
+# Queries a linear view may add per member or player of its dataset
+QUERY_GROWTH_RATES = {
+    'show_schedule': 0.5,
+    'publish_schedule': 1,
+    'start_tournament': 1,
+}
+
+# Phase of the first result entered in a started tournament of each size: the only match of two players is the final,
+# tournaments of up to 16 players start with an elimination round and larger ones with a pool phase
+RESULT_PHASES = {2: "final", 16: "elimination round", 32: "pool phase", 96: "pool phase"}
+
+
+def _users_data(prefix, count):
+    return [{'email': f'{prefix.lower()}.{index}@example.org', 'first_name': f'{prefix}{index}',
+             'last_name': 'Bench', 'bio': 'Benchmark user', 'chess_experience': 'Novice',
+             'personal_statement': 'I play chess'} for index in range(count)]
+
+
+class ViewQueryBenchmarkTestCase(TestCase):
+    """Benchmarks of the number of queries run by every view as the data grows"""
+
+    measurements = {}
+    wall_times = {}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.clubs = {size: cls._seed_club(size) for size in CLUB_SIZES}
+        cls.tournaments = {size: cls._seed_tournament(size) for size in TOURNAMENT_SIZES}
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        if cls.wall_times:
+            print("\nWall time of each view (ms):", file=sys.stderr)
+            for name, wall_times in sorted(cls.wall_times.items()):
+                timings = ", ".join(f"{size}: {wall_time * 1000:.1f}" for size, wall_time in wall_times.items())
+                print(f"  {name}: {timings}", file=sys.stderr)
+        if UPDATE_BASELINE and cls.measurements:
+            with open(BASELINE_PATH, 'w') as baseline_file:
+                json.dump(cls.measurements, baseline_file, indent=2, sort_keys=True)
+                baseline_file.write('\n')
+
+    @classmethod
+    def _seed_club(cls, size):
+        """Seeds a club of the given number of members, with an officer, an applicant, an accepted applicant, a
+        denied applicant and an authenticated non-member"""
+        owner, officer, member, applicant, accepted_applicant, denied_applicant, non_member, *others = \
+            bulk_create_users(_users_data(f'Club{size}', size + 4), password=PASSWORD)
+        club = Club.objects.create(name=f"Bench_Club_{size}", location="London", description="Benchmark club",
+                                   owner=owner)
+        club.members.add(owner)
+        club.assign_club_groups_permissions()
+        bulk_add_members(club, [officer], role="officers")
+        bulk_add_members(club, [member, *others])
+        bulk_add_to_group(club, "applicants", [applicant])
+        bulk_add_to_group(club, "accepted_applicants", [accepted_applicant])
+        bulk_add_to_group(club, "denied_applicants", [denied_applicant])
+        return {'club': club, 'owner': owner, 'officer': officer, 'member': member, 'applicant': applicant,
+                'accepted_applicant': accepted_applicant, 'denied_applicant': denied_applicant,
+                'non_member': non_member}
+
+    @classmethod
+    def _seed_tournament(cls, size):
+        """Seeds a tournament of the given number of players, in a club with an officer and a member who are not
+        participants"""
+        organiser, officer, member, *participants = bulk_create_users(_users_data(f'Tournament{size}', size + 3),
+                                                                      password=PASSWORD)
+        club = Club.objects.create(name=f"Bench_Tournament_Club_{size}", location="London",
+                                   description="Benchmark club", owner=organiser)
+        club.members.add(organiser)
+        club.assign_club_groups_permissions()
+        bulk_add_members(club, [officer], role="officers")
+        bulk_add_members(club, [member, *participants])
+        tournament = Tournament.objects.create(name=f"Bench_Tournament_{size}", description="Benchmark tournament",
+                                               location="London", max_capacity=96, organiser=organiser, club=club,
+                                               deadline=timezone.now() + timezone.timedelta(days=1))
+        tournament.assign_tournament_permissions_and_groups()
+        bulk_add_participants(tournament, participants)
+        return {'tournament': tournament, 'organiser': organiser, 'officer': officer, 'member': member,
+                'participant': participants[0]}
+
+    def test_every_view_is_benchmarked(self):
+        url_names = {pattern.name for pattern in urls.urlpatterns if isinstance(pattern, URLPattern)}
+        self.assertEqual(url_names, set(CLUB_VIEWS) | set(TOURNAMENT_VIEWS))
+        linear_views = {name for name, complexity in {**CLUB_VIEWS, **TOURNAMENT_VIEWS}.items() if complexity == LINEAR}
+        self.assertEqual(linear_views, set(QUERY_GROWTH_RATES))
+
+    def test_club_and_user_views(self):
+        for name, complexity in CLUB_VIEWS.items():
+            with self.subTest(view=name):
+                self._benchmark(name, complexity, self.clubs)
+
+    def test_tournament_views(self):
+        for name, complexity in TOURNAMENT_VIEWS.items():
+            with self.subTest(view=name):
+                self._benchmark(name, complexity, self.tournaments)
+
+    def _benchmark(self, name, complexity, datasets):
+        queries = {}
+        wall_times = {}
+        for size, dataset in datasets.items():
+            queries[size], wall_times[size] = self._measure(name, dataset)
+        self.measurements[name] = {
+            'complexity': complexity,
+            'queries': {str(size): count for size, count in queries.items()},
+        }
+        self.wall_times[name] = wall_times
+        self._assert_within_complexity(name, complexity, queries)
+        if not UPDATE_BASELINE:
+            self._assert_within_baseline(name, queries)
+
+    def _measure(self, name, dataset):
+        """Requests the view on the dataset and returns the number of queries and wall time of the request. Changes
+        made to the dataset are rolled back."""
+        with transaction.atomic():
+            user, method, url, data = getattr(self, f'_request_{name}')(**dataset)
+            self.client.logout()
+            if user is not None:
+                self.client.force_login(user)
+            registry.reset()
+            getattr(self.client, method)(url, data)
+            queries = registry.get('queries', name)
+            wall_time = registry.get('wall_time', name)
+            self.assertIsNotNone(queries, f"No request of {name} was recorded")
+            transaction.set_rollback(True)
+        return queries.sum, wall_time.sum
+
+    def _assert_within_complexity(self, name, complexity, queries):
+        """Checks the growth of the query count from the smallest dataset (of the same phase, for a view that is
+        constant per phase) to each larger one"""
+        if complexity == CONSTANT_PER_PHASE:
+            groups = {}
+            for size in queries:
+                groups.setdefault(RESULT_PHASES[size], []).append(size)
+        else:
+            groups = {None: list(queries)}
+        rate = QUERY_GROWTH_RATES.get(name, 0) if complexity == LINEAR else 0
+        for sizes in groups.values():
+            smallest_size, *larger_sizes = sorted(sizes)
+            for size in larger_sizes:
+                growth = queries[size] - queries[smallest_size]
+                allowed = rate * (size - smallest_size) + QUERY_SLACK
+                self.assertLessEqual(
+                    growth, allowed,
+                    f"{name} ran {queries[size]} queries on a dataset of size {size} and {queries[smallest_size]} on "
+                    f"one of size {smallest_size}: more than its complexity ({complexity}) allows"
+                )
+
+    def _assert_within_baseline(self, name, queries):
+        with open(BASELINE_PATH) as baseline_file:
+            baseline = json.load(baseline_file)
+        self.assertIn(name, baseline, f"{name} has no baseline: run with UPDATE_VIEW_QUERY_BASELINE=1")
+        for size, count in queries.items():
+            recorded = baseline[name]['queries'][str(size)]
+            self.assertLessEqual(count, recorded,
+                                 f"{name} ran {count} queries on a dataset of size {size}, up from {recorded}")
+
+    # Requests of the club and user views: (user, method, url, data)
+
+    def _request_show_club(self, club, member, **dataset):
+        return member, 'get', reverse('show_club', kwargs={'club_name': club.name}), {}
+
+    def _request_show_user(self, club, member, officer, **dataset):
+        return member, 'get', reverse('show_user', kwargs={'club_name': club.name, 'user_id': officer.id}), {}
+
+    def _request_user_list(self, club, member, **dataset):
+        return member, 'get', reverse('user_list', kwargs={'club_name': club.name}), {}
+
+    def _request_promote(self, club, owner, member, **dataset):
+        return owner, 'get', reverse('promote', kwargs={'club_name': club.name, 'user_id': member.id}), {}
+
+    def _request_demote(self, club, owner, officer, **dataset):
+        return owner, 'get', reverse('demote', kwargs={'club_name': club.name, 'user_id': officer.id}), {}
+
+    def _request_transfer_ownership(self, club, owner, officer, **dataset):
+        return owner, 'get', reverse('transfer_ownership', kwargs={'club_name': club.name, 'user_id': officer.id}), {}
+
+    def _request_view_applications(self, club, owner, **dataset):
+        return owner, 'get', reverse('view_applications', kwargs={'club_name': club.name}), {}
+
+    def _request_accept(self, club, owner, applicant, **dataset):
+        return owner, 'get', reverse('accept', kwargs={'club_name': club.name, 'user_id': applicant.id}), {}
+
+    def _request_deny(self, club, owner, applicant, **dataset):
+        return owner, 'get', reverse('deny', kwargs={'club_name': club.name, 'user_id': applicant.id}), {}
+
+    def _request_acknowledge(self, club, accepted_applicant, **dataset):
+        return accepted_applicant, 'get', reverse('acknowledge', kwargs={'club_name': club.name}), {}
+
+    def _request_apply_club(self, club, non_member, **dataset):
+        return non_member, 'get', reverse('apply_club', kwargs={'club_name': club.name}), {}
+
+    def _request_create_tournament(self, club, officer, **dataset):
+        return officer, 'get', reverse('create_tournament', kwargs={'club_name': club.name}), {}
+
+    def _request_ban(self, club, owner, member, **dataset):
+        return owner, 'get', reverse('ban', kwargs={'club_name': club.name, 'user_id': member.id}), {}
+
+    def _request_leave(self, club, member, **dataset):
+        return member, 'get', reverse('leave', kwargs={'club_name': club.name}), {}
+
+    def _request_edit_club(self, club, owner, **dataset):
+        return owner, 'get', reverse('edit_club', kwargs={'club_name': club.name}), {}
+
+    def _request_landing_page(self, member, **dataset):
+        return member, 'get', reverse('landing_page'), {}
+
+    def _request_my_applications(self, applicant, **dataset):
+        return applicant, 'get', reverse('my_applications'), {}
+
+    def _request_home(self, **dataset):
+        return None, 'get', reverse('home'), {}
+
+    def _request_sign_up(self, **dataset):
+        return None, 'get', reverse('sign_up'), {}
+
+    def _request_log_in(self, member, **dataset):
+        return None, 'post', reverse('log_in'), {'email': member.email, 'password': PASSWORD}
+
+    def _request_log_out(self, member, **dataset):
+        return member, 'get', reverse('log_out'), {}
+
+    def _request_my_profile(self, member, **dataset):
+        return member, 'get', reverse('my_profile'), {}
+
+    def _request_password(self, member, **dataset):
+        return member, 'get', reverse('password'), {}
+
+    def _request_change_profile(self, member, **dataset):
+        return member, 'get', reverse('change_profile'), {}
+
+    def _request_create_club(self, member, **dataset):
+        return member, 'get', reverse('create_club'), {}
+
+    def _request_mark_as_read(self, club, owner, member, **dataset):
+        notify.send(owner, recipient=member, verb=f'{club.name}_Promote', description="Benchmark notification")
+        notification = member.notifications.get()
+        return member, 'get', reverse('mark_as_read', kwargs={'slug': notification.slug}), {}
+
+    def _request_notifications_inbox(self, member, **dataset):
+        return member, 'get', reverse('notifications_inbox'), {}
+
+    def _request_mark_all_as_read(self, member, **dataset):
+        return member, 'post', reverse('mark_all_as_read'), {}
+
+    def _request_metrics(self, **dataset):
+        return None, 'get', reverse('metrics'), {}
+
+    # Requests of the tournament views
+
+    def _tournament_url(self, name, tournament, **kwargs):
+        return reverse(name, kwargs={'club_name': tournament.club.name, 'tournament_name': tournament.name, **kwargs})
+
+    def _started_tournament(self, tournament):
+        tournament = Tournament.objects.get(pk=tournament.pk)
+        tournament._set_deadline_now()
+        tournament.start_tournament()
+        return tournament
+
+    def _request_show_tournament(self, tournament, organiser, **dataset):
+        return organiser, 'get', self._tournament_url('show_tournament', tournament), {}
+
+    def _request_join_tournament(self, tournament, member, **dataset):
+        return member, 'get', self._tournament_url('join_tournament', tournament), {}
+
+    def _request_withdraw_tournament(self, tournament, participant, **dataset):
+        return participant, 'get', self._tournament_url('withdraw_tournament', tournament), {}
+
+    def _request_show_schedule(self, tournament, organiser, **dataset):
+        tournament = self._started_tournament(tournament)
+        return organiser, 'get', self._tournament_url('show_schedule', tournament), {}
+
+    def _request_add_co_organiser(self, tournament, organiser, officer, **dataset):
+        return organiser, 'get', self._tournament_url('add_co_organiser', tournament, user_id=officer.id), {}
+
+    def _request_enter_result(self, tournament, organiser, **dataset):
+        tournament = self._started_tournament(tournament)
+        match = tournament.get_current_schedule()[0]
+        url = self._tournament_url('enter_result', tournament, match_id=match.id, result='player1')
+        return organiser, 'get', url, {}
+
+    def _request_publish_schedule(self, tournament, organiser, **dataset):
+        Tournament.objects.get(pk=tournament.pk)._set_deadline_now()
+        return organiser, 'get', self._tournament_url('publish_schedule', tournament), {}
+
+    def _request_start_tournament(self, tournament, organiser, **dataset):
+        Tournament.objects.get(pk=tournament.pk)._set_deadline_now()
+        return organiser, 'get', self._tournament_url('start_tournament', tournament), {}
+
+    def _request_my_matches(self, tournament, participant, **dataset):
+        self._started_tournament(tournament)
+        return participant, 'get', reverse('my_matches'), {}
@@ -58,7 +58,6 @@ class ClubGroupTester:
 
     def make_authenticated_non_member(self, user):
         self.remove_from_other_club_groups(user)
-        self.club.add_to_logged_in_non_members_group(user)
 
     def remove_from_other_club_groups(self, user):
         club_groups = Group.objects.filter(name__in=self.names)
@@ -1,8 +1,10 @@
 """Unit tests for the club model."""
+from django.contrib.auth.models import AnonymousUser
 from django.core.exceptions import ValidationError
 from django.test import TestCase
 
 from chessclubs.models import User, Club
+from chessclubs.tests.helpers import ClubGroupTester
 
 
 class ClubModelTestCase(TestCase):
@@ -82,6 +84,77 @@ class ClubModelTestCase(TestCase):
         self.club.toggle_membership(User.objects.get(email='janedoe@example.org'))
         self.assertEqual(self.club.member_count(), 1)
 
+    def test_user_status_uses_a_single_query(self):
+        group_tester = ClubGroupTester(self.club)
+        other_user = User.objects.get(email='janedoe@example.org')
+        group_tester.make_officer(other_user)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.club.user_status(other_user), "officer")
+        with self.assertNumQueries(1):
+            self.assertEqual(self.club.user_status(self.user), "owner")
+
+    def test_user_without_role_is_implicitly_authenticated_non_member(self):
+        ClubGroupTester(self.club)
+        other_user = User.objects.get(email='janedoe@example.org')
+        self.assertEqual(self.club.user_status(other_user), "authenticated_non_member_user")
+        self.assertFalse(other_user.groups.exists())
+
+    def test_anonymous_user_status(self):
+        self.assertEqual(self.club.user_status(AnonymousUser()), "anonymous")
+
+    def test_user_statuses_returns_status_of_every_user_in_one_query(self):
+        group_tester = ClubGroupTester(self.club)
+        applicant = User.objects.get(email='janedoe@example.org')
+        member = User.objects.get(email='petrapickles@example.org')
+        officer = User.objects.get(email='peterpickles@example.org')
+        group_tester.make_applicant(applicant)
+        group_tester.make_member(member)
+        group_tester.make_officer(officer)
+        with self.assertNumQueries(1):
+            statuses = self.club.user_statuses()
+        self.assertEqual(statuses, {self.user.id: "owner", applicant.id: "applicant", member.id: "member",
+                                    officer.id: "officer"})
+
+    def test_user_statuses_of_given_users(self):
+        group_tester = ClubGroupTester(self.club)
+        member = User.objects.get(email='petrapickles@example.org')
+        non_member = User.objects.get(email='janedoe@example.org')
+        group_tester.make_member(member)
+        statuses = self.club.user_statuses([member, non_member])
+        self.assertEqual(statuses, {member.id: "member", non_member.id: "authenticated_non_member_user"})
+
+    def test_user_statuses_agrees_with_user_status(self):
+        group_tester = ClubGroupTester(self.club)
+        users = list(User.objects.exclude(id=self.user.id))
+        group_tester.make_applicant(users[0])
+        group_tester.make_denied_applicant(users[1])
+        group_tester.make_accepted_applicant(users[2])
+        group_tester.make_member(users[3])
+        group_tester.make_officer(users[4])
+        group_tester.make_authenticated_non_member(users[5])
+        statuses = self.club.user_statuses(User.objects.all())
+        for user in User.objects.all():
+            self.assertEqual(statuses[user.id], self.club.user_status(user))
+
+    def test_get_officer_and_owner_ids(self):
+        group_tester = ClubGroupTester(self.club)
+        member = User.objects.get(email='petrapickles@example.org')
+        officer = User.objects.get(email='peterpickles@example.org')
+        group_tester.make_member(member)
+        group_tester.make_officer(officer)
+        with self.assertNumQueries(1):
+            ids = self.club.get_officer_and_owner_ids()
+        self.assertCountEqual(ids, [self.user.id, officer.id])
+
+    def test_statuses_of_user_across_clubs(self):
+        ClubGroupTester(self.second_club)
+        applicant = User.objects.get(email='janedoe@example.org')
+        ClubGroupTester(self.club).make_applicant(applicant)
+        self.second_club.add_to_denied_applicants_group(applicant)
+        with self.assertNumQueries(2):
+            statuses = Club.statuses_of_user(applicant)
+        self.assertEqual(statuses, {self.club: "applicant", self.second_club: "denied_applicant"})
+
     def _assert_club_is_valid(self):
         try:
             self.club.full_clean()
@@ -1,6 +1,6 @@
 from django.core.exceptions import ValidationError
 from django.test import TestCase
-from chessclubs.models import User, Club, Tournament, EliminationMatch, Player, EliminationRounds
+from chessclubs.models import User, Club, Tournament, EliminationMatch, Player, EliminationRounds, Match
 from chessclubs.tests.helpers import ClubGroupTester
 
 
@@ -41,6 +41,10 @@ class EliminationMatchModelTestCase(TestCase):
         self.assertFalse(self.elimination_match.is_open())
         self.assertEqual(winner, self.player2)
 
+    def test_match_is_loaded_as_elimination_match(self):
+        self.assertIsInstance(Match.objects.get(pk=1), EliminationMatch)
+        self.assertEqual(Match.objects.get(pk=1).kind, Match.ELIMINATION)
+
     def _assert_match_is_valid(self):
         try:
             self.elimination_match.full_clean()
@@ -51,6 +51,18 @@ class EliminationRoundTestCase(TestCase):
         enter_results_to_elimination_round_matches(self.elimination_round)
         self.assertFalse(self.elimination_round._open)
 
+    def test_remaining_matches_are_counted(self):
+        players = random.sample(self.players_list, 16)
+        generate_elimination_matches_schedule(players, self.elimination_round)
+        self.assertEqual(self.elimination_round.remaining_matches, 8)
+        match = self.elimination_round.schedule.all()[0]
+        self.elimination_round.enter_winner(match=match, winner=match.get_player1())
+        self.assertEqual(self.elimination_round.remaining_matches, 7)
+        self.elimination_round.enter_winner(match=match, winner=match.get_player2())
+        self.assertEqual(self.elimination_round.remaining_matches, 7)
+        self.elimination_round.clean_schedule()
+        self.assertEqual(self.elimination_round.remaining_matches, 0)
+
     def test_phase_must_be_among_choices(self):
         self.elimination_round.phase = "bad_choice"
         self._assert_elimination_round_is_invalid()
@@ -0,0 +1,82 @@
+"""Unit tests for the group registry."""
+from django.contrib.auth.models import Group
+from django.test import TestCase
+
+from chessclubs.group_registry import group_registry
+from chessclubs.models import Club, Tournament, User
+
+
+class GroupRegistryTestCase(TestCase):
+    """Unit tests for the registry resolving club and tournament groups"""
+
+    fixtures = [
+        'chessclubs/tests/fixtures/default_user.json',
+        'chessclubs/tests/fixtures/other_users.json',
+        'chessclubs/tests/fixtures/default_club.json',
+        'chessclubs/tests/fixtures/default_tournament.json',
+    ]
+
+    def setUp(self):
+        group_registry.clear()
+        self.club = Club.objects.get(name="Test_Club")
+        self.tournament = Tournament.objects.get(name="Test_Tournament")
+        self.user = User.objects.get(email='janedoe@example.org')
+
+    def tearDown(self):
+        # Handles published in a test point to groups that are rolled back afterwards
+        group_registry.clear()
+
+    def test_group_is_resolved_once_per_instance(self):
+        self.club.add_to_members_group(self.user)
+        with self.assertNumQueries(1):
+            self.club.remove_from_members_group(self.user)
+
+    def test_group_is_created_with_the_entity_name(self):
+        self.club.add_to_officers_group(self.user)
+        self.tournament.add_to_co_organisers_group(self.user)
+        self.assertTrue(self.user.groups.filter(name="Test_Club_officers").exists())
+        self.assertTrue(self.user.groups.filter(name="Test_Tournament_co_organisers").exists())
+
+    def test_committed_handle_is_shared_between_instances(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.club.add_to_members_group(self.user)
+        other_instance = Club.objects.get(pk=self.club.pk)
+        with self.assertNumQueries(1):
+            other_instance.remove_from_members_group(self.user)
+        self.assertFalse(self.user.groups.filter(name="Test_Club_members").exists())
+
+    def test_uncommitted_handle_is_not_shared(self):
+        with self.captureOnCommitCallbacks(execute=False):
+            self.club.add_to_members_group(self.user)
+        other_instance = Club.objects.get(pk=self.club.pk)
+        with self.assertNumQueries(2):
+            other_instance.remove_from_members_group(self.user)
+
+    def test_handle_is_not_reused_after_rename(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.club.add_to_members_group(self.user)
+        self.club.name = "Renamed_Club"
+        self.club.save()
+        self.club.add_to_members_group(self.user)
+        other_instance = Club.objects.get(pk=self.club.pk)
+        other_instance.add_to_officers_group(self.user)
+        self.assertTrue(self.user.groups.filter(name="Renamed_Club_members").exists())
+        self.assertTrue(self.user.groups.filter(name="Renamed_Club_officers").exists())
+
+    def test_handles_are_forgotten_when_a_group_is_deleted(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.club.add_to_members_group(self.user)
+        Group.objects.get(name="Test_Club_members").delete()
+        other_instance = Club.objects.get(pk=self.club.pk)
+        other_instance.add_to_members_group(self.user)
+        self.assertTrue(self.user.groups.filter(name="Test_Club_members").exists())
+
+    def test_handles_are_forgotten_when_the_club_is_deleted(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.club.add_to_members_group(self.user)
+        club_pk = self.club.pk
+        self.club.delete()
+        self.assertEqual(self.club.__dict__.get('_group_handles'), None)
+        new_club = Club.objects.create(pk=club_pk, name="Test_Club", location="London", owner=self.user)
+        with self.assertNumQueries(2):
+            new_club.add_to_members_group(self.user)
@@ -1,6 +1,6 @@
 from django.core.exceptions import ValidationError
 from django.test import TestCase
-from chessclubs.models import User, Club, Tournament, Match, Player
+from chessclubs.models import User, Club, Tournament, Match, Player, StaleMatchError
 from chessclubs.tests.helpers import ClubGroupTester
 
 
@@ -55,6 +55,14 @@ class MatchModelTestCase(TestCase):
         self.assertFalse(self.match.is_open())
         self.assertEqual(self.match.get_winner(), None)
 
+    def test_stale_match_cannot_be_closed(self):
+        stale_match = Match.objects.get(pk=1)
+        self.match.enter_winner(self.player1)
+        with self.assertRaises(StaleMatchError):
+            stale_match.enter_winner(self.player2)
+        self.match.refresh_from_db()
+        self.assertEqual(self.match.get_winner(), self.player1)
+
     def test_forbidden_get_winner(self):
         winner = self.match.get_winner()
         self.assertEqual(winner, None)
@@ -0,0 +1,90 @@
+"""Unit tests for the shared permission cache."""
+from django.test import TestCase
+
+from chessclubs.auth_backends import ClubBackend, permission_bits, permission_mask
+from chessclubs.models import Club, Tournament, User
+from chessclubs.permission_cache import permission_cache
+from chessclubs.tests.helpers import ClubGroupTester, TournamentGroupTester
+
+
+class PermissionCacheTestCase(TestCase):
+    """Unit tests for the cache of the permissions users hold in clubs and tournaments"""
+
+    fixtures = [
+        'chessclubs/tests/fixtures/default_user.json',
+        'chessclubs/tests/fixtures/other_users.json',
+        'chessclubs/tests/fixtures/default_club.json',
+        'chessclubs/tests/fixtures/default_tournament.json',
+    ]
+
+    def setUp(self):
+        # Permission sets published in a test refer to rows that are rolled back afterwards
+        permission_cache.clear()
+        self.club = Club.objects.get(name="Test_Club")
+        self.tournament = Tournament.objects.get(name="Test_Tournament")
+        self.club_tester = ClubGroupTester(self.club)
+        self.tournament_tester = TournamentGroupTester(self.tournament)
+        self.user = User.objects.get(email='janedoe@example.org')
+
+    def tearDown(self):
+        permission_cache.clear()
+
+    def test_club_and_tournament_with_the_same_pk_do_not_share_permissions(self):
+        self.assertEqual(self.club.pk, self.tournament.pk)
+        self.club_tester.make_member(self.user)
+        self.assertTrue(self.user.has_club_perm('chessclubs.access_members_list', self.club))
+        self.assertFalse(self.user.has_tournament_perm('chessclubs.play_matches', self.tournament))
+
+    def test_committed_permissions_are_checked_without_queries(self):
+        self.club_tester.make_member(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.has_club_perm('chessclubs.access_members_list', self.club)
+        user = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertTrue(user.has_club_perm('chessclubs.access_members_list', self.club))
+            self.assertFalse(user.has_club_perm('chessclubs.promote', self.club))
+
+    def test_uncommitted_permissions_are_not_shared(self):
+        self.club_tester.make_member(self.user)
+        with self.captureOnCommitCallbacks(execute=False):
+            self.user.has_club_perm('chessclubs.access_members_list', self.club)
+        user = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(4):
+            user.has_club_perm('chessclubs.access_members_list', self.club)
+
+    def test_role_masks_are_shared_between_users(self):
+        other_user = User.objects.get(email='petrapickles@example.org')
+        self.club_tester.make_member(self.user)
+        self.club_tester.make_officer(other_user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.has_club_perm('chessclubs.access_members_list', self.club)
+        with self.assertNumQueries(3):
+            self.assertTrue(other_user.has_club_perm('chessclubs.manage_applications', self.club))
+
+    def test_permission_bits_follow_meta_permissions(self):
+        bits = permission_bits(Club)
+        self.assertEqual(len(bits), len(Club._meta.permissions))
+        self.assertEqual(bits['chessclubs.access_members_list'], 1)
+        self.assertEqual(len(permission_bits(Tournament)), len(Tournament._meta.permissions))
+
+    def test_permission_mask_of_member(self):
+        self.club_tester.make_member(self.user)
+        mask = ClubBackend().get_club_permission_mask(self.user, self.club)
+        self.assertEqual(mask, permission_mask(Club, [
+            f"chessclubs.{codename}" for codename, roles in Club.PERMISSION_ROLES.items() if "members" in roles
+        ]))
+
+    def test_group_change_invalidates_cached_permissions(self):
+        self.club_tester.make_member(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.has_club_perm('chessclubs.manage_applications', self.club)
+        self.club_tester.make_officer(self.user)
+        user = User.objects.get(pk=self.user.pk)
+        self.assertTrue(user.has_club_perm('chessclubs.manage_applications', self.club))
+
+    def test_permission_grant_invalidates_cached_permissions(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.has_tournament_perm('chessclubs.enter_match_results', self.tournament)
+        self.tournament_tester.make_co_organiser(self.user)
+        user = User.objects.get(pk=self.user.pk)
+        self.assertTrue(user.has_tournament_perm('chessclubs.enter_match_results', self.tournament))
@@ -1,7 +1,7 @@
 
 from django.core.exceptions import ValidationError
 from django.test import TestCase
-from chessclubs.models import User, Club, Tournament, Player, PoolMatch
+from chessclubs.models import User, Club, Tournament, Player, PoolMatch, Match, EliminationMatch, Pool
 from chessclubs.tests.helpers import ClubGroupTester
 
 
@@ -72,6 +72,18 @@ class SmallPoolMatchModelTestCase(TestCase):
             self.assertEqual(self.pool_match.get_player2().get_points(), after_points1)
             self.assertEqual(self.pool_match.get_player1().get_points(), after_points2)
 
+    def test_match_is_loaded_as_pool_match(self):
+        self.assertIsInstance(Match.objects.get(pk=1), PoolMatch)
+        self.assertIsInstance(Pool.objects.get(pk=1).get_pool_matches()[0], PoolMatch)
+        self.assertFalse(EliminationMatch.objects.filter(pk=1).exists())
+
+    def test_pool_match_is_stored_in_a_single_row(self):
+        match = PoolMatch.objects.create_pool_match(tournament=self.tournament, player1=self.player2,
+                                                    player2=self.player1, pool=self.pool_match.pool)
+        self.assertEqual(Match.objects.filter(pk=match.pk, kind=Match.POOL).count(), 1)
+        with self.assertNumQueries(1):
+            self.assertEqual(PoolMatch.objects.get(pk=match.pk).pool_id, self.pool_match.pool_id)
+
     def _assert_match_is_valid(self):
         try:
             self.pool_match.full_clean()
@@ -79,6 +79,22 @@ class SmallPoolModelTestCase(TestCase):
 
         self.assertTrue(self.pool.all_matches_played)
 
+    def test_remaining_matches_are_counted(self):
+        self.assertEqual(self.pool.remaining_matches, 6)
+        self.pool.pool_phase.refresh_from_db()
+        self.assertEqual(self.pool.pool_phase.remaining_matches, 6)
+        self.pool.enter_result(self._get_match(self.player1, self.player2), True, self.player1)
+        self.assertEqual(self.pool.remaining_matches, 5)
+        self.pool.pool_phase.refresh_from_db()
+        self.assertEqual(self.pool.pool_phase.remaining_matches, 5)
+        self.assertFalse(self.pool.all_matches_played)
+
+    def test_closed_match_does_not_change_remaining_matches(self):
+        match = self._get_match(self.player1, self.player2)
+        self.pool.enter_result(match, True, self.player1)
+        self.pool.enter_winner(self.player4, match)
+        self.assertEqual(self.pool.remaining_matches, 5)
+
     def _get_match(self, player1, player2):
         try:
             match = PoolMatch.objects.get(_player1=player1, _player2=player2)
@@ -0,0 +1,127 @@
+"""Unit tests for the Standing model and the ranking of pools."""
+from types import SimpleNamespace
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.test import SimpleTestCase, TestCase
+
+from chessclubs.models import Player, Pool, PoolMatch, Standing
+from chessclubs.standings import add_result, rank
+
+
+class StandingModelTestCase(TestCase):
+    """Unit tests for the standings of the players of a pool"""
+
+    fixtures = ['chessclubs/tests/fixtures/default_user.json',
+                'chessclubs/tests/fixtures/other_users.json',
+                'chessclubs/tests/fixtures/default_club.json',
+                'chessclubs/tests/fixtures/default_tournament.json',
+                'chessclubs/tests/fixtures/pool_players.json',
+                'chessclubs/tests/fixtures/small_pool_phase.json',
+                'chessclubs/tests/fixtures/default_pool.json',
+                ]
+
+    def setUp(self):
+        self.player1 = Player.objects.get(pk=4)
+        self.player2 = Player.objects.get(pk=5)
+        self.player3 = Player.objects.get(pk=6)
+        self.player4 = Player.objects.get(pk=7)
+        self.pool = Pool.objects.get(pk=1)
+        self.pool.create_matches()
+
+    def test_first_result_creates_the_standings_of_the_pool(self):
+        self.assertFalse(self.pool.standings.exists())
+        self._get_match(self.player1, self.player2).enter_result(True, self.player1)
+        self.assertEqual(self.pool.standings.count(), 4)
+        self.assertEqual(self._standing(self.player1).wins, 1)
+        self.assertEqual(self._standing(self.player2).losses, 1)
+
+    def test_added_players_get_a_standing(self):
+        pool = Pool.objects.create(pool_phase=self.pool.pool_phase)
+        pool.add_players([self.player1, self.player2])
+        self.assertEqual(pool.standings.count(), 2)
+
+    def test_results_update_standings(self):
+        self._enter_all_results()
+        standings = list(self.pool.get_standings())
+        self.assertEqual([standing.player for standing in standings],
+                         [self.player3, self.player1, self.player2, self.player4])
+        self.assertEqual([standing.rank for standing in standings], [1, 2, 3, 4])
+        third = self._standing(self.player3)
+        self.assertEqual((third.points, third.wins, third.draws, third.losses), (2.5, 2, 1, 0))
+        # Beat player 1 (2 points) and player 4 (0 points), drew with player 2 (1.5 points)
+        self.assertEqual(third.sonneborn_berger, 2.75)
+
+    def test_result_is_recorded_with_a_constant_number_of_queries(self):
+        self._get_match(self.player1, self.player2).enter_result(True, self.player1)
+        match = self._get_match(self.player3, self.player4)
+        with self.assertNumQueries(3):
+            Standing.objects.record_result(match)
+
+    def test_standings_are_read_in_one_query(self):
+        self._enter_all_results()
+        with self.assertNumQueries(1):
+            names = [standing.player.user.full_name() for standing in self.pool.get_standings()]
+        self.assertEqual(len(names), 4)
+
+    def test_rebuild_matches_incremental_standings(self):
+        self.pool.enter_result(self._get_match(self.player1, self.player2), True, self.player1)
+        self.pool.enter_result(self._get_match(self.player3, self.player1), True, self.player3)
+        self.pool.enter_result(self._get_match(self.player2, self.player3), False)
+        before = list(self.pool.get_standings().values_list('player_id', 'points', 'sonneborn_berger', 'rank'))
+        Standing.objects.rebuild(self.pool)
+        after = list(self.pool.get_standings().values_list('player_id', 'points', 'sonneborn_berger', 'rank'))
+        self.assertEqual(before, after)
+
+    def _enter_all_results(self):
+        self.pool.enter_result(self._get_match(self.player1, self.player2), True, self.player1)
+        self.pool.enter_result(self._get_match(self.player3, self.player1), True, self.player3)
+        self.pool.enter_result(self._get_match(self.player1, self.player4), True, self.player1)
+        self.pool.enter_result(self._get_match(self.player2, self.player3), False)
+        self.pool.enter_result(self._get_match(self.player2, self.player4), True, self.player2)
+        self.pool.enter_result(self._get_match(self.player3, self.player4), True, self.player3)
+
+    def _standing(self, player):
+        return Standing.objects.get(pool=self.pool, player=player)
+
+    def _get_match(self, player1, player2):
+        try:
+            return PoolMatch.objects.get(_player1=player1, _player2=player2)
+        except ObjectDoesNotExist:
+            return PoolMatch.objects.get(_player1=player2, _player2=player1)
+
+
+class RankingTestCase(SimpleTestCase):
+    """Unit tests for the ranking of the standings of a pool"""
+
+    def _standings(self, *player_ids):
+        return {player_id: SimpleNamespace(player_id=player_id, points=0.0, wins=0, draws=0, losses=0,
+                                           head_to_head=0.0, sonneborn_berger=0.0, rank=0)
+                for player_id in player_ids}
+
+    def _rank(self, standings, results):
+        for result in results:
+            add_result(standings, *result)
+        return [standing.player_id for standing in rank(standings, results)]
+
+    def test_head_to_head_breaks_ties_on_points(self):
+        # 2 and 3 both have 2 points and 2 beat 3
+        results = [(1, 2, 1), (2, 3, 2), (3, 1, 3), (2, 4, 2), (3, 4, 3), (1, 4, None)]
+        standings = self._standings(1, 2, 3, 4)
+        ranking = self._rank(standings, results)
+        self.assertEqual(standings[2].points, standings[3].points)
+        self.assertEqual(ranking[-1], 4)
+        self.assertEqual(ranking[:2], [2, 3])
+
+    def test_sonneborn_berger_breaks_ties_on_head_to_head(self):
+        # 1 and 2 drew and both have 1.5 points, but 1 beat the stronger of 3 and 4
+        results = [(1, 2, None), (1, 3, 1), (2, 4, 2), (3, 4, 3), (1, 4, 4), (2, 3, 3)]
+        standings = self._standings(1, 2, 3, 4)
+        ranking = self._rank(standings, results)
+        self.assertEqual((standings[1].points, standings[2].points), (1.5, 1.5))
+        self.assertEqual(standings[1].head_to_head, standings[2].head_to_head)
+        self.assertGreater(standings[1].sonneborn_berger, standings[2].sonneborn_berger)
+        self.assertLess(ranking.index(1), ranking.index(2))
+
+    def test_player_id_breaks_complete_ties(self):
+        standings = self._standings(7, 3)
+        self.assertEqual(self._rank(standings, [(7, 3, None)]), [3, 7])
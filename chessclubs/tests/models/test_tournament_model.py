@@ -1,7 +1,9 @@
 """Unit tests for the tournament model at creation time."""
 from django.core.exceptions import ValidationError
-from django.test import TestCase
-from chessclubs.models import Tournament, Player, Club
+from django.db import connection
+from django.test import TestCase, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from chessclubs.models import Tournament, Player, Club, Match, StaleMatchError
 from django.utils import timezone
 from chessclubs.tests.helpers import _create_test_players, enter_results_to_all_matches
 
@@ -140,6 +142,97 @@ class TournamentModelTestCase(TestCase):
         after = len(self.new_tournament.get_current_schedule())
         self.assertEqual(before, after + 1)
 
+    def test_get_current_schedule_uses_a_single_query(self):
+        self.new_tournament.start_tournament()
+        with self.assertNumQueries(1):
+            schedule = self.new_tournament.get_current_schedule()
+        self.assertTrue(all(match.is_open() for match in schedule))
+
+    def test_has_open_match(self):
+        self.new_tournament.start_tournament()
+        pool = self.new_tournament.get_current_pool_phase().get_pools()[0]
+        pool_match = pool.get_pool_matches()[0]
+        with self.assertNumQueries(1):
+            self.assertTrue(self.new_tournament.has_open_match(pool_match))
+        pool.enter_result(match=pool_match, result=True, winner=pool_match.get_player1())
+        self.assertFalse(self.new_tournament.has_open_match(pool_match))
+
+    def test_enter_result_with_stale_match_is_refused(self):
+        self.new_tournament.start_tournament()
+        match = self.new_tournament.get_current_schedule()[0]
+        stale_match = Match.objects.get(pk=match.pk)
+        self.new_tournament.enter_result(match, winner=match.get_player1())
+        with self.assertRaises(StaleMatchError):
+            self.new_tournament.enter_result(stale_match, winner=stale_match.get_player2())
+        match.refresh_from_db()
+        self.assertEqual(match.get_winner(), match.get_player1())
+        self.assertEqual(match.version, 1)
+
+    def test_enter_result_writes_the_match_once(self):
+        self.new_tournament.start_tournament()
+        match = self.new_tournament.get_current_schedule()[0]
+        with CaptureQueriesContext(connection) as context:
+            self.new_tournament.enter_result(match, winner=match.get_player1())
+        match_writes = [query['sql'] for query in context.captured_queries
+                        if query['sql'].startswith('UPDATE "chessclubs_match"')]
+        self.assertEqual(len(match_writes), 1)
+
+    def _result_queries(self):
+        self.new_tournament.start_tournament()
+        match = self.new_tournament.get_current_schedule()[0]
+        with CaptureQueriesContext(connection) as context:
+            self.new_tournament.enter_result(match, winner=match.get_player1())
+        return [query['sql'] for query in context.captured_queries]
+
+    def test_enter_result_locks_the_pool_before_reading_the_standings(self):
+        queries = self._result_queries()
+        pool_read = next(index for index, sql in enumerate(queries) if 'FROM "chessclubs_pool" WHERE' in sql)
+        standings_read = next(index for index, sql in enumerate(queries) if 'FROM "chessclubs_standing"' in sql)
+        self.assertLess(pool_read, standings_read)
+
+    @skipUnlessDBFeature('has_select_for_update')
+    def test_enter_result_locks_the_match_pool_and_pool_phase_rows(self):
+        locks = [sql for sql in self._result_queries() if 'FOR UPDATE' in sql]
+        self.assertTrue(any('FROM "chessclubs_match"' in sql for sql in locks))
+        self.assertTrue(any('FROM "chessclubs_pool" WHERE' in sql for sql in locks))
+        self.assertTrue(any('FROM "chessclubs_poolphase"' in sql for sql in locks))
+        self.assertFalse(any('OUTER JOIN' in sql for sql in locks))
+
+    def test_get_participant_uses_a_single_query(self):
+        user = self.player.user
+        with self.assertNumQueries(1):
+            self.assertEqual(self.tournament.get_participant(user), self.player)
+            self.assertTrue(self.tournament.is_participant(user))
+
+    def test_get_participant_of_non_participant(self):
+        self.assertIsNone(self.new_tournament.get_participant(self.player.user))
+        self.assertFalse(self.new_tournament.is_participant(self.player.user))
+
+    def test_get_participant_follows_participant_changes(self):
+        user = self.player_list[0].user
+        self.new_tournament.remove_participant(user)
+        self.assertFalse(self.new_tournament.is_participant(user))
+        player = self.new_tournament.add_participant(user)
+        self.assertEqual(self.new_tournament.get_participant(user), player)
+
+    def test_participants_for_uses_a_single_query(self):
+        users = [player.user for player in self.player_list[:10]] + [self.player.user]
+        with self.assertNumQueries(1):
+            participants = self.new_tournament.participants_for(users)
+            self.assertTrue(all(self.new_tournament.is_participant(user) for user in users[:10]))
+        self.assertEqual(participants, {**{player.user_id: player for player in self.player_list[:10]},
+                                        self.player.user_id: None})
+
+    def test_listing_info_is_annotated(self):
+        self.second_tournament._set_finished()
+        tournaments = {tournament.name: tournament for tournament in Tournament.objects.with_listing_info()}
+        self.assertEqual(tournaments[self.new_tournament.name].number_of_participants, self.MAX)
+        self.assertEqual(tournaments[self.new_tournament.name].lifecycle, Tournament.FUTURE)
+        self.assertEqual(tournaments[self.second_tournament.name].lifecycle, Tournament.PAST)
+        self.new_tournament.start_tournament()
+        self.assertEqual(Tournament.objects.with_lifecycle().get(pk=self.new_tournament.pk).lifecycle,
+                         Tournament.CURRENT)
+
     def test_get_current_pool_phase(self):
         self.new_tournament.start_tournament()
         self.assertFalse(self.new_tournament.get_current_pool_phase() is None)
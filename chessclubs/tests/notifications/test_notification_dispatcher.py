@@ -0,0 +1,119 @@
+"""Unit tests for the notification dispatcher and the job queue."""
+import os
+import subprocess
+import sys
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from notifications.models import Notification
+
+from chessclubs.dispatcher import dispatch_to_officers_and_owner, dispatch_to_participants, notify_participants
+from chessclubs.jobs import MAX_ATTEMPTS, VISIBILITY_TIMEOUT, claim_next_job, enqueue, run_pending_jobs, task, task_name
+from chessclubs.models import Club, Job, Tournament, User
+from chessclubs.tests.helpers import ClubGroupTester, _create_test_players
+
+
+@task
+def failing_task():
+    raise ValueError("This task always fails")
+
+
+@task
+def noop_task():
+    pass
+
+
+class NotificationDispatcherTestCase(TestCase):
+    """Unit tests for the notification dispatcher and the job queue."""
+
+    fixtures = [
+        'chessclubs/tests/fixtures/default_user.json',
+        'chessclubs/tests/fixtures/other_users.json',
+        'chessclubs/tests/fixtures/default_club.json',
+        'chessclubs/tests/fixtures/default_tournament.json',
+    ]
+
+    def setUp(self):
+        self.club = Club.objects.get(name="Test_Club")
+        self.tournament = Tournament.objects.get(name="Test_Tournament")
+        self.officer = User.objects.get(email='janedoe@example.org')
+        self.member = User.objects.get(email='petrapickles@example.org')
+        self.group_tester = ClubGroupTester(self.club)
+        self.group_tester.make_officer(self.officer)
+        self.group_tester.make_member(self.member)
+        self.players = _create_test_players(20, self.club, self.tournament)
+
+    def test_officers_and_owner_are_notified(self):
+        dispatch_to_officers_and_owner(self.club, self.member, verb=f'{self.club.name}_Join', description="Joined")
+        recipients = set(Notification.objects.values_list('recipient_id', flat=True))
+        self.assertEqual(recipients, {self.officer.id, self.club.owner.id})
+
+    def test_participants_are_notified_with_constant_queries(self):
+        with self.assertNumQueries(3):
+            dispatch_to_participants(self.tournament, verb=f'{self.tournament.name}_StartTournament',
+                                     description="Started")
+        recipients = sorted(Notification.objects.values_list('recipient_id', flat=True))
+        self.assertEqual(recipients, sorted(player.user_id for player in self.players))
+        notification = Notification.objects.first()
+        self.assertEqual(notification.actor, self.tournament.organiser)
+        self.assertTrue(notification.unread)
+
+    @override_settings(JOBS_EAGER=False)
+    def test_queued_notifications_are_sent_by_the_worker(self):
+        dispatch_to_participants(self.tournament, verb=f'{self.tournament.name}_PublishSchedule',
+                                 description="Published")
+        self.assertEqual(Notification.objects.count(), 0)
+        self.assertEqual(Job.objects.filter(status=Job.PENDING).count(), 1)
+        call_command('run_jobs', '--once')
+        self.assertEqual(Notification.objects.count(), len(self.players))
+        self.assertEqual(Job.objects.get().status, Job.DONE)
+
+    @override_settings(JOBS_EAGER=False)
+    def test_failing_job_is_retried_then_marked_as_failed(self):
+        job = enqueue(failing_task)
+        self.assertEqual(run_pending_jobs(), MAX_ATTEMPTS)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, MAX_ATTEMPTS)
+        self.assertIn("This task always fails", job.error)
+
+    @override_settings(JOBS_EAGER=False)
+    def test_job_of_a_stopped_worker_is_run_again_after_the_visibility_timeout(self):
+        job = enqueue(noop_task)
+        self.assertEqual(claim_next_job(), job)
+        self.assertEqual(run_pending_jobs(), 0)
+        Job.objects.filter(pk=job.pk).update(claimed_at=timezone.now() - VISIBILITY_TIMEOUT * 2)
+        self.assertEqual(run_pending_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DONE)
+        self.assertEqual(job.attempts, 2)
+
+    @override_settings(JOBS_EAGER=False)
+    def test_stalled_job_is_marked_as_failed_after_the_last_attempt(self):
+        job = enqueue(noop_task)
+        claim_next_job()
+        Job.objects.filter(pk=job.pk).update(attempts=MAX_ATTEMPTS,
+                                             claimed_at=timezone.now() - VISIBILITY_TIMEOUT * 2)
+        self.assertEqual(run_pending_jobs(), 0)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+
+    @override_settings(JOBS_EAGER=False)
+    def test_worker_runs_jobs_queued_by_another_process(self):
+        job = Job.objects.create(task=task_name(notify_participants), payload={
+            'tournament_id': self.tournament.id, 'verb': f'{self.tournament.name}_StartTournament',
+            'description': "Started",
+        })
+        call_command('run_jobs', '--once')
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DONE)
+        self.assertEqual(Notification.objects.count(), len(self.players))
+
+    def test_tasks_are_registered_when_the_app_is_loaded(self):
+        # A fresh process, which only sets Django up (like the run_jobs worker without system checks)
+        script = ("import django; django.setup(); from chessclubs.jobs import _tasks; "
+                  "print(' '.join(sorted(_tasks)))")
+        output = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True,
+                                env={**os.environ, 'DJANGO_SETTINGS_MODULE': 'Wildebeest.settings'}).stdout
+        self.assertIn(task_name(notify_participants), output.split())
@@ -0,0 +1,41 @@
+"""Unit tests for the cached unread notification counter."""
+from django.test import TestCase
+from notifications.signals import notify
+
+from chessclubs.dispatcher import bulk_notify
+from chessclubs.models import User
+from chessclubs.unread_counter import unread_counter
+
+
+class UnreadCounterTestCase(TestCase):
+    """Unit tests for the cached unread notification counter."""
+
+    fixtures = [
+        'chessclubs/tests/fixtures/default_user.json',
+        'chessclubs/tests/fixtures/other_users.json'
+    ]
+
+    def setUp(self):
+        self.sender = User.objects.get(email='johndoe@example.org')
+        self.recipient = User.objects.get(email='janedoe@example.org')
+        notify.send(self.sender, recipient=self.recipient, verb='_Test', description="Test")
+
+    def test_count_is_cached_once_committed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(unread_counter.get(self.recipient), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(unread_counter.get(self.recipient), 1)
+
+    def test_count_follows_notifications(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            unread_counter.get(self.recipient)
+        notify.send(self.sender, recipient=self.recipient, verb='_Test', description="Test")
+        self.assertEqual(unread_counter.get(self.recipient), 2)
+        bulk_notify(self.sender, [self.recipient.id], verb='_Test', description="Test")
+        self.assertEqual(unread_counter.get(self.recipient), 3)
+
+    def test_count_follows_read_notifications(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            unread_counter.get(self.recipient)
+        self.recipient.notifications.unread()[0].mark_as_read()
+        self.assertEqual(unread_counter.get(self.recipient), 0)
@@ -0,0 +1,131 @@
+"""Unit tests of the pairing engine, which runs without the database."""
+import itertools
+import random
+from unittest import TestCase
+
+from chessclubs.pairing import (EncounterGraph, count_pairing_rematches, count_pool_rematches, draw_pairs,
+                                draw_pools)
+
+
+class EncounterGraphTestCase(TestCase):
+    """Unit tests of the encounter graph"""
+
+    def test_encounters_are_symmetric(self):
+        graph = EncounterGraph.from_edges(4, [(0, 3)])
+        self.assertTrue(graph.have_met(0, 3))
+        self.assertTrue(graph.have_met(3, 0))
+        self.assertFalse(graph.have_met(0, 1))
+
+    def test_encounters_in_counts_met_players_of_bitset(self):
+        graph = EncounterGraph.from_edges(5, [(0, 1), (0, 2), (0, 4)])
+        self.assertEqual(graph.encounters_in(0, 1 << 1 | 1 << 3 | 1 << 4), 2)
+
+
+class DrawPoolsTestCase(TestCase):
+    """Unit tests of the draw of pools"""
+
+    def test_pools_have_requested_sizes_and_cover_all_players(self):
+        pools = draw_pools([6, 6, 5, 5], EncounterGraph(22), seed=1)
+        self.assertEqual([len(pool) for pool in pools], [6, 6, 5, 5])
+        self.assertEqual(sorted(itertools.chain(*pools)), list(range(22)))
+
+    def test_pool_sizes_must_match_player_count(self):
+        with self.assertRaises(ValueError):
+            draw_pools([4, 4], EncounterGraph(9))
+
+    def test_draw_is_deterministic_for_a_seed(self):
+        graph = EncounterGraph.from_edges(16, [(0, 1), (2, 3), (4, 5)])
+        self.assertEqual(draw_pools([4] * 4, graph, seed="1:Small-Pool-Phase"),
+                         draw_pools([4] * 4, graph, seed="1:Small-Pool-Phase"))
+
+    def test_no_rematch_when_avoidable(self):
+        # Previous pools of 4: players of a same previous pool must be spread over the new pools
+        graph = EncounterGraph.from_edges(16, [
+            (first, second) for pool in range(4)
+            for first, second in itertools.combinations(range(pool * 4, pool * 4 + 4), 2)
+        ])
+        for seed in range(20):
+            pools = draw_pools([4] * 4, graph, seed=seed)
+            self.assertEqual(count_pool_rematches(pools, graph), 0)
+
+    def test_unavoidable_rematches_are_kept_to_a_minimum(self):
+        # Everyone met everyone but players 4 and 5: the best split of 6 players into pools of 3 has 5 rematches
+        graph = EncounterGraph.from_edges(6, [pair for pair in itertools.combinations(range(6), 2) if pair != (4, 5)])
+        pools = draw_pools([3, 3], graph, seed=3)
+        self.assertEqual(count_pool_rematches(pools, graph), 5)
+
+    def test_draw_of_96_players(self):
+        graph = EncounterGraph.from_edges(96, [(player, (player + 1) % 96) for player in range(96)])
+        pools = draw_pools([6] * 16, graph, seed=96)
+        self.assertEqual(count_pool_rematches(pools, graph), 0)
+
+
+def _fewest_pairing_rematches(players, match_count, graph):
+    """Returns the fewest rematches of match_count disjoint pairs of the given players, by brute force"""
+    if match_count == 0:
+        return 0
+    if 2 * match_count > len(players):
+        return float('inf')
+    first, rest = players[0], players[1:]
+    with_bye = _fewest_pairing_rematches(rest, match_count, graph)
+    paired = min(graph.have_met(first, opponent)
+                 + _fewest_pairing_rematches([other for other in rest if other != opponent], match_count - 1, graph)
+                 for opponent in rest)
+    return min(with_bye, paired)
+
+
+class DrawPairsTestCase(TestCase):
+    """Unit tests of the draw of elimination pairs"""
+
+    def test_pairs_are_disjoint(self):
+        pairs = draw_pairs(8, EncounterGraph(16), seed=1)
+        self.assertEqual(len(pairs), 8)
+        self.assertEqual(sorted(itertools.chain(*pairs)), list(range(16)))
+
+    def test_not_enough_players(self):
+        with self.assertRaises(ValueError):
+            draw_pairs(5, EncounterGraph(9))
+
+    def test_draw_is_deterministic_for_a_seed(self):
+        graph = EncounterGraph.from_edges(8, [(0, 1), (2, 3)])
+        self.assertEqual(draw_pairs(4, graph, seed="1:Quarter-Final"), draw_pairs(4, graph, seed="1:Quarter-Final"))
+
+    def test_no_rematch_when_avoidable(self):
+        # Every player met its neighbours in a ring: a perfect pairing without rematches exists
+        graph = EncounterGraph.from_edges(16, [(player, (player + 1) % 16) for player in range(16)])
+        for seed in range(20):
+            self.assertEqual(count_pairing_rematches(draw_pairs(8, graph, seed=seed), graph), 0)
+
+    def test_players_who_met_are_given_a_bye_rather_than_a_rematch(self):
+        # 0, 1 and 2 all met each other and only one match is played: any pairing with player 3 avoids a rematch
+        graph = EncounterGraph.from_edges(4, [(0, 1), (0, 2), (1, 2)])
+        for seed in range(20):
+            pairs = draw_pairs(1, graph, seed=seed)
+            self.assertEqual(count_pairing_rematches(pairs, graph), 0)
+            self.assertIn(3, pairs[0])
+
+    def test_rematch_is_avoided_when_a_rematch_free_pairing_exists(self):
+        graph = EncounterGraph.from_edges(8, [(0, 1), (0, 2), (0, 3), (0, 5), (1, 5), (1, 6), (2, 3), (3, 4), (3, 5),
+                                              (3, 6), (3, 7), (4, 7), (5, 7), (6, 7)])
+        for seed in range(20):
+            self.assertEqual(count_pairing_rematches(draw_pairs(4, graph, seed=seed), graph), 0)
+
+    def test_pairings_have_the_fewest_rematches(self):
+        rng = random.Random(0)
+        for player_count, match_count in [(6, 3), (8, 4), (10, 5), (7, 3), (9, 4), (5, 2)]:
+            for trial in range(50):
+                density = rng.choice([0.3, 0.5, 0.7])
+                graph = EncounterGraph.from_edges(player_count, [
+                    pair for pair in itertools.combinations(range(player_count), 2) if rng.random() < density
+                ])
+                pairs = draw_pairs(match_count, graph, seed=trial)
+                self.assertEqual(len(pairs), match_count)
+                self.assertEqual(len(set(itertools.chain(*pairs))), 2 * match_count)
+                self.assertEqual(count_pairing_rematches(pairs, graph),
+                                 _fewest_pairing_rematches(list(range(player_count)), match_count, graph))
+
+    def test_unavoidable_rematches_of_a_pairing_are_kept_to_a_minimum(self):
+        # Everyone met everyone but players 0 and 1: the best pairing of 16 players has 7 rematches
+        graph = EncounterGraph.from_edges(16, [pair for pair in itertools.combinations(range(16), 2) if pair != (0, 1)])
+        pairs = draw_pairs(8, graph, seed=1)
+        self.assertEqual(count_pairing_rematches(pairs, graph), 7)
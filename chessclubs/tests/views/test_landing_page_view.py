@@ -1,10 +1,12 @@
 """Tests of landing page view"""
 
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from chessclubs.models import User, Club
 from chessclubs.tests.helpers import ClubGroupTester, reverse_with_next
-from Wildebeest.settings import REDIRECT_URL_WHEN_LOGGED_IN
+from Wildebeest.settings import CLUBS_PER_PAGE, REDIRECT_URL_WHEN_LOGGED_IN
 from django.contrib import messages
 
 
@@ -41,3 +43,37 @@ class LandingPageViewTestCase(TestCase):
 
     # Thorough tests for template content
 
+    def test_clubs_are_listed_with_their_member_count(self):
+        self.club.add_member(self.user)
+        response = self.client.get(self.url)
+        club = next(club for club in response.context['clubs'] if club == self.club)
+        self.assertEqual(club.number_of_members, self.club.member_count())
+
+    def test_clubs_are_paginated(self):
+        self._create_clubs(CLUBS_PER_PAGE + 5)
+        response = self.client.get(self.url)
+        first_page = response.context['clubs']
+        self.assertEqual(len(first_page), CLUBS_PER_PAGE)
+        self.assertContains(response, f'?after={first_page.next_key}')
+        response = self.client.get(self.url, {'after': first_page.next_key})
+        second_page = response.context['clubs']
+        self.assertEqual(len(second_page), Club.objects.count() - CLUBS_PER_PAGE)
+        self.assertIsNone(second_page.next_key)
+        self.assertTrue(all(club.pk > first_page.next_key for club in second_page))
+
+    def test_page_queries_do_not_depend_on_the_number_of_clubs(self):
+        with CaptureQueriesContext(connection) as few_clubs:
+            self.client.get(self.url)
+        self._create_clubs(CLUBS_PER_PAGE)
+        with CaptureQueriesContext(connection) as many_clubs:
+            self.client.get(self.url)
+        self.assertEqual(len(many_clubs), len(few_clubs))
+
+    def test_invalid_page_key_shows_first_page(self):
+        response = self.client.get(self.url, {'after': 'oops'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['clubs'].is_first())
+
+    def _create_clubs(self, count):
+        Club.objects.bulk_create([Club(name=f"Club_{index}", location="London", owner=self.user)
+                                  for index in range(count)])
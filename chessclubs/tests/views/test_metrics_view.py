@@ -0,0 +1,82 @@
+"""Tests of the metrics view and of the request metrics middleware."""
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from chessclubs.metrics import QueryBudgetExceeded, RequestMetrics, registry
+from chessclubs.models import User
+
+
+class MetricsViewTestCase(TestCase):
+    """Tests of the metrics view and of the request metrics middleware."""
+
+    fixtures = ['chessclubs/tests/fixtures/default_user.json']
+
+    def setUp(self):
+        self.user = User.objects.get(email='johndoe@example.org')
+        self.client.login(email=self.user.email, password='Password123')
+        self.url = reverse('metrics')
+        registry.reset()
+
+    def test_metrics_url(self):
+        self.assertEqual(self.url, '/metrics/')
+
+    def test_requests_are_recorded_by_view(self):
+        self.client.get(reverse('landing_page'))
+        self.client.get(reverse('landing_page'))
+        queries = registry.get('queries', 'landing_page')
+        self.assertEqual(queries.count, 2)
+        self.assertGreater(queries.sum, 0)
+        self.assertGreater(registry.get('db_time', 'landing_page').sum, 0)
+        self.assertGreater(registry.get('template_time', 'landing_page').sum, 0)
+        self.assertGreater(registry.get('wall_time', 'landing_page').sum,
+                           registry.get('template_time', 'landing_page').sum)
+
+    def test_unresolved_requests_are_recorded_together(self):
+        self.client.get('/no/such/page/at/all/')
+        self.assertEqual(registry.get('wall_time', 'unresolved').count, 1)
+
+    def test_metrics_are_exposed_in_prometheus_format(self):
+        self.client.get(reverse('landing_page'))
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        content = response.content.decode()
+        self.assertIn('# TYPE wildebeest_view_queries histogram', content)
+        self.assertIn('wildebeest_view_queries_count{view="landing_page"} 1', content)
+        self.assertIn('wildebeest_view_seconds_bucket{view="landing_page",le="+Inf"} 1', content)
+        self.assertIn('wildebeest_view_template_seconds_sum{view="landing_page"}', content)
+        self.assertIn('wildebeest_view_db_seconds_sum{view="landing_page"}', content)
+
+    def test_metrics_are_not_exposed_to_remote_addresses(self):
+        response = self.client.get(self.url, REMOTE_ADDR='203.0.113.7')
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(VIEW_QUERY_BUDGETS={'landing_page': 1}, QUERY_BUDGETS_RAISE=True)
+    def test_requests_over_budget_raise_in_tests(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            self.client.get(reverse('landing_page'))
+
+    @override_settings(VIEW_QUERY_BUDGETS={'landing_page': 1}, QUERY_BUDGETS_RAISE=False)
+    def test_requests_over_budget_are_logged(self):
+        with self.assertLogs('chessclubs.metrics', level='WARNING') as logs:
+            response = self.client.get(reverse('landing_page'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("View landing_page ran", logs.output[0])
+
+    @override_settings(VIEW_QUERY_BUDGETS={'landing_page': 1000}, QUERY_BUDGETS_RAISE=True)
+    def test_requests_within_budget_pass(self):
+        response = self.client.get(reverse('landing_page'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_test_runner_makes_requests_over_budget_raise(self):
+        self.assertTrue(settings.QUERY_BUDGETS_RAISE)
+
+    def test_nested_templates_are_timed_once(self):
+        metrics = RequestMetrics()
+        with metrics.timing_template() as timed:
+            with metrics.timing_template() as nested_timed:
+                pass
+        self.assertTrue(timed)
+        self.assertFalse(nested_timed)
+        self.assertGreater(metrics.template_time, 0)
@@ -1,6 +1,8 @@
 """Tests of my matches view"""
 
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from chessclubs.models import User, Club, Tournament
 from chessclubs.tests.helpers import ClubGroupTester, reverse_with_next, TournamentGroupTester, _create_test_players, \
@@ -28,7 +30,7 @@ class MyMatchesViewTestCase(TestCase, AssertHTMLMixin):
         cls.group_tester.make_member(cls.participant)
         cls.url = reverse('my_matches')
         cls.redirect_url = reverse(REDIRECT_URL_WHEN_LOGGED_IN)
-        _create_test_players(3, cls.club, cls.tournament)
+        cls.players = _create_test_players(3, cls.club, cls.tournament)
 
     def setUp(self):
         self.client.login(email=self.participant.email, password='Password123')
@@ -82,7 +84,22 @@ class MyMatchesViewTestCase(TestCase, AssertHTMLMixin):
                 text = match.find('.//p').text
                 self.assertTrue("You" in text)
 
-
-
-
-
+    def test_matches_of_several_tournaments_are_loaded_with_constant_queries(self):
+        self.tournament_tester.make_participant(self.participant)
+        self.tournament._set_deadline_now()
+        self.tournament.publish_schedule()
+        with CaptureQueriesContext(connection) as one_tournament:
+            self.client.get(self.url)
+        second_tournament = Tournament.objects.create(name="Second_Tournament", description="Second tournament",
+                                                      location="London", max_capacity=4, organiser=self.club.owner,
+                                                      club=self.club, deadline=self.tournament.deadline)
+        for user in [self.participant] + [player.user for player in self.players]:
+            second_tournament.add_participant(user)
+        second_tournament.publish_schedule()
+        with CaptureQueriesContext(connection) as two_tournaments:
+            response = self.client.get(self.url)
+        self.assertEqual(len(two_tournaments), len(one_tournament))
+        with self.assertHTML(response, '.matches') as matches:
+            self.assertEqual(len(matches), 2)
+            for match in matches:
+                self.assertIn("You", match.find('.//p').text)
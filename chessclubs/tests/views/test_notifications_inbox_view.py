@@ -0,0 +1,84 @@
+"""Tests of the notifications inbox and mark all as read views."""
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from notifications.models import Notification
+from with_asserts.mixin import AssertHTMLMixin
+
+from chessclubs.dispatcher import bulk_notify
+from chessclubs.models import User
+from chessclubs.tests.helpers import reverse_with_next
+from Wildebeest.settings import NOTIFICATIONS_DROPDOWN_SIZE, NOTIFICATIONS_PER_PAGE
+
+
+class NotificationsInboxViewTestCase(TestCase, AssertHTMLMixin):
+    """Tests of the notifications inbox and mark all as read views."""
+
+    fixtures = [
+        'chessclubs/tests/fixtures/default_user.json',
+        'chessclubs/tests/fixtures/other_users.json'
+    ]
+
+    def setUp(self):
+        self.user = User.objects.get(email='johndoe@example.org')
+        self.sender = User.objects.get(email='janedoe@example.org')
+        self.client.login(email=self.user.email, password='Password123')
+        self.url = reverse('notifications_inbox')
+        self.mark_all_url = reverse('mark_all_as_read')
+
+    def test_notifications_inbox_url(self):
+        self.assertEqual(self.url, '/my_notifications/')
+
+    def test_non_logged_in_redirects(self):
+        self.client.logout()
+        response = self.client.get(self.url)
+        self.assertRedirects(response, reverse_with_next('log_in', self.url), status_code=302, target_status_code=200)
+
+    def test_no_notifications(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'notifications_inbox.html')
+        with self.assertHTML(response, element_id="no_notifications") as no_notifications:
+            self.assertEqual(no_notifications.text, "You have no notification.")
+
+    def test_inbox_is_paginated_newest_first(self):
+        self._notify(NOTIFICATIONS_PER_PAGE + 3)
+        response = self.client.get(self.url)
+        first_page = response.context['notifications']
+        self.assertEqual(len(first_page), NOTIFICATIONS_PER_PAGE)
+        self.assertEqual(first_page.items[0], Notification.objects.latest('id'))
+        response = self.client.get(self.url, {'after': first_page.next_key})
+        second_page = response.context['notifications']
+        self.assertEqual(len(second_page), 3)
+        self.assertIsNone(second_page.next_key)
+
+    def test_dropdown_is_capped(self):
+        self._notify(NOTIFICATIONS_DROPDOWN_SIZE + 10)
+        response = self.client.get(self.url)
+        with self.assertHTML(response, '#unread_count') as (badge,):
+            self.assertEqual(badge.text, str(NOTIFICATIONS_DROPDOWN_SIZE + 10))
+        with self.assertHTML(response, 'a.dropdown-item[type="button"]') as items:
+            self.assertEqual(len(items), NOTIFICATIONS_DROPDOWN_SIZE)
+
+    def test_mark_all_as_read_is_a_single_update(self):
+        self._notify(10)
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(self.mark_all_url)
+        updates = [query['sql'] for query in context.captured_queries
+                   if query['sql'].startswith('UPDATE "notifications_notification"')]
+        self.assertEqual(len(updates), 1)
+        self.assertRedirects(response, self.url, status_code=302, target_status_code=200)
+        self.assertEqual(self.user.notifications.unread().count(), 0)
+        with self.assertHTML(self.client.get(self.url), '#unread_count') as (badge,):
+            self.assertEqual(badge.text, "0")
+
+    def test_get_mark_all_as_read_does_not_mark_notifications(self):
+        self._notify(2)
+        response = self.client.get(self.mark_all_url)
+        self.assertRedirects(response, self.url, status_code=302, target_status_code=200)
+        self.assertEqual(self.user.notifications.unread().count(), 2)
+
+    def _notify(self, count):
+        for index in range(count):
+            bulk_notify(self.sender, [self.user.id], verb='_Test', description=f"Notification {index}")
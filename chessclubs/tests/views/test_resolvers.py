@@ -0,0 +1,47 @@
+"""Unit tests of the request-scoped resolvers"""
+from django.test import RequestFactory, TestCase
+
+from chessclubs.models import Club, Match, Tournament
+from chessclubs.resolvers import get_club, get_match, get_tournament
+
+
+class ResolversTestCase(TestCase):
+    """Unit tests of the resolvers loading the club, tournament and match of a request"""
+
+    fixtures = ['chessclubs/tests/fixtures/default_user.json',
+                'chessclubs/tests/fixtures/other_users.json',
+                'chessclubs/tests/fixtures/default_club.json',
+                'chessclubs/tests/fixtures/default_tournament.json',
+                'chessclubs/tests/fixtures/default_players.json',
+                'chessclubs/tests/fixtures/default_match.json',
+                ]
+
+    def setUp(self):
+        self.request = RequestFactory().get('/')
+        self.club = Club.objects.get(name="Test_Club")
+        self.tournament = Tournament.objects.get(name="Test_Tournament")
+
+    def test_club_is_loaded_once_per_request(self):
+        with self.assertNumQueries(1):
+            club = get_club(self.request, self.club.name)
+            self.assertIs(get_club(self.request, self.club.name), club)
+            self.assertIs(get_club(self.request, self.club.id), club)
+        self.assertIs(self.request.club, club)
+
+    def test_tournament_is_loaded_with_its_club_and_organiser(self):
+        with self.assertNumQueries(1):
+            tournament = get_tournament(self.request, self.tournament.name)
+            self.assertIs(get_tournament(self.request, self.tournament.name), tournament)
+            self.assertEqual(tournament.organiser.id, self.tournament.organiser_id)
+            self.assertIs(get_club(self.request, tournament.club.name), tournament.club)
+
+    def test_match_is_loaded_once_per_request(self):
+        match_id = Match.objects.first().id
+        with self.assertNumQueries(1):
+            match = get_match(self.request, match_id)
+            self.assertIs(get_match(self.request, match_id), match)
+
+    def test_another_key_loads_another_object(self):
+        get_club(self.request, self.club.name)
+        with self.assertRaises(Club.DoesNotExist):
+            get_club(self.request, "Other_Club")
@@ -28,6 +28,28 @@ class ShowClubViewTestCase(TestCase):
     def test_show_club_url(self):
         self.assertEqual(self.url, f'/club/{self.club.name}')
 
+    def test_show_club_by_id(self):
+        url = reverse('show_club', kwargs={'club_id': self.club.id})
+        self.assertEqual(url, f'/club/id/{self.club.id}')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'show_club.html')
+        self.assertEqual(response.context['club'], self.club)
+
+    def test_show_club_with_a_numeric_name(self):
+        numeric_club = Club.objects.create(name=str(self.club.id), location="London", description="Numbers only",
+                                           owner=User.objects.get(email='johndoe@example.org'))
+        ClubGroupTester(numeric_club).make_authenticated_non_member(self.user)
+        url = reverse('show_club', kwargs={'club_name': numeric_club.name})
+        self.assertEqual(url, f'/club/{numeric_club.name}')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['club'], numeric_club)
+
+    def test_see_wrong_club_by_id(self):
+        response = self.client.get(reverse('show_club', kwargs={'club_id': 9999}), follow=True)
+        self.assertRedirects(response, self.redirect_url, status_code=302, target_status_code=200)
+
     def test_see_wrong_club(self):
         bad_url = reverse('show_club', kwargs={'club_name': "blabla"})
         response = self.client.get(bad_url, follow=True)
@@ -49,6 +49,21 @@ class ShowTournamentViewTestCase(TestCase, AssertHTMLMixin):
     def test_show_tournament_url(self):
         self.assertEqual(self.url, f'/{self.club.name}/tournament/{self.tournament.name}')
 
+    def test_show_tournament_by_id(self):
+        self.client.login(email=self.organiser.email, password='Password123')
+        url = reverse('show_tournament', kwargs={'club_id': self.club.id, 'tournament_id': self.tournament.id})
+        self.assertEqual(url, f'/club/id/{self.club.id}/tournament/{self.tournament.id}')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'show_tournament.html')
+        self.assertEqual(response.context['tournament'], self.tournament)
+
+    def test_see_wrong_tournament_by_id(self):
+        self.client.login(email=self.organiser.email, password='Password123')
+        bad_url = reverse('show_tournament', kwargs={'club_id': self.club.id, 'tournament_id': 9999})
+        response = self.client.get(bad_url, follow=True)
+        self.assertRedirects(response, self.redirect_url, status_code=302, target_status_code=200)
+
     def test_see_wrong_tournament(self):
         self.client.login(email=self.organiser.email, password='Password123')
         bad_url = reverse('show_tournament', kwargs={'club_name': self.club.name, 'tournament_name': "oops"})
@@ -267,6 +282,17 @@ class ShowTournamentViewTestCase(TestCase, AssertHTMLMixin):
         self.assertNotContains(response, f"{self.join_tournament_url}")
         self.assertContains(response, f"{self.withdraw_url}")
 
+    def test_participating_officers_cannot_be_added_as_co_organisers(self):
+        self.club_tester.make_officer(self.any_user)
+        self.club_tester.make_officer(self.non_participant)
+        self.tournament_tester.make_participant(self.non_participant)
+        self.client.login(email=self.organiser.email, password='Password123')
+        response = self.client.get(self.url)
+        allowed_co_organisers = response.context['allowed_co_organisers']
+        self.assertIn(self.any_user, allowed_co_organisers)
+        self.assertNotIn(self.non_participant, allowed_co_organisers)
+        self.assertNotIn(self.co_organiser, allowed_co_organisers)
+
     def test_non_logged_in_redirects(self):
         self.client.logout()
         response = self.client.get(self.url)
@@ -83,6 +83,13 @@ class SignUpViewTestCase(TestCase, LogInTester):
         self.assertTrue(is_password_correct)
         self.assertTrue(self._is_logged_in())
 
+    def test_sign_up_does_not_add_user_to_club_groups(self):
+        self.client.post(self.url, self.form_input, follow=True)
+        new_user = User.objects.get(email=self.form_input['email'])
+        self.assertFalse(new_user.groups.exists())
+        self.assertTrue(new_user.has_club_perm('chessclubs.apply_to_club', self.club))
+        self.assertFalse(new_user.has_club_perm('chessclubs.access_members_list', self.club))
+
     def test_post_sign_up_redirects_when_logged_in(self):
         self.client.login(email=self.user.email, password="Password123")
         before_count = User.objects.count()
@@ -0,0 +1,49 @@
+"""Cached count of the unread notifications of each user.
+
+The navbar shows the number of unread notifications of the user on every page, which used to be a COUNT query per
+request. The unread counter keeps the count of each user in the Django cache, keyed by the user's primary key and a
+per-user version. The version is bumped whenever notifications of the user are created, read or deleted: by the
+receivers in signals.py for notifications saved one by one, and explicitly by code writing notifications in bulk (which
+bypasses these signals). As in the permission cache, counts are only published once the transaction that read them has
+committed, and versions are bumped both immediately and on commit, so a count read before a change commits is never
+reused after it.
+"""
+from django.core.cache import cache
+from django.db import transaction
+
+UNREAD_COUNT_TIMEOUT = 60 * 60
+
+
+class UnreadCounter:
+    """Caches the number of unread notifications of users"""
+
+    def get(self, user):
+        """Returns the number of unread notifications of the user"""
+        key = self.__key(user.pk, cache.get(self.__version_key(user.pk), 0))
+        count = cache.get(key)
+        if count is None:
+            count = user.notifications.unread().count()
+            transaction.on_commit(lambda: cache.set(key, count, UNREAD_COUNT_TIMEOUT))
+        return count
+
+    def invalidate(self, user_pks):
+        """Invalidates the counts of the users of the given primary keys"""
+        version_keys = [self.__version_key(user_pk) for user_pk in set(user_pks)]
+        self.__bump(version_keys)
+        transaction.on_commit(lambda: self.__bump(version_keys))
+
+    def __bump(self, version_keys):
+        for version_key in version_keys:
+            try:
+                cache.incr(version_key)
+            except ValueError:
+                cache.set(version_key, 1, None)
+
+    def __key(self, user_pk, version):
+        return f"chessclubs:unread:{user_pk}:{version}"
+
+    def __version_key(self, user_pk):
+        return f"chessclubs:unread:version:{user_pk}"
+
+
+unread_counter = UnreadCounter()
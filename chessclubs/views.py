@@ -4,12 +4,14 @@ from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.hashers import check_password
 from django.core.exceptions import ObjectDoesNotExist
+from django.http import Http404, HttpResponse
 from django.shortcuts import redirect, render, get_object_or_404
 from notifications.models import Notification
 from notifications.signals import notify
 from notifications.utils import slug2id
 
-from Wildebeest.settings import REDIRECT_URL_WHEN_LOGGED_IN
+from Wildebeest.settings import CLUBS_PER_PAGE, METRICS_ALLOWED_IPS, NOTIFICATIONS_PER_PAGE, \
+    REDIRECT_URL_WHEN_LOGGED_IN
 from .decorators import login_prohibited, club_permissions_required, tournament_permissions_required, \
     must_be_non_participant, deadline_must_not_be_passed, tournament_must_be_published, \
     target_user_must_be_officer_and_non_participant, \
@@ -17,10 +19,14 @@ from .decorators import login_prohibited, club_permissions_required, tournament_
     tournament_has_not_started, tournament_has_started
 from .forms import LogInForm, PasswordForm, UserForm, SignUpForm, ClubForm, NewOwnerForm, TournamentForm, \
     EditClubInformationForm
-from .helpers import add_all_users_to_logged_in_group, notify_officers_and_owner_of_joining, \
+from .helpers import notify_officers_and_owner_of_joining, \
     notify_officers_and_owner_of_new_application, get_appropriate_redirect, notify_officers_and_owner_of_leave, \
     notify_participants_of_start, notify_participants_of_publish
-from .models import User, Club, Tournament, Match
+from .metrics import registry
+from .models import User, Club, StaleMatchError
+from .pagination import keyset_page, parse_page_key
+from .resolvers import get_club, get_match, get_tournament
+from .unread_counter import unread_counter
 
 
 @login_required
@@ -83,8 +89,6 @@ def sign_up(request):
         form = SignUpForm(request.POST)
         if form.is_valid():
             user = form.save()
-            for club in Club.objects.all():
-                club.add_to_logged_in_non_members_group(user)
             login(request, user)
             return redirect(REDIRECT_URL_WHEN_LOGGED_IN)
     else:
@@ -102,9 +106,10 @@ def show_user(request, user_id, club_name):
         messages.add_message(request, messages.ERROR, "The user you are looking for does not exist!")
         return redirect('user_list', club_name=club_name)
     else:
-        club = Club.objects.get(name=club_name)
-        current_user_status = club.user_status(request.user)
-        target_user_status = club.user_status(target_user)
+        club = get_club(request, club_name)
+        statuses = club.user_statuses([request.user, target_user])
+        current_user_status = statuses[request.user.id]
+        target_user_status = statuses[target_user.id]
         return render(request, 'show_user.html',
                       {'target_user': target_user, 'club': club, 'current_user_status': current_user_status,
                        'target_user_status': target_user_status})
@@ -114,10 +119,12 @@ def show_user(request, user_id, club_name):
 @club_permissions_required(perms_list=['chessclubs.access_members_list'])
 def user_list(request, club_name):
     """ lists the members of a specific club """
-    club = Club.objects.get(name=club_name)
+    club = get_club(request, club_name)
     users = club.get_members()
+    statuses = club.user_statuses()
     current_user = request.user
-    return render(request, 'user_list.html', {'users': users, 'current_user': current_user, 'club': club})
+    return render(request, 'user_list.html',
+                  {'users': users, 'statuses': statuses, 'current_user': current_user, 'club': club})
 
 
 @login_required
@@ -129,7 +136,7 @@ def promote(request, user_id, club_name):
         messages.add_message(request, messages.ERROR, "The user you are looking for does not exist!")
         return redirect('user_list', club_name=club_name)
     else:
-        club = Club.objects.get(name=club_name)
+        club = get_club(request, club_name)
         if target_user == request.user:
             messages.add_message(request, messages.WARNING,
                                  "You cannot promote yourself")
@@ -153,7 +160,7 @@ def demote(request, user_id, club_name):
         messages.add_message(request, messages.ERROR, "The user you are looking for does not exist!")
         return redirect('user_list', club_name=club_name)
     else:
-        club = Club.objects.get(name=club_name)
+        club = get_club(request, club_name)
         if target_user == request.user:
             messages.add_message(request, messages.WARNING,
                                  "You cannot demote yourself")
@@ -178,7 +185,7 @@ def transfer_ownership(request, user_id, club_name):
         messages.add_message(request, messages.ERROR, "The user you are looking for does not exist!")
         return redirect('user_list', club_name=club_name)
     else:
-        club = Club.objects.get(name=club_name)
+        club = get_club(request, club_name)
         if target_user == request.user:
             messages.add_message(request, messages.WARNING,
                                  "You cannot transfer ownership to yourself")
@@ -204,10 +211,27 @@ def mark_as_read(request, slug=None):
     return get_appropriate_redirect(notification)
 
 
+@login_required
+def notifications_inbox(request):
+    """ all the notifications of the user, newest first """
+    notifications = keyset_page(request.user.notifications.all(), after=parse_page_key(request.GET.get('after')),
+                                page_size=NOTIFICATIONS_PER_PAGE, descending=True)
+    return render(request, 'notifications_inbox.html',
+                  {'notifications': notifications, 'unread_count': unread_counter.get(request.user)})
+
+
+@login_required
+def mark_all_as_read(request):
+    if request.method == 'POST':
+        request.user.notifications.unread().update(unread=False)
+        unread_counter.invalidate([request.user.pk])
+    return redirect('notifications_inbox')
+
+
 @login_required
 @club_permissions_required(perms_list=['chessclubs.manage_applications'])
 def view_applications(request, club_name):
-    club = Club.objects.get(name=club_name)
+    club = get_club(request, club_name)
     applicants = club.applicants_group().user_set.all()
     count = len(applicants)
     return render(request, 'applicants_list.html', {'applicants': applicants, 'count': count, 'club': club})
@@ -222,7 +246,7 @@ def accept(request, user_id, club_name):
         messages.add_message(request, messages.ERROR, "The user you are looking for does not exist!")
         return redirect('view_applications', club_name)
     else:
-        club = Club.objects.get(name=club_name)
+        club = get_club(request, club_name)
         if target_user == request.user:
             messages.add_message(request, messages.WARNING,
                                  "You cannot accept your own application")
@@ -247,7 +271,7 @@ def deny(request, user_id, club_name):
         messages.add_message(request, messages.ERROR, "The user you are looking for does not exist!")
         return redirect('view_applications', club_name)
     else:
-        club = Club.objects.get(name=club_name)
+        club = get_club(request, club_name)
         if target_user == request.user:
             messages.add_message(request, messages.WARNING,
                                  "You cannot deny your own application")
@@ -267,14 +291,14 @@ def deny(request, user_id, club_name):
 @login_required
 @club_permissions_required(perms_list=['chessclubs.acknowledge_response'])
 def acknowledge(request, club_name):
-    club = Club.objects.get(name=club_name)
-    if club.user_status(request.user) == "accepted_applicant":
+    club = get_club(request, club_name)
+    user_status = club.user_status(request.user)
+    if user_status == "accepted_applicant":
         club.add_member(request.user)
         club.remove_from_accepted_applicants_group(request.user)
         notify_officers_and_owner_of_joining(request.user, club)
         return redirect('show_club', club_name=club_name)
-    elif club.user_status(request.user) == "denied_applicant":
-        club.add_to_logged_in_non_members_group(request.user)
+    elif user_status == "denied_applicant":
         club.remove_from_denied_applicants_group(request.user)
         return redirect('my_applications')
     else:
@@ -292,7 +316,8 @@ def page_not_found_view(request, exception):
 def landing_page(request):
     """ the first page the user is redirected to when they log in or sign up, it contains the list of all existing clubs"""
     current_user = request.user
-    clubs = Club.objects.all()
+    clubs = keyset_page(Club.objects.with_member_count(), after=parse_page_key(request.GET.get('after')),
+                        page_size=CLUBS_PER_PAGE)
     return render(request, 'landing_page.html', {'clubs': clubs, 'current_user': current_user})
 
 
@@ -303,8 +328,7 @@ def create_club(request):
             current_user = request.user
             form = ClubForm(request.POST)
             if form.is_valid():
-                club = form.save(current_user)
-                add_all_users_to_logged_in_group(club)
+                form.save(current_user)
                 return redirect(REDIRECT_URL_WHEN_LOGGED_IN)
             else:
                 return render(request, 'create_club.html', {'form': form})
@@ -318,7 +342,7 @@ def create_club(request):
 @login_required
 @club_permissions_required(perms_list=['chessclubs.edit_club_info'])
 def edit_club(request, club_name):
-    current_club = Club.objects.get(name=club_name)
+    current_club = get_club(request, club_name)
     if request.method == 'POST':
         form = EditClubInformationForm(instance=current_club, data=request.POST)
         if form.is_valid():
@@ -346,9 +370,9 @@ def change_profile(request):
 
 @login_required
 @club_permissions_required(perms_list=['chessclubs.access_club_info', 'chessclubs.access_club_owner_public_info'])
-def show_club(request, club_name):
+def show_club(request, club_name=None, club_id=None):
     """ the page of a specif club """
-    club = Club.objects.get(name=club_name)
+    club = get_club(request, club_name or club_id)
     user_status = club.user_status(request.user)
     tournaments = club.get_all_tournaments()
     return render(request, 'show_club.html',
@@ -358,9 +382,8 @@ def show_club(request, club_name):
 @login_required
 @club_permissions_required(perms_list=['chessclubs.apply_to_club'])
 def apply_club(request, club_name):
-    club = Club.objects.get(name=club_name)
+    club = get_club(request, club_name)
     target_user = request.user
-    club.remove_from_logged_in_non_members_group(target_user)
     club.add_to_applicants_group(target_user)
     notify_officers_and_owner_of_new_application(request.user, club)
     return redirect('my_applications')
@@ -371,12 +394,12 @@ def my_applications(request):
     applications = []
     denied_applications = []
     accepted_applications = []
-    for club in Club.objects.all():
-        if club.user_status(request.user) == "applicant":
+    for club, status in Club.statuses_of_user(request.user).items():
+        if status == "applicant":
             applications.append(club)
-        elif club.user_status(request.user) == "denied_applicant":
+        elif status == "denied_applicant":
             denied_applications.append(club)
-        elif club.user_status(request.user) == "accepted_applicant":
+        elif status == "accepted_applicant":
             accepted_applications.append(club)
     count = len(applications) + len(denied_applications) + len(accepted_applications)
     return render(request, 'my_applications.html',
@@ -388,7 +411,7 @@ def my_applications(request):
 @club_permissions_required(perms_list=['chessclubs.create_tournament'])
 def create_tournament(request, club_name):
     try:
-        club = Club.objects.get(name=club_name)
+        club = get_club(request, club_name)
     except ObjectDoesNotExist:
         messages.add_message(request, messages.ERROR, "The club you are looking for does not exist!")
         return redirect(REDIRECT_URL_WHEN_LOGGED_IN)
@@ -419,7 +442,7 @@ def ban(request, club_name, user_id):
         messages.add_message(request, messages.ERROR, "The user you are looking for does not exist!")
         return redirect('user_list', club_name=club_name)
     else:
-        club = Club.objects.get(name=club_name)
+        club = get_club(request, club_name)
         if target_user == request.user:
             messages.add_message(request, messages.WARNING,
                                  "You cannot ban yourself")
@@ -439,11 +462,12 @@ def ban(request, club_name, user_id):
 @login_required
 @club_permissions_required(perms_list=['chessclubs.leave'])
 def leave(request, club_name):
-    club = Club.objects.get(name=club_name)
-    if club.user_status(request.user) == "officer":
+    club = get_club(request, club_name)
+    user_status = club.user_status(request.user)
+    if user_status == "officer":
         club.remove_from_officers_group(request.user)
         club.remove_member(request.user)
-    elif club.user_status(request.user) == "member":
+    elif user_status == "member":
         club.remove_from_members_group(request.user)
         club.remove_member(request.user)
     notify.send(request.user, recipient=request.user, verb=f'{club.name}_Leave',
@@ -454,19 +478,21 @@ def leave(request, club_name):
 
 @login_required
 @club_permissions_required(perms_list=['chessclubs.access_club_tournaments'])
-def show_tournament(request, club_name, tournament_name):
+def show_tournament(request, club_name=None, tournament_name=None, club_id=None, tournament_id=None):
     """ shows a specific tournament page """
+    club = get_club(request, club_name or club_id)
     try:
-        tournament = Tournament.objects.get(name=tournament_name)
+        tournament = get_tournament(request, tournament_name or tournament_id)
     except ObjectDoesNotExist:
         messages.add_message(request, messages.ERROR, "The tournament you are looking for does not exist!")
-        return redirect('show_club', club_name=club_name)
+        return redirect('show_club', club_name=club.name)
     else:
-        club = Club.objects.get(name=club_name)
-        officers = club.get_officers()
+        officers = list(club.get_officers())
+        participants = tournament.participants_for(officers)
+        co_organisers = set(tournament.co_organisers_list())
         can_be_added_as_co_organiser = []
         for officer in officers:
-            if officer not in tournament.participants_list() and officer not in tournament.co_organisers_list() and (
+            if participants[officer.id] is None and officer not in co_organisers and (
                     officer != tournament.organiser):
                 can_be_added_as_co_organiser.append(officer)
         return render(request, 'show_tournament.html', {'tournament': tournament, 'user': request.user,
@@ -479,7 +505,7 @@ def show_tournament(request, club_name, tournament_name):
 @deadline_must_not_be_passed
 def join_tournament(request, club_name, tournament_name):
     target_user = request.user
-    tournament = Tournament.objects.get(name=tournament_name)
+    tournament = get_tournament(request, tournament_name)
     if not tournament.is_max_capacity_reached():
         tournament.add_participant(target_user)
         messages.add_message(request, messages.SUCCESS, "You have successfully registered for the tournament.")
@@ -494,7 +520,7 @@ def join_tournament(request, club_name, tournament_name):
 @deadline_must_not_be_passed
 def withdraw_tournament(request, club_name, tournament_name):
     target_user = request.user
-    tournament = Tournament.objects.get(name=tournament_name)
+    tournament = get_tournament(request, tournament_name)
     tournament.remove_participant(target_user)
     return redirect('show_tournament', club_name=club_name, tournament_name=tournament_name)
 
@@ -503,26 +529,22 @@ def withdraw_tournament(request, club_name, tournament_name):
 @tournament_permissions_required(perms_list=['chessclubs.see_tournament_private_info'])
 @tournament_must_be_published
 def show_schedule(request, club_name, tournament_name):
-    tournament = Tournament.objects.get(name=tournament_name)
+    tournament = get_tournament(request, tournament_name)
     if tournament.has_finished():
         messages.add_message(request, messages.WARNING,
                              "The tournament is finished. There is no schedule")
         return redirect('show_tournament', club_name=club_name, tournament_name=tournament_name)
-    schedule = tournament.get_current_schedule()
+    schedule = tournament.open_matches().select_related('_player1__user', '_player2__user')
     return render(request, 'show_tournament_schedule.html',
                   {'tournament': tournament, 'user': request.user, 'schedule': schedule})
 
 
 @login_required
 def my_matches(request):
-    tournaments = {}
-    my_tournaments = request.user.get_all_tournaments()
-    count = len(my_tournaments)
-    for tournament in my_tournaments:
-        if not tournament.has_finished():
-            tournaments[tournament] = tournament.get_matches_of_player(request.user)
+    tournaments = request.user.get_open_matches_by_tournament()
+    count = len(tournaments)
     return render(request, 'my_matches.html',
-                  {'count': count, 'tournaments': tournaments, 'my_name': request.user.get_full_name()})
+                  {'count': count, 'tournaments': tournaments})
 
 
 @login_required
@@ -530,7 +552,7 @@ def my_matches(request):
 @tournament_has_not_finished
 @target_user_must_be_officer_and_non_participant
 def add_co_organiser(request, tournament_name, club_name, user_id):
-    tournament = Tournament.objects.get(name=tournament_name)
+    tournament = get_tournament(request, tournament_name)
     co_organiser = User.objects.get(id=user_id)
     tournament.add_co_organiser(co_organiser)
     notify.send(request.user, recipient=co_organiser, verb=f'{tournament_name}_Coorganiser',
@@ -546,20 +568,25 @@ def add_co_organiser(request, tournament_name, club_name, user_id):
 @match_must_be_in_tournament
 @must_be_valid_result
 def enter_result(request, tournament_name, match_id, result, club_name):
-    tournament = Tournament.objects.get(name=tournament_name)
-    match = Match.objects.get(id=match_id)
+    tournament = get_tournament(request, tournament_name)
+    match = get_match(request, match_id)
     if not match.is_open():
         messages.add_message(request, messages.ERROR, "This match is already closed.")
         return redirect('show_schedule', tournament_name=tournament_name, club_name=club_name)
-    if result == "draw":
-        if tournament.get_current_phase() != "Elimination Round":
-            tournament.enter_result(match, result=False)
+    try:
+        if result == "draw":
+            if tournament.get_current_phase() != "Elimination Round":
+                tournament.enter_result(match, result=False)
+            else:
+                messages.add_message(request, messages.WARNING,
+                                     "You cannot enter a draw result for an elimination round")
+        elif result == "player1":
+            tournament.enter_result(match, winner=match.get_player1())
         else:
-            messages.add_message(request, messages.WARNING, "You cannot enter a draw result for an elimination round")
-    elif result == "player1":
-        tournament.enter_result(match, winner=match.get_player1())
-    else:
-        tournament.enter_result(match, winner=match.get_player2())
+            tournament.enter_result(match, winner=match.get_player2())
+    except StaleMatchError:
+        messages.add_message(request, messages.ERROR, "This match is already closed.")
+        return redirect('show_schedule', tournament_name=tournament_name, club_name=club_name)
 
     if tournament.has_finished():
         return redirect('show_tournament', tournament_name=tournament_name, club_name=club_name)
@@ -571,7 +598,7 @@ def enter_result(request, tournament_name, match_id, result, club_name):
 @deadline_must_be_passed
 @tournament_has_not_started
 def publish_schedule(request, tournament_name, club_name):
-    tournament = Tournament.objects.get(name=tournament_name)
+    tournament = get_tournament(request, tournament_name)
     tournament.publish_schedule()
     notify_participants_of_publish(tournament)
     return redirect('show_schedule', tournament_name=tournament_name, club_name=club_name)
@@ -582,7 +609,14 @@ def publish_schedule(request, tournament_name, club_name):
 @deadline_must_be_passed
 @tournament_has_not_started
 def start_tournament(request, tournament_name, club_name):
-    tournament = Tournament.objects.get(name=tournament_name)
+    tournament = get_tournament(request, tournament_name)
     tournament.start_tournament()
     notify_participants_of_start(tournament)
     return redirect('show_tournament', tournament_name=tournament_name, club_name=club_name)
+
+
+def metrics(request):
+    """Exposes the request metrics of this process in the Prometheus text format, to local scrapers only"""
+    if request.META.get('REMOTE_ADDR') not in METRICS_ALLOWED_IPS:
+        raise Http404
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')